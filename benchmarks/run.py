@@ -0,0 +1,394 @@
+"""
+Benchmarks of injectme's injection and resolution overhead.
+
+Results are printed as JSON, so runs of different versions can be stored
+and compared::
+
+    python3 benchmarks/run.py --output before.json
+    python3 benchmarks/run.py --compare before.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import timeit
+
+import injectme
+from injectme import DependenciesRegistry, Injector
+
+
+def measure(func, repeat):
+    """
+    Measure ``func`` and return the best time of a single call in ns.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    timings = timer.repeat(repeat=repeat, number=number)
+    return min(timings) / number * 1e9
+
+
+def make_dependencies(count):
+    return [type(f"Dependency{i}", (), {}) for i in range(count)]
+
+
+def make_class(dependencies):
+    annotations = {f"dep_{i}": dep for i, dep in enumerate(dependencies)}
+    return type("Service", (), {"__annotations__": annotations})
+
+
+def make_plain_class(instances):
+    """
+    Create class assigning the instances in hand-written like ``__init__``.
+    """
+    body = "".join(
+        f"    self.dep_{i} = instances[{i}]\n" for i in range(len(instances))
+    )
+    namespace = {"instances": instances}
+    exec(f"def __init__(self):\n{body}", namespace)  # pylint: disable=W0122
+    return type("PlainService", (), {"__init__": namespace["__init__"]})
+
+
+def bench_construction(repeat):
+    results = []
+    for count in (1, 10, 50):
+        dependencies = make_dependencies(count)
+
+        instances = [dep() for dep in dependencies]
+        plain_cls = make_plain_class(instances)
+
+        injector = Injector()
+        for dependency, instance in zip(dependencies, instances):
+            injector.registry.register_instance(dependency, instance)
+        instance_cls = injector(make_class(dependencies))
+
+        injector = Injector()
+        for dependency in dependencies:
+            injector.registry.register_factory(dependency, dependency)
+        factory_cls = injector(make_class(dependencies))
+
+        for name, cls in (
+            ("plain", plain_cls),
+            ("inject_instances", instance_cls),
+            ("inject_factories", factory_cls),
+        ):
+            results.append(
+                {
+                    "name": f"construction.{name}",
+                    "params": {"dependencies": count},
+                    "ns_per_op": measure(cls, repeat),
+                }
+            )
+
+    return results
+
+
+def bench_resolution(repeat):
+    results = []
+    for frozen in (False, True):
+        registry = DependenciesRegistry()
+        instance_dep, factory_dep, singleton_dep = make_dependencies(3)
+        registry.register_instance(instance_dep, instance_dep())
+        registry.register_factory(factory_dep, factory_dep)
+        registry.register_singleton(singleton_dep, singleton_dep)
+        if frozen:
+            registry.warm_up()
+            registry.freeze()
+
+        prefix = "resolution.frozen" if frozen else "resolution"
+        results.extend(
+            {
+                "name": f"{prefix}.{name}",
+                "params": {},
+                "ns_per_op": measure(
+                    lambda dependency=dependency: registry.get(dependency),
+                    repeat,
+                ),
+            }
+            for name, dependency in (
+                ("instance", instance_dep),
+                ("factory", factory_dep),
+                ("singleton", singleton_dep),
+            )
+        )
+
+    return results
+
+
+def bench_function_call(repeat):
+    results = []
+    for count in (1, 10):
+        dependencies = make_dependencies(count)
+        instances = [dep() for dep in dependencies]
+        parameters = ", ".join(f"dep_{i}" for i in range(count))
+        namespace = {}
+        exec(  # pylint: disable=W0122
+            f"def handler({parameters}):\n    return None", namespace
+        )
+        plain = namespace["handler"]
+
+        injector = Injector()
+        for dependency, instance in zip(dependencies, instances):
+            injector.registry.register_instance(dependency, instance)
+        plain.__annotations__ = {
+            f"dep_{i}": dep for i, dep in enumerate(dependencies)
+        }
+        injected = injector(plain)
+
+        for name, func in (
+            ("plain", lambda: plain(*instances)),
+            ("inject_instances", injected),
+        ):
+            results.append(
+                {
+                    "name": f"function_call.{name}",
+                    "params": {"dependencies": count},
+                    "ns_per_op": measure(func, repeat),
+                }
+            )
+
+    return results
+
+
+def bench_registry_size(repeat):
+    results = []
+    for size in (10, 100, 1_000, 10_000, 100_000):
+        registry = DependenciesRegistry()
+        dependencies = make_dependencies(size)
+        for dependency in dependencies:
+            registry.register_instance(dependency, None)
+
+        dependency = dependencies[size // 2]
+        results.append(
+            {
+                "name": "resolution.registry_size",
+                "params": {"size": size},
+                "ns_per_op": measure(lambda: registry.get(dependency), repeat),
+            }
+        )
+
+    return results
+
+
+def run_threads(worker, threads_count, duration):
+    """
+    Run ``worker(index, stop)`` in threads started at once and return the
+    sum of the counts they return divided by the elapsed time.
+    """
+    counts = [0] * threads_count
+    stop = threading.Event()
+    barrier = threading.Barrier(threads_count + 1)
+
+    def run(index):
+        barrier.wait()
+        counts[index] = worker(index, stop)
+
+    threads = [
+        threading.Thread(target=run, args=(i,)) for i in range(threads_count)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return sum(counts) / elapsed
+
+
+def bench_threads(repeat, duration=0.5):
+    registry = DependenciesRegistry()
+    dependency, factory_dep = make_dependencies(2)
+    registry.register_instance(dependency, dependency())
+    registry.register_factory(factory_dep, factory_dep)
+
+    def worker(_, stop):
+        get = registry.get
+        count = 0
+        while not stop.is_set():
+            for _ in range(100):
+                get(dependency)
+                get(factory_dep)
+            count += 200
+        return count
+
+    results = []
+    for threads_count in (1, 2, 4, 8, 16):
+        throughputs = [
+            run_threads(worker, threads_count, duration)
+            for _ in range(repeat)
+        ]
+        results.append(
+            {
+                "name": "resolution.threads",
+                "params": {"threads": threads_count},
+                "ops_per_sec": max(throughputs),
+            }
+        )
+
+    return results
+
+
+def bench_contention(repeat, duration=0.5):
+    """
+    Construct marked classes from many threads, optionally while another
+    one clears and registers the dependencies again every millisecond,
+    which invalidates compiled plans. ``scaling`` is the throughput relative to
+    a single thread; without the GIL it should grow with threads.
+    """
+    injector = Injector()
+    registry = injector.registry
+    dependency, factory_dep = make_dependencies(2)
+    service = injector(make_class([dependency, factory_dep]))
+
+    def register():
+        registry.register_instance(dependency, dependency())
+        registry.register_factory(factory_dep, factory_dep)
+
+    register()
+
+    def worker(index, stop, writers=0):
+        count = 0
+        while not stop.is_set():
+            if index < writers:
+                registry.clear()
+                register()
+                time.sleep(0.001)
+                continue
+            for _ in range(100):
+                try:
+                    service()
+                except injectme.InjectionFailure:
+                    continue
+                count += 1
+        return count
+
+    results = []
+    for writers in (0, 1):
+        single = None
+        for threads_count in (1, 2, 4, 8, 16):
+            throughputs = [
+                run_threads(
+                    lambda index, stop: worker(index, stop, writers),
+                    threads_count + writers,
+                    duration,
+                )
+                for _ in range(repeat)
+            ]
+            throughput = max(throughputs)
+            single = single or throughput
+            results.append(
+                {
+                    "name": "construction.contention",
+                    "params": {"threads": threads_count, "writers": writers},
+                    "ops_per_sec": throughput,
+                    "scaling": throughput / single,
+                }
+            )
+
+    return results
+
+
+def bench_import(repeat):
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import injectme"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stderr
+        for line in output.splitlines():
+            _, _, fields = line.partition("import time:")
+            parts = [part.strip() for part in fields.split("|")]
+            if len(parts) == 3 and parts[2] == "injectme":
+                timings.append(int(parts[1]) * 1000)
+
+    return [
+        {
+            "name": "import",
+            "params": {},
+            "ns_per_op": statistics.median(timings),
+        }
+    ]
+
+
+BENCHMARKS = {
+    "construction": bench_construction,
+    "resolution": bench_resolution,
+    "function_call": bench_function_call,
+    "registry_size": bench_registry_size,
+    "threads": bench_threads,
+    "contention": bench_contention,
+    "import": bench_import,
+}
+
+
+def result_key(result):
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+def compare(previous, current):
+    old = {result_key(result): result for result in previous["results"]}
+    for result in current["results"]:
+        key = result_key(result)
+        if key not in old:
+            continue
+        for metric in ("ns_per_op", "ops_per_sec"):
+            if metric in result and metric in old[key]:
+                ratio = result[metric] / old[key][metric]
+                print(
+                    f"{key:50} {metric:12} "
+                    f"{old[key][metric]:>14.1f} -> {result[metric]:>14.1f}"
+                    f"  x{ratio:.2f}",
+                    file=sys.stderr,
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        help=f"benchmarks to run: {', '.join(BENCHMARKS)}; all by default",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write JSON results to file")
+    parser.add_argument("--compare", help="compare with previous results")
+    args = parser.parse_args()
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark {name}")
+
+    results = []
+    for name in args.benchmarks or BENCHMARKS:
+        results.extend(BENCHMARKS[name](args.repeat))
+
+    report = {
+        "injectme": injectme.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "free_threaded": not getattr(sys, "_is_gil_enabled", lambda: True)(),
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            compare(json.load(file), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,103 @@
 import logging
+from typing import TYPE_CHECKING
 
 from .errors import (
+    AsyncResolutionRequired,
+    CircularDependency,
     DependencyAlreadyRegistered,
     DependencyNotFound,
     InjectionFailure,
     InjectionNotSupported,
     InjectmeException,
+    KeyRequired,
+    PoolExhausted,
+    RegistryFrozen,
+    ScopeNotActive,
 )
 from .injector import Injector
+from .instrumentation import Hooks, ResolutionMetrics
+from .markers import Key, KeyedDependency, Lazy
+from .pickling import worker_initializer
+from .pool import release, releasing
 from .registry import DependenciesRegistry
 from .simple_api import (
     clear_dependencies,
+    freeze,
     inject,
+    prefork,
     register,
+    register_async_factory,
     register_factory,
+    register_keyed,
+    register_owned,
+    register_per_process,
+    register_pooled,
+    register_scoped,
+    register_singleton,
+    scope,
+    thaw,
+    validate,
+    warm_up,
 )
 
+if TYPE_CHECKING:
+    from .tracing import TraceNode, Tracer
+
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
+
+def __getattr__(name):
+    # tracing is only needed while debugging, don't import it eagerly
+    if name in ("TraceNode", "Tracer"):
+        from . import tracing  # pylint: disable=import-outside-toplevel
+
+        return getattr(tracing, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
+    "AsyncResolutionRequired",
+    "CircularDependency",
     "DependencyAlreadyRegistered",
     "DependencyNotFound",
     "InjectionFailure",
     "InjectionNotSupported",
     "InjectmeException",
+    "KeyRequired",
+    "PoolExhausted",
+    "RegistryFrozen",
+    "ScopeNotActive",
     "Injector",
+    "Hooks",
+    "ResolutionMetrics",
+    "Key",
+    "KeyedDependency",
+    "Lazy",
+    "worker_initializer",
+    "release",
+    "releasing",
     "DependenciesRegistry",
+    "TraceNode",
+    "Tracer",
     "clear_dependencies",
+    "freeze",
     "inject",
+    "prefork",
     "register",
+    "register_async_factory",
     "register_factory",
+    "register_keyed",
+    "register_owned",
+    "register_per_process",
+    "register_pooled",
+    "register_scoped",
+    "register_singleton",
+    "scope",
+    "thaw",
+    "validate",
+    "warm_up",
 ]
 
 __version__ = "0.0.6"
@@ -0,0 +1,168 @@
+import logging
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    ProcessPoolExecutor,
+    wait,
+)
+from typing import Any, Dict, Set
+
+from .deferred import DeferredFactory
+from .entries import SHARED_DEPENDENCY_TYPES, RegistryEntry
+from .graph import resolve_arguments
+
+logger = logging.getLogger(__name__)
+
+
+def shared_prerequisites(
+    dependency: Any,
+    entries: Dict[Any, RegistryEntry],
+    shared: Dict[Any, RegistryEntry],
+) -> Set[Any]:
+    """
+    Find shared dependencies which have to be created before the dependency.
+
+    Dependencies of the graph which are not shared (e.g. plain factories) are
+    created together with the dependency, so their own prerequisites are
+    prerequisites of the dependency. Factories registered by their paths are
+    imported to find their dependencies.
+
+    :param dependency: shared dependency to be created.
+    :param entries: all of the registered entries.
+    :param shared: shared entries waiting to be created.
+    :return: shared dependencies required by the dependency.
+    """
+    prerequisites = set()
+    visited = set()
+    stack = list(_factory(entries[dependency])[1])
+    while stack:
+        current = stack.pop().dependency
+        if current in visited:
+            continue
+        visited.add(current)
+
+        if current in shared:
+            prerequisites.add(current)
+            continue
+
+        entry = entries.get(current)
+        if (
+            entry is not None
+            and entry.dependency_type not in SHARED_DEPENDENCY_TYPES
+        ):
+            stack.extend(_factory(entry)[1])
+
+    return prerequisites
+
+
+def _factory(entry):
+    # factories registered by paths are imported, so they can be submitted
+    # to process pools and their dependencies are known
+    factory = entry.dependency_value
+    if isinstance(factory, DeferredFactory):
+        return factory.imported()
+
+    return factory, entry.dependencies
+
+
+def _schedule(entries, shared, copies):
+    waiting_for = {}
+    dependents: Dict[Any, list] = {dependency: [] for dependency in shared}
+    local = set()
+    for dependency in shared:
+        prerequisites = shared_prerequisites(dependency, entries, shared)
+        waiting_for[dependency] = len(prerequisites)
+        for prerequisite in prerequisites:
+            dependents[prerequisite].append(dependency)
+        # executors which copy the arguments would duplicate prerequisites
+        if copies and prerequisites:
+            local.add(dependency)
+
+    return waiting_for, dependents, local
+
+
+def bootstrap(registry, executor: Executor) -> None:
+    """
+    Create all of the shared dependencies of the registry using executor.
+
+    Factories run in the executor as soon as all of the shared dependencies
+    they need have been created, so independent dependencies are created
+    concurrently. Arguments of factories are resolved and factories
+    registered by paths are imported in the calling thread. The first
+    failure cancels factories which haven't started yet and is raised.
+
+    ``ProcessPoolExecutor`` receives pickled copies of arguments, so only
+    singletons which don't depend on other shared dependencies are created
+    in its workers; the remaining ones are created in the calling thread,
+    so they get the same instances as the rest of the application.
+    Factories submitted to the workers and the instances they return have
+    to be picklable.
+
+    Dependencies requested while they are being created wait for the
+    executor rather than being created again.
+
+    :param registry: registry whose dependencies should be created.
+    :param executor: executor running the factories.
+    """
+    entries = registry.entries()
+    shared = {
+        dependency: entry
+        for dependency, entry in entries.items()
+        if entry.dependency_type in SHARED_DEPENDENCY_TYPES
+        and not entry.provider.created
+    }
+    logger.debug("bootstrapping %d dependencies of %s", len(shared), registry)
+
+    waiting_for, dependents, local = _schedule(
+        entries, shared, isinstance(executor, ProcessPoolExecutor)
+    )
+    ready = deque(
+        dependency for dependency, count in waiting_for.items() if count == 0
+    )
+    running = {}
+
+    def finish(dependency):
+        for dependent in dependents[dependency]:
+            waiting_for[dependent] -= 1
+            if waiting_for[dependent] == 0:
+                ready.append(dependent)
+
+    def submit(dependency):
+        entry = shared[dependency]
+        if dependency in local:
+            entry.provider()
+            finish(dependency)
+            return
+
+        factory, parameters = _factory(entry)
+        positional, keyword = resolve_arguments(registry, parameters)
+
+        # created under the singleton's lock, so the dependency requested
+        # in the meantime isn't created again
+        future = entry.provider.submit(
+            executor, factory, *positional, **keyword
+        )
+        if future is None:
+            finish(dependency)
+        else:
+            running[future] = dependency
+
+    try:
+        while ready or running:
+            while ready:
+                submit(ready.popleft())
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                dependency = running.pop(future)
+                # cancelled creations have been taken over by the callers
+                if not future.cancelled():
+                    shared[dependency].provider.prime(future.result())
+                finish(dependency)
+    except BaseException:
+        for future in running:
+            future.cancel()
+        raise
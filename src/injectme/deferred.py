@@ -0,0 +1,133 @@
+import importlib
+import logging
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+from .errors import CircularDependency
+from .graph import (
+    AsyncGraphFactory,
+    FactoryParameter,
+    GraphFactory,
+    factory_dependencies,
+    find_cycle,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def import_object(path: str) -> Any:
+    """
+    Import object pointed to by ``"package.module:attribute"`` path.
+
+    :param path: module and qualified name of the object, separated by
+        a colon.
+    :raises ValueError: raised if the path is malformed.
+    :return: imported object.
+    """
+    module_name, _, qualname = path.partition(":")
+    if not module_name or not qualname:
+        raise ValueError(_malformed(path))
+
+    target = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        target = getattr(target, name)
+
+    return target
+
+
+class DeferredFactory:
+    """
+    Factory imported by its dotted path on the first call.
+
+    Dependencies of the imported factory are inspected after the import, so
+    neither the factory's module nor modules of its dependencies are
+    imported before the dependency is needed.
+    """
+
+    def __init__(
+        self, registry, dependency: Any, path: str, asynchronous: bool = False
+    ):
+        module_name, _, qualname = path.partition(":")
+        if not module_name or not qualname:
+            raise ValueError(_malformed(path))
+
+        self.registry = registry
+        self.dependency = dependency
+        self.path = path
+        self.asynchronous = asynchronous
+        self._imported: Optional[Tuple[Callable, Tuple]] = None
+        self._factory: Optional[Callable[[], Any]] = None
+        self._lock = threading.Lock()
+
+    def resolve(self) -> Callable[[], Any]:
+        """
+        Import the factory, unless it has been already imported.
+
+        :raises CircularDependency: raised if dependencies of the imported
+            factory depend on the dependency it provides.
+        :return: factory with its dependencies bound to the registry.
+        """
+        factory = self._factory
+        if factory is not None:
+            return factory
+
+        with self._lock:
+            if self._factory is None:
+                logger.debug("importing %s for %s", self.path, self.dependency)
+                target = import_object(self.path)
+                parameters = factory_dependencies(
+                    target, registry=self.registry
+                )
+                cycle = find_cycle(
+                    self.dependency, parameters, self.registry.entries()
+                )
+                if cycle is not None:
+                    raise CircularDependency(cycle)
+
+                factory = target
+                if parameters and self.asynchronous:
+                    factory = AsyncGraphFactory(
+                        self.registry, self.dependency, target, parameters
+                    )
+                elif parameters:
+                    factory = GraphFactory(
+                        self.registry, self.dependency, target, parameters
+                    )
+                self._imported = (target, parameters)
+                self._factory = factory
+
+            return self._factory
+
+    def imported(self) -> Tuple[Callable, Tuple[FactoryParameter, ...]]:
+        """
+        Import the factory, unless it has been already imported, without
+        binding its dependencies to the registry.
+
+        :raises CircularDependency: raised if dependencies of the imported
+            factory depend on the dependency it provides.
+        :return: imported factory and its parameters.
+        """
+        self.resolve()
+        return self._imported
+
+    def bind(self, registry) -> "DeferredFactory":
+        """
+        Get the factory importing the same object, with dependencies resolved
+        from another registry, e.g. a child one.
+
+        :param registry: registry the dependencies should be resolved from.
+        :return: new deferred factory.
+        """
+        return DeferredFactory(
+            registry, self.dependency, self.path, self.asynchronous
+        )
+
+    def __call__(self) -> Any:
+        return self.resolve()()
+
+    def __repr__(self):
+        return f"DeferredFactory({self.path!r})"
+
+
+def _malformed(path: str) -> str:
+    return f"Expected 'package.module:name' path, got {path!r}"
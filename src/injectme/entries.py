@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Optional, Tuple
+
+
+class DependencyType(Enum):
+    INSTANCE = 1
+    FACTORY = 2
+    SINGLETON = 3
+    ASYNC_FACTORY = 4
+    ASYNC_SINGLETON = 5
+    SCOPED = 6
+    POOLED = 7
+    PER_PROCESS = 8
+    KEYED = 9
+    OWNED = 10
+
+
+SHARED_DEPENDENCY_TYPES = frozenset((DependencyType.SINGLETON,))
+
+ASYNC_DEPENDENCY_TYPES = frozenset(
+    (DependencyType.ASYNC_FACTORY, DependencyType.ASYNC_SINGLETON)
+)
+
+
+@dataclass
+class RegistryEntry:
+    __slots__ = (
+        "dependency_type",
+        "dependency_value",
+        "provider",
+        "dependencies",
+    )
+
+    dependency_type: DependencyType
+    dependency_value: Any
+    provider: Optional[Callable[[], Any]]
+    dependencies: Tuple[Any, ...]
+
+    @classmethod
+    def factory(
+        cls,
+        factory,
+        dependency_type=DependencyType.FACTORY,
+        provider=None,
+        dependencies=(),
+    ) -> "RegistryEntry":
+        return cls(
+            dependency_type=dependency_type,
+            dependency_value=factory,
+            provider=factory if provider is None else provider,
+            dependencies=dependencies,
+        )
+
+    @classmethod
+    def instance(cls, instance) -> "RegistryEntry":
+        return cls(
+            dependency_type=DependencyType.INSTANCE,
+            dependency_value=instance,
+            provider=None,
+            dependencies=(),
+        )
+
+    @property
+    def is_async(self) -> bool:
+        return self.dependency_type in ASYNC_DEPENDENCY_TYPES
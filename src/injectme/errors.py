@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, List
 
 
 class InjectmeException(Exception):
@@ -27,6 +27,68 @@ class DependencyAlreadyRegistered(InjectmeException):
         super().__init__(f"Dependency {dependency} already registered")
 
 
+class AsyncResolutionRequired(InjectmeException):
+    """
+    Dependency provided by an async factory was requested synchronously.
+    """
+
+    def __init__(self, dependency: type):
+        super().__init__(
+            f"Dependency {dependency} has to be resolved asynchronously"
+        )
+
+
+class RegistryFrozen(InjectmeException):
+    """
+    Frozen registry can't be modified.
+    """
+
+    def __init__(self, registry: Any):
+        super().__init__(f"Registry {registry} is frozen")
+
+
+class CircularDependency(InjectmeException):
+    """
+    Dependencies of factories form a cycle.
+    """
+
+    def __init__(self, cycle: List[Any]):
+        self.cycle = cycle
+        path = " -> ".join(str(dependency) for dependency in cycle)
+        super().__init__(f"Circular dependency detected: {path}")
+
+
+class ScopeNotActive(InjectmeException):
+    """
+    Scoped dependency was requested outside of an active scope.
+    """
+
+    def __init__(self, dependency: type):
+        super().__init__(f"Dependency {dependency} requires an active scope")
+
+
+class PoolExhausted(InjectmeException):
+    """
+    No instance of pooled dependency became available in time.
+    """
+
+    def __init__(self, dependency: type):
+        super().__init__(
+            f"All instances of pooled dependency {dependency} are in use"
+        )
+
+
+class KeyRequired(InjectmeException):
+    """
+    Keyed dependency was requested without a key.
+    """
+
+    def __init__(self, dependency: type):
+        super().__init__(
+            f"Dependency {dependency} has to be requested with a key"
+        )
+
+
 class InjectionNotSupported(InjectmeException):
     """
     Decorated target is not valid for injection.
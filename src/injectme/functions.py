@@ -0,0 +1,339 @@
+import functools
+import inspect
+import logging
+import sys
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from .entries import DependencyType
+from .errors import (
+    AsyncResolutionRequired,
+    DependencyNotFound,
+    InjectionFailure,
+)
+from .instrumentation import resolve, resolve_async
+from .hints import (
+    annotation_dependency,
+    function_globals,
+    resolve_dependency,
+)
+from .plan import RESOLUTION_ERRORS
+from .pool import Pool
+from .registry import DependenciesRegistry
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_ONLY = sys.maxsize
+
+
+class InjectedParameter(NamedTuple):
+    """
+    Parameter of a function which can be provided by the registry.
+    """
+
+    name: str
+    dependency: Any
+    index: int
+    required: bool
+
+
+class Resolver(NamedTuple):
+    """
+    Parameter bound to the registry entry providing it.
+    """
+
+    name: str
+    dependency: Any
+    index: int
+    provider: Optional[Callable[[], Any]]
+    is_async: bool
+    pool: Optional[Pool]
+
+
+def injected_parameters(function: Callable) -> Tuple[InjectedParameter, ...]:
+    """
+    Find parameters of the function which can be injected.
+
+    Annotated parameters which can be passed by keyword are injected, unless
+    the caller passes them explicitly. String annotations referring to names
+    which don't exist yet are evaluated when the plan is compiled.
+
+    :param function: function to be inspected.
+    :return: injectable parameters.
+    """
+    globalns = function_globals(function)
+    parameters = []
+    for index, parameter in enumerate(
+        inspect.signature(function).parameters.values()
+    ):
+        if parameter.annotation is inspect.Parameter.empty:
+            continue
+
+        if parameter.kind is parameter.POSITIONAL_OR_KEYWORD:
+            position = index
+        elif parameter.kind is parameter.KEYWORD_ONLY:
+            position = KEYWORD_ONLY
+        else:
+            continue
+
+        parameters.append(
+            InjectedParameter(
+                parameter.name,
+                annotation_dependency(parameter.annotation, globalns),
+                position,
+                parameter.default is inspect.Parameter.empty,
+            )
+        )
+
+    return tuple(parameters)
+
+
+class CompiledFunctionPlan(NamedTuple):
+    """
+    Snapshot of a function's injection plan bound to a single version of the
+    registry.
+    """
+
+    version: int
+    values: Dict[str, Any]
+    first_value: int
+    value_items: Tuple[Tuple[str, int, Any], ...]
+    resolvers: Tuple[Resolver, ...]
+
+    @classmethod
+    def create(
+        cls,
+        version: int,
+        value_items: Tuple[Tuple[str, int, Any], ...],
+        resolvers: Tuple[Resolver, ...],
+    ) -> "CompiledFunctionPlan":
+        """
+        Create the snapshot, precomputing values passed by keyword.
+
+        :param version: version of the registry.
+        :param value_items: names, positions and values of parameters
+            registered as instances.
+        :param resolvers: parameters provided by factories.
+        :return: compiled plan.
+        """
+        return cls(
+            version,
+            {name: value for name, _, value in value_items},
+            min((index for _, index, _ in value_items), default=KEYWORD_ONLY),
+            value_items,
+            resolvers,
+        )
+
+
+class FunctionPlan:
+    """
+    Recipe for injecting dependencies into calls of a single function.
+
+    The signature is inspected only once. Like :class:`InjectionPlan`, the
+    registry entries are bound when the plan is compiled and the compiled
+    plan is reused until the registry changes. Dependencies missing from the
+    registry are injected only if the parameter has no default value.
+    """
+
+    def __init__(
+        self,
+        function: Callable,
+        parameters: Tuple[InjectedParameter, ...],
+        registry: DependenciesRegistry,
+    ):
+        self.function = function
+        self.parameters = parameters
+        self.registry = registry
+        self._compiled = CompiledFunctionPlan.create(-1, (), ())
+
+    def compile(self) -> CompiledFunctionPlan:
+        """
+        Bind the plan to the current content of the registry.
+
+        :return: compiled plan.
+        """
+        logger.debug("compiling injection plan for %s", self.function)
+        registry = self.registry
+        version = registry.version
+        hooks = registry.hooks
+
+        value_items = []
+        resolvers = []
+        for name, dependency, index, required in self.parameters:
+            dependency = resolve_dependency(dependency, registry)
+            try:
+                entry = registry.get_entry(dependency)
+            except DependencyNotFound:
+                if required:
+                    resolvers.append(
+                        Resolver(name, dependency, index, None, False, None)
+                    )
+                continue
+
+            if hooks is not None:
+                resolver = resolve_async if entry.is_async else resolve
+                provider = functools.partial(
+                    resolver, dependency, entry, hooks
+                )
+            elif entry.dependency_type is DependencyType.INSTANCE:
+                value_items.append((name, index, entry.dependency_value))
+                continue
+            else:
+                provider = entry.provider
+
+            pool = None
+            if entry.dependency_type is DependencyType.POOLED:
+                pool = entry.provider
+            resolvers.append(
+                Resolver(
+                    name, dependency, index, provider, entry.is_async, pool
+                )
+            )
+
+        compiled = CompiledFunctionPlan.create(
+            version, tuple(value_items), tuple(resolvers)
+        )
+        self._compiled = compiled
+        return compiled
+
+    def _values(self, args: tuple, kwargs: dict) -> Tuple[Any, dict]:
+        compiled = self._compiled
+        if compiled.version != self.registry.version:
+            compiled = self.compile()
+
+        passed = len(args)
+        if not kwargs and passed <= compiled.first_value:
+            return compiled, compiled.values.copy()
+
+        for name, index, value in compiled.value_items:
+            if index >= passed and name not in kwargs:
+                kwargs[name] = value
+
+        return compiled, kwargs
+
+    def inject(
+        self, args: tuple, kwargs: dict
+    ) -> Tuple[dict, List[Tuple[Pool, Any]]]:
+        """
+        Add dependencies which haven't been passed to keyword arguments.
+
+        :param args: positional arguments of the call.
+        :param kwargs: keyword arguments of the call.
+        :raises InjectionFailure: raised if any of the required dependencies
+            can't be resolved synchronously.
+        :return: keyword arguments with dependencies and pooled instances
+            which should be released after the call.
+        """
+        compiled, kwargs = self._values(args, kwargs)
+        leased = []
+        try:
+            _resolve(compiled.resolvers, len(args), kwargs, leased)
+        except RESOLUTION_ERRORS as err:
+            _release(leased)
+            raise InjectionFailure(self.function) from err
+
+        return kwargs, leased
+
+    async def inject_async(
+        self, args: tuple, kwargs: dict
+    ) -> Tuple[dict, List[Tuple[Pool, Any]]]:
+        """
+        Asynchronous version of :meth:`inject`, awaiting async factories
+        concurrently.
+        """
+        compiled, kwargs = self._values(args, kwargs)
+        leased = []
+        pending = []
+        try:
+            _resolve(compiled.resolvers, len(args), kwargs, leased, pending)
+            if pending:
+                import asyncio  # pylint: disable=import-outside-toplevel
+
+                results = await asyncio.gather(
+                    *(resolver.provider() for resolver in pending)
+                )
+                for resolver, result in zip(pending, results):
+                    kwargs[resolver.name] = result
+        except RESOLUTION_ERRORS as err:
+            _release(leased)
+            raise InjectionFailure(self.function) from err
+
+        return kwargs, leased
+
+
+def _resolve(
+    resolvers: Tuple[Resolver, ...],
+    passed: int,
+    kwargs: dict,
+    leased: List[Tuple[Pool, Any]],
+    pending: Optional[List[Resolver]] = None,
+) -> None:
+    # async dependencies are collected in pending, if it's passed
+    for resolver in resolvers:
+        name, dependency, index, provider, is_async, pool = resolver
+        if index < passed or name in kwargs:
+            continue
+        if provider is None:
+            raise DependencyNotFound(dependency)
+        if is_async:
+            if pending is None:
+                raise AsyncResolutionRequired(dependency)
+            pending.append(resolver)
+            continue
+
+        value = provider()
+        if pool is not None:
+            leased.append((pool, value))
+        kwargs[name] = value
+
+
+def inject_function(
+    function: Callable, registry: DependenciesRegistry
+) -> Callable:
+    """
+    Wrap the function, so its parameters are injected from the registry.
+
+    :param function: function or method to be wrapped.
+    :param registry: registry providing the dependencies.
+    :return: wrapped function.
+    """
+    plan = FunctionPlan(function, injected_parameters(function), registry)
+
+    if inspect.iscoroutinefunction(function):
+
+        @functools.wraps(function)
+        async def async_wrapper(*args, **kwargs):
+            kwargs, leased = await plan.inject_async(args, kwargs)
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                _release(leased)
+
+        async_wrapper.__injectme_plan__ = plan
+        return async_wrapper
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        kwargs, leased = plan.inject(args, kwargs)
+        if not leased:
+            return function(*args, **kwargs)
+
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _release(leased)
+
+    wrapper.__injectme_plan__ = plan
+    return wrapper
+
+
+def _release(leased: List[Tuple[Pool, Any]]) -> None:
+    for pool, instance in leased:
+        pool.release(instance)
@@ -0,0 +1,285 @@
+import inspect
+import logging
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .entries import DependencyType, RegistryEntry
+from .errors import (
+    AsyncResolutionRequired,
+    CircularDependency,
+    InjectionNotSupported,
+)
+from .instrumentation import timed_factory
+from .markers import KeyedDependency
+from .hints import (
+    annotation_dependency,
+    function_globals,
+    resolve_dependency,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class FactoryParameter(NamedTuple):
+    name: str
+    dependency: Any
+    positional: bool
+
+
+def factory_dependencies(
+    factory: Callable, skip: int = 0, registry=None
+) -> Tuple[FactoryParameter, ...]:
+    """
+    Inspect the signature of factory and find dependencies it requires.
+
+    Every parameter without default value has to be annotated with the
+    dependency which should be passed as its argument. Variadic parameters
+    and parameters with default values are ignored. String annotations
+    registered as keys are used as they are, other ones are evaluated in the
+    factory's module; those which can't be evaluated are used as string keys
+    as well.
+
+    :param factory: factory to be inspected.
+    :param skip: number of leading parameters which are passed by the
+        caller, e.g. the key passed to keyed factories.
+    :param registry: registry where string keys should be looked up.
+    :raises InjectionNotSupported: raised if any of the required parameters
+        is not annotated.
+    :return: parameters of factory.
+    """
+    try:
+        signature = inspect.signature(factory)
+    except (TypeError, ValueError):
+        return ()
+
+    globalns = function_globals(factory)
+    parameters = []
+    for parameter in list(signature.parameters.values())[skip:]:
+        if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+        if parameter.default is not parameter.empty:
+            continue
+        if parameter.annotation is parameter.empty:
+            raise InjectionNotSupported(factory)
+
+        parameters.append(
+            FactoryParameter(
+                name=parameter.name,
+                dependency=resolve_dependency(
+                    annotation_dependency(parameter.annotation, globalns),
+                    registry,
+                ),
+                positional=parameter.kind is parameter.POSITIONAL_ONLY,
+            )
+        )
+
+    return tuple(parameters)
+
+
+def find_cycle(
+    dependency: Any,
+    parameters: Tuple[FactoryParameter, ...],
+    entries: Dict[Any, RegistryEntry],
+) -> Optional[List[Any]]:
+    """
+    Look for a path leading from the parameters of dependency's factory back
+    to the dependency.
+
+    :param dependency: dependency which is about to be registered.
+    :param parameters: parameters of the dependency's factory.
+    :param entries: already registered entries.
+    :return: dependencies forming the cycle or ``None`` if there's no cycle.
+    """
+    visited = set()
+    path = [dependency]
+
+    def visit(parameters):
+        for parameter in parameters:
+            current = parameter.dependency
+            if isinstance(current, KeyedDependency):
+                # all keys are created by the same factory
+                current = current.dependency
+            if current == dependency:
+                return path + [current]
+            if current in visited:
+                continue
+
+            visited.add(current)
+            entry = entries.get(current)
+            if entry is None:
+                continue
+
+            path.append(current)
+            cycle = visit(entry.dependencies)
+            if cycle is not None:
+                return cycle
+            path.pop()
+
+        return None
+
+    return visit(parameters)
+
+
+def resolve_arguments(
+    registry, parameters: Tuple[FactoryParameter, ...], *leading: Any
+) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Get arguments for the factory from the registry.
+
+    :param registry: registry the dependencies are resolved from.
+    :param parameters: parameters of the factory.
+    :param leading: positional arguments passed before the dependencies.
+    :return: positional and keyword arguments of the factory call.
+    """
+    positional = list(leading)
+    keyword = {}
+    for parameter in parameters:
+        value = registry.get(parameter.dependency)
+        if parameter.positional:
+            positional.append(value)
+        else:
+            keyword[parameter.name] = value
+
+    return positional, keyword
+
+
+def _call_arguments(parameters):
+    positional = tuple(p.dependency for p in parameters if p.positional)
+    keyword = tuple(
+        (p.name, p.dependency) for p in parameters if not p.positional
+    )
+    return positional, keyword
+
+
+class GraphFactory:
+    """
+    Provider calling factory with all of its dependencies resolved.
+
+    Dependencies provided by other factories with parameters are expanded
+    into a single, topologically sorted list of steps. Each dependency is
+    created once per call, even if several factories of the graph need it.
+    The list of steps is cached until the registry changes.
+    """
+
+    def __init__(
+        self,
+        registry,
+        dependency: Any,
+        factory: Callable,
+        parameters: Tuple[FactoryParameter, ...],
+    ):
+        self.registry = registry
+        self.dependency = dependency
+        self.factory = factory
+        self.parameters = parameters
+        self._compiled = None
+
+    def compile(self) -> Tuple[int, Dict[Any, Any], Tuple]:
+        """
+        Compute resolution order of the dependency graph.
+
+        :raises DependencyNotFound: raised if any of the dependencies of the
+            graph has not been registered.
+        :raises AsyncResolutionRequired: raised if any of the dependencies of
+            the graph has to be resolved asynchronously.
+        :return: registry version, constant values and steps of resolution.
+        """
+        logger.debug("compiling resolution order of %s", self.dependency)
+        registry = self.registry
+        version = registry.version
+        hooks = registry.hooks
+        constants = {}
+        steps = []
+        resolved = set()
+        visiting = [self.dependency]
+
+        def visit(dependency, factory, parameters):
+            for parameter in parameters:
+                current = parameter.dependency
+                if current in resolved:
+                    continue
+                if current in visiting:
+                    raise CircularDependency(visiting + [current])
+
+                entry = registry.get_entry(current)
+                if entry.dependency_type is DependencyType.INSTANCE:
+                    constants[current] = entry.dependency_value
+                elif entry.is_async:
+                    raise AsyncResolutionRequired(current)
+                elif (
+                    entry.dependency_type is DependencyType.FACTORY
+                    and entry.dependencies
+                ):
+                    child_factory = entry.dependency_value
+                    if hooks is not None:
+                        child_factory = timed_factory(
+                            current, child_factory, hooks
+                        )
+                    visiting.append(current)
+                    visit(current, child_factory, entry.dependencies)
+                    visiting.pop()
+                elif hooks is not None:
+                    provider = timed_factory(current, entry.provider, hooks)
+                    steps.append((current, provider, (), ()))
+                else:
+                    steps.append((current, entry.provider, (), ()))
+                resolved.add(current)
+
+            steps.append((dependency, factory, *_call_arguments(parameters)))
+
+        visit(self.dependency, self.factory, self.parameters)
+
+        compiled = (version, constants, tuple(steps))
+        self._compiled = compiled
+        return compiled
+
+    def __call__(self) -> Any:
+        compiled = self._compiled
+        if compiled is None or compiled[0] != self.registry.version:
+            compiled = self.compile()
+
+        _, constants, steps = compiled
+        values = dict(constants)
+        result = None
+        for dependency, factory, positional, keyword in steps:
+            result = factory(
+                *[values[arg] for arg in positional],
+                **{name: values[arg] for name, arg in keyword},
+            )
+            values[dependency] = result
+
+        return result
+
+
+# pylint: disable-next=too-few-public-methods
+class AsyncGraphFactory:
+    """
+    Provider awaiting async factory with all of its dependencies resolved
+    concurrently.
+    """
+
+    def __init__(
+        self,
+        registry,
+        dependency: Any,
+        factory: Callable,
+        parameters: Tuple[FactoryParameter, ...],
+    ):
+        self.registry = registry
+        self.dependency = dependency
+        self.factory = factory
+        self.parameters = parameters
+        self._arguments = _call_arguments(parameters)
+
+    async def __call__(self) -> Any:
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        registry = self.registry
+        values = await asyncio.gather(
+            *(registry.aget(p.dependency) for p in self.parameters)
+        )
+        values = dict(zip((p.dependency for p in self.parameters), values))
+        positional, keyword = self._arguments
+        return await self.factory(
+            *[values[arg] for arg in positional],
+            **{name: values[arg] for name, arg in keyword},
+        )
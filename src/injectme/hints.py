@@ -0,0 +1,205 @@
+import inspect
+import sys
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .errors import DependencyNotFound
+from .markers import dependency_key
+
+_NOT_EVALUATED = object()
+
+
+class ForwardDependency:
+    """
+    String annotation, which is either a key of a dependency registered under
+    a string or an expression referring to names of its module, e.g. a class
+    defined later in the module.
+
+    Registered string keys take precedence. Otherwise the annotation is
+    evaluated in its module when the dependency is needed. If the names it
+    refers to can't be found yet, or it doesn't evaluate to a valid key, the
+    string itself is used as the dependency.
+    """
+
+    __slots__ = ("expression", "globalns", "localns", "_annotation")
+
+    def __init__(
+        self,
+        expression: str,
+        globalns: Dict[str, Any],
+        localns: Optional[Dict[str, Any]] = None,
+    ):
+        self.expression = expression
+        self.globalns = globalns
+        self.localns = localns
+        self._annotation = _NOT_EVALUATED
+
+    @property
+    def annotation(self) -> Any:
+        """
+        Evaluated annotation, ``None`` if it can't be evaluated (yet).
+        """
+        annotation = self._annotation
+        if annotation is _NOT_EVALUATED:
+            try:
+                annotation = _evaluate(
+                    self.expression, self.globalns, self.localns
+                )
+            except (NameError, AttributeError):
+                return None
+            except Exception:  # pylint: disable=broad-except
+                # not an expression, e.g. "package.module:name" key
+                annotation = None
+            self._annotation = annotation
+
+        return annotation
+
+    def resolve(self, registry=None) -> Any:
+        """
+        Get the dependency the annotation refers to.
+
+        :param registry: if specified, the string itself is used if it has
+            been registered there as a key.
+        :return: dependency to be looked up in the registry.
+        """
+        expression = self.expression
+        if registry is not None and _registered(registry, expression):
+            return expression
+
+        annotation = self.annotation
+        if annotation is None:
+            return expression
+
+        dependency = dependency_key(annotation)
+        try:
+            hash(dependency)
+        except TypeError:
+            return expression
+
+        return dependency
+
+    def __repr__(self):
+        return f"ForwardDependency({self.expression!r})"
+
+
+def evaluate(
+    annotation: Any,
+    globalns: Dict[str, Any],
+    localns: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """
+    Prepare annotation to be evaluated, following ``typing.get_type_hints``.
+
+    :param annotation: annotation to be evaluated.
+    :param globalns: globals of the module where the annotation was made.
+    :param localns: locals of the annotated class.
+    :return: the annotation, or :class:`ForwardDependency` if it's a string.
+    """
+    if annotation is None:
+        return type(None)
+    if isinstance(annotation, str):
+        return ForwardDependency(annotation, globalns, localns)
+
+    return annotation
+
+
+def annotation_dependency(annotation: Any, globalns: Dict[str, Any]) -> Any:
+    """
+    Get the dependency described by annotation of a function's parameter.
+
+    :param annotation: annotation to be evaluated.
+    :param globalns: globals of the function.
+    :return: registry key of the dependency or :class:`ForwardDependency`.
+    """
+    annotation = evaluate(annotation, globalns)
+    if isinstance(annotation, ForwardDependency):
+        return annotation
+
+    return dependency_key(annotation)
+
+
+def function_globals(function: Callable) -> Dict[str, Any]:
+    """
+    Get globals which annotations of the function refer to.
+
+    :param function: function, method or class.
+    :return: globals of the module where the function is defined.
+    """
+    function = inspect.unwrap(function)
+    globalns = getattr(function, "__globals__", None)
+    if globalns is None:
+        module = sys.modules.get(getattr(function, "__module__", None))
+        globalns = getattr(module, "__dict__", {})
+
+    return globalns
+
+
+def class_hints(cls: type, stop: Optional[type] = None) -> Dict[str, Any]:
+    """
+    Evaluate annotations of the class and of its ancestors, following the
+    method resolution order like ``typing.get_type_hints``.
+
+    :param cls: class to be inspected.
+    :param stop: ancestor whose annotations, as well as annotations of
+        classes following it in the method resolution order, are skipped.
+    :return: mapping of attribute names to evaluated annotations.
+    """
+    classes = []
+    for klass in cls.__mro__:
+        if klass is stop or klass is object:
+            break
+        classes.append(klass)
+
+    hints = {}
+    for klass in reversed(classes):
+        module = sys.modules.get(klass.__module__)
+        globalns = getattr(module, "__dict__", {})
+        localns = dict(vars(klass))
+        annotations = klass.__dict__.get("__annotations__", {})
+        for name, annotation in annotations.items():
+            hints[name] = evaluate(annotation, globalns, localns)
+
+    return hints
+
+
+def resolve_dependency(dependency: Any, registry=None) -> Any:
+    """
+    Get the dependency, evaluating forward references.
+
+    :param dependency: dependency or :class:`ForwardDependency`.
+    :param registry: registry where string keys should be looked up first.
+    :return: dependency to be looked up in the registry.
+    """
+    if isinstance(dependency, ForwardDependency):
+        return dependency.resolve(registry)
+
+    return dependency
+
+
+def resolve_fields(
+    fields: Tuple[Tuple[str, Any], ...], registry=None
+) -> Tuple[Tuple[str, Any], ...]:
+    """
+    Evaluate forward references among dependencies of the fields.
+
+    :param fields: pairs of attribute names and their dependencies.
+    :param registry: registry where string keys should be looked up first.
+    :return: fields with evaluated dependencies.
+    """
+    return tuple(
+        (name, resolve_dependency(dependency, registry))
+        for name, dependency in fields
+    )
+
+
+def _registered(registry, key):
+    try:
+        registry.get_entry(key)
+    except DependencyNotFound:
+        return False
+
+    return True
+
+
+def _evaluate(expression, globalns, localns):
+    # pylint: disable-next=eval-used
+    return eval(expression, globalns, localns)
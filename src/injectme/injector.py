@@ -1,12 +1,25 @@
+import inspect
 import logging
-from typing import Optional
+import weakref
+from contextlib import contextmanager
+from types import MemberDescriptorType
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Optional
 
-from .errors import (
-    DependencyNotFound,
-    InjectionFailure,
-    InjectionNotSupported,
-)
+from .errors import InjectionNotSupported
+from .functions import inject_function
+from .instrumentation import Hooks
+from .hints import ForwardDependency, class_hints
+from .lifetimes import freeze_gc
+from .markers import dependency_key, is_lazy
+from .pickling import install_pickling
+from .plan import BoundDependency, InjectionPlan, LazyDependency
 from .registry import DependenciesRegistry
+from .scope import Scope
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from .tracing import Tracer
 
 logger = logging.getLogger(__name__)
 
@@ -16,18 +29,34 @@ class Injector:
     Class responsible for the injection of dependencies.
     """
 
-    def __init__(self, registry: Optional[DependenciesRegistry] = None):
+    def __init__(
+        self,
+        registry: Optional[DependenciesRegistry] = None,
+        lazy: bool = False,
+        bind_instances: bool = False,
+    ):
         """
         Initialize the Injector.
 
         :param registry: dependencies registry
             to be used with this ``Injector`` instance. If not sepcified,
             an instance of registry will be created automatically.
+        :param lazy: if ``True``, all of the dependencies of decorated classes
+            are resolved on first access instead of during initialization.
+            Single attributes can be marked as lazy with
+            :class:`injectme.Lazy`.
+        :param bind_instances: if ``True``, dependencies registered with
+            :meth:`DependenciesRegistry.register_instance` are read from the
+            registry through class attributes instead of being stored in
+            each instance of decorated classes.
         """
         if registry is None:
             registry = DependenciesRegistry()
 
         self._registry = registry
+        self._lazy = lazy
+        self._bind_instances = bind_instances
+        self._targets = weakref.WeakSet()
 
     @property
     def registry(self) -> DependenciesRegistry:
@@ -38,43 +67,372 @@ class Injector:
         """
         return self._registry
 
-    def __call__(self, cls: type) -> type:
+    @property
+    def targets(self) -> List[type]:
+        """
+        Classes marked for injection with this ``Injector``.
+
+        :return: list of marked classes which are still alive.
+        """
+        return list(self._targets)
+
+    def validate(self) -> None:
+        """
+        Check that all of the dependencies of classes marked with this
+        ``Injector`` and of registered factories can be resolved.
+
+        :raises InjectionFailure: raised if any of the dependencies of marked
+            classes can't be found in the registry.
+        :raises DependencyNotFound: raised if any of the dependencies of
+            registered factories can't be found in the registry.
+        """
+        for cls in self.targets:
+            cls.__dict__["__injectme_plan__"].validate()
+
+        self._registry.validate()
+
+    def warm_up(
+        self,
+        max_workers: Optional[int] = None,
+        executor: Optional["Executor"] = None,
+    ) -> None:
+        """
+        Validate dependencies, create all of the singletons and compile
+        injection plans of marked classes, so neither failures nor expensive
+        factories are left for the first instantiation.
+
+        :param max_workers: if specified, singletons are created concurrently
+            in a thread pool with this many workers.
+        :param executor: if specified, singletons are created concurrently in
+            this executor, see :meth:`DependenciesRegistry.bootstrap`.
+        :raises InjectionFailure: raised if any of the dependencies of marked
+            classes can't be found in the registry.
+        :raises DependencyNotFound: raised if any of the dependencies of
+            registered factories can't be found in the registry.
+        """
+        logger.debug("warming up %s", self)
+        self.validate()
+        self._registry.warm_up(max_workers, executor)
+        for cls in self.targets:
+            cls.__dict__["__injectme_plan__"].warm_up()
+
+    def prefork(
+        self,
+        max_workers: Optional[int] = None,
+        executor: Optional["Executor"] = None,
+    ) -> None:
+        """
+        Prepare the registry and injection plans of marked classes to be
+        inherited by forked worker processes, see
+        :meth:`DependenciesRegistry.prefork`. Per-process dependencies and
+        pooled instances are left for the workers.
+
+        :param max_workers: if specified, singletons are created concurrently
+            in a thread pool with this many workers.
+        :param executor: if specified, singletons are created concurrently in
+            this executor, see :meth:`DependenciesRegistry.bootstrap`.
+        :raises InjectionFailure: raised if any of the dependencies of marked
+            classes can't be found in the registry.
+        :raises DependencyNotFound: raised if any of the dependencies of
+            registered factories can't be found in the registry.
+        """
+        logger.debug("preparing %s for fork", self)
+        self.validate()
+        self._registry.warm_up(max_workers, executor, per_process=False)
+        for cls in self.targets:
+            cls.__dict__["__injectme_plan__"].warm_up()
+        freeze_gc()
+
+    def freeze(self) -> None:
+        """
+        Warm up and freeze the registry associated with this ``Injector``
+        for production use. Injection plans of marked classes are compiled
+        for the frozen content of the registry and never invalidated, since
+        it can't change anymore.
+
+        :raises InjectionFailure: raised if any of the dependencies of marked
+            classes can't be found in the registry.
+        :raises DependencyNotFound: raised if any of the dependencies of
+            registered factories can't be found in the registry.
+        """
+        logger.debug("freezing %s", self)
+        self.validate()
+        self._registry.warm_up()
+        self._registry.freeze()
+        for cls in self.targets:
+            cls.__dict__["__injectme_plan__"].warm_up()
+
+    def thaw(self) -> None:
+        """
+        Make the registry associated with this ``Injector`` mutable again,
+        e.g. to replace dependencies in tests.
+        """
+        self._registry.thaw()
+
+    def add_hooks(self, hooks: Hooks) -> None:
+        """
+        Install instrumentation hooks in the registry associated with this
+        ``Injector``.
+
+        :param hooks: hooks to be installed.
+        """
+        self._registry.add_hooks(hooks)
+
+    def remove_hooks(self, hooks: Hooks) -> None:
+        """
+        Uninstall instrumentation hooks from the registry associated with
+        this ``Injector``.
+
+        :param hooks: hooks to be uninstalled.
+        """
+        self._registry.remove_hooks(hooks)
+
+    @contextmanager
+    def tracing(self, max_traces: Optional[int] = 100) -> Iterator["Tracer"]:
+        """
+        Record resolution trees of constructions and resolutions inside the
+        ``with`` block, e.g. during application's startup::
+
+            with injector.tracing() as tracer:
+                app = create_app()
+            print(tracer.to_dot())
+
+        :param max_traces: number of kept trees, all if ``None``.
+        :return: context manager yielding installed :class:`Tracer`, which
+            is uninstalled when the block exits.
+        """
+        # pylint: disable-next=import-outside-toplevel
+        from .tracing import Tracer
+
+        tracer = Tracer(self._registry, max_traces)
+        self.add_hooks(tracer)
+        try:
+            yield tracer
+        finally:
+            self.remove_hooks(tracer)
+
+    def scope(self) -> Scope:
+        """
+        Create a scope for dependencies registered with
+        :meth:`injectme.DependenciesRegistry.register_scoped`. Use it with
+        ``with`` or ``async with``; scoped dependencies are created at most
+        once inside the block and released when it exits.
+
+        :return: new scope.
+        """
+        return Scope()
+
+    def __call__(self, cls: Any) -> Any:
         """
         Mark class to be the target of injection performed with this instance
         of ``Injector``.
 
-        :param cls: class to be marked for injection.
-        :raises InjectionFailure: raised if any of the required dependencies
-            can't be found in the registry associated with this ``Injector``.
-        :return: class passed as a param.
+        Classes defining ``__slots__`` are supported. If the slots don't
+        cover all of the dependencies, a copy of the class with missing slots
+        added is created and returned, so the class should be marked with
+        the decorator syntax or replaced with the returned value.
+
+        Functions and methods, including async ones, are wrapped instead.
+        Their annotated parameters which are not passed by the caller are
+        resolved from the registry on each call; parameters with default
+        values are injected only if their dependency is registered.
+
+        :param cls: class, function or method to be marked for injection.
+        :raises InjectionNotSupported: raised if ``cls`` is neither a class
+            nor a function or if it has neither ``__dict__`` nor slots for
+            its lazy dependencies.
+        :return: class passed as a param, its copy with added slots or
+            wrapped function.
         """
         logger.debug("marking %s as target for %s", cls, self)
+        if inspect.isfunction(cls) or inspect.ismethod(cls):
+            return inject_function(cls, self._registry)
         if not isinstance(cls, type):
             raise InjectionNotSupported(cls)
 
-        injector = self
+        registry = self._registry
+        own_fields, own_lazy_fields = self._own_fields(cls)
+        fields, lazy_fields, bound_fields, parents = _inherited_fields(
+            cls, {name for name, _ in own_fields + own_lazy_fields}, registry
+        )
+        if self._bind_instances:
+            bound_fields |= frozenset(
+                name for name, _ in own_fields if not _is_slot(cls, name)
+            )
 
-        def __init_deps__(self):
-            annotations = cls.__dict__.get("__annotations__", {})
-            registry = injector.registry
+        cls = _install_fields(
+            cls, own_fields, own_lazy_fields, bound_fields, registry
+        )
+        fields.update(own_fields)
+        lazy_fields.update(own_lazy_fields)
+        plan = InjectionPlan(
+            cls,
+            tuple(fields.items()),
+            registry,
+            tuple(lazy_fields.items()),
+            bound_fields,
+            parents,
+        )
+        _install_plan(cls, plan)
+        install_pickling(cls, plan)
+        self._targets.add(cls)
 
-            logger.debug(
-                "injecting into %s by %s using %s", self, injector, registry
-            )
+        return cls
 
-            try:
-                for name, dependency in annotations.items():
-                    instance = registry.get(dependency)
-                    setattr(self, name, instance)
-            except DependencyNotFound as err:
-                raise InjectionFailure(cls) from err
+    def _own_fields(self, cls):
+        # fields are collected up to the closest marked ancestor
+        stop = next(
+            (
+                base
+                for base in cls.__mro__[1:]
+                if "__injectme_plan__" in base.__dict__
+            ),
+            None,
+        )
 
-        def injectme_init(self, *args, **kwargs):
-            cls.__init_deps__(self)
-            cls.__original_init__(self, *args, **kwargs)
+        fields = []
+        lazy_fields = []
+        for name, annotation in class_hints(cls, stop).items():
+            if isinstance(annotation, ForwardDependency):
+                dependency = annotation
+                annotation = annotation.annotation
+            else:
+                dependency = dependency_key(annotation)
 
-        cls.__original_init__ = cls.__init__
-        cls.__init_deps__ = __init_deps__
-        cls.__init__ = injectme_init
+            if self._lazy or is_lazy(annotation):
+                lazy_fields.append((name, dependency))
+            else:
+                fields.append((name, dependency))
 
-        return cls
+        return fields, lazy_fields
+
+    async def create_async(self, cls: type, *args, **kwargs) -> Any:
+        """
+        Create an instance of class marked for injection with this
+        ``Injector``, resolving its dependencies asynchronously. Dependencies
+        registered with async factories are awaited concurrently.
+
+        :param cls: class to be instantiated.
+        :param args: positional arguments passed to class' ``__init__``.
+        :param kwargs: keyword arguments passed to class' ``__init__``.
+        :raises InjectionNotSupported: raised if the class has not been marked
+            for injection with this ``Injector``.
+        :raises InjectionFailure: raised if any of the required dependencies
+            can't be found in the registry associated with this ``Injector``.
+        :return: created instance.
+        """
+        plan = cls.__dict__.get("__injectme_plan__")
+        if plan is None or plan.registry is not self._registry:
+            raise InjectionNotSupported(cls)
+
+        if cls.__new__ is object.__new__:
+            instance = object.__new__(cls)
+        else:
+            instance = cls.__new__(cls, *args, **kwargs)
+
+        await plan.inject_async(instance)
+        cls.__original_init__(instance, *args, **kwargs)
+        return instance
+
+
+def _inherited_fields(cls, own_names, registry):
+    # plan of the closest ancestor marked for injection contains dependencies
+    # of its own ancestors
+    fields = {}
+    lazy_fields = {}
+    bound_fields = frozenset()
+    parents = ()
+    base_plan = getattr(cls, "__injectme_plan__", None)
+    if base_plan is not None:
+        base_plan = base_plan.without(own_names)
+        if base_plan.registry is registry:
+            fields.update(base_plan.declared_fields)
+            lazy_fields.update(base_plan.declared_lazy_fields)
+            bound_fields = base_plan.bound_fields
+            parents = base_plan.parents
+        else:
+            parents = (base_plan,)
+
+    return fields, lazy_fields, bound_fields, parents
+
+
+def _install_fields(cls, fields, lazy_fields, bound_fields, registry):
+    if cls.__dictoffset__ == 0:
+        if lazy_fields:
+            raise InjectionNotSupported(cls)
+
+        missing = [
+            name
+            for name, _ in fields
+            if name not in bound_fields and not _is_slot(cls, name)
+        ]
+        if missing:
+            cls = _add_slots(cls, missing)
+
+    for name, dependency in lazy_fields:
+        setattr(cls, name, LazyDependency(cls, name, dependency, registry))
+    for name, dependency in fields:
+        if name in bound_fields:
+            bound = BoundDependency(cls, name, dependency, registry)
+            setattr(cls, name, bound)
+
+    return cls
+
+
+def _install_plan(cls, plan):
+    original_init = cls.__init__
+    inject = plan.inject
+
+    def __init_deps__(self):
+        inject(self)
+
+    def injectme_init(self, *args, **kwargs):
+        # the most derived marked class injects all of the dependencies,
+        # initializers of its ancestors only pass the call on
+        if type(self).__injectme_plan__ is plan:
+            inject(self)
+        original_init(self, *args, **kwargs)
+
+    cls.__original_init__ = original_init
+    cls.__init_deps__ = __init_deps__
+    cls.__injectme_plan__ = plan
+    cls.__init__ = injectme_init
+
+
+def _is_slot(cls, name):
+    return isinstance(getattr(cls, name, None), MemberDescriptorType)
+
+
+def _add_slots(cls: type, names: Iterable[str]) -> type:
+    namespace = dict(cls.__dict__)
+    slots = namespace.get("__slots__", ())
+    if isinstance(slots, str):
+        slots = (slots,)
+
+    for name in slots:
+        namespace.pop(name, None)
+    namespace.pop("__weakref__", None)
+    namespace["__slots__"] = (*slots, *names)
+    namespace["__qualname__"] = cls.__qualname__
+
+    try:
+        slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    except (TypeError, ValueError) as err:
+        raise InjectionNotSupported(cls) from err
+
+    # methods using zero-argument super() refer to the class through a cell
+    for value in namespace.values():
+        if isinstance(value, property):
+            functions = (value.fget, value.fset, value.fdel)
+        else:
+            functions = (getattr(value, "__func__", value),)
+
+        for function in functions:
+            for cell in getattr(function, "__closure__", None) or ():
+                try:
+                    if cell.cell_contents is cls:
+                        cell.cell_contents = slotted
+                except ValueError:
+                    continue
+
+    return slotted
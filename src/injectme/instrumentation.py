@@ -0,0 +1,328 @@
+import threading
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .entries import DependencyType, RegistryEntry
+
+
+class Hooks:
+    """
+    Base class for instrumentation hooks installed with
+    :meth:`injectme.DependenciesRegistry.add_hooks`.
+
+    All of the methods do nothing by default, subclasses override the ones
+    they are interested in. Hooks are called from the threads resolving the
+    dependencies, so implementations have to be thread-safe.
+    """
+
+    def on_resolve_start(self, dependency: Any) -> None:
+        """
+        Called before the dependency is resolved.
+
+        :param dependency: dependency being resolved.
+        """
+
+    def on_resolve_end(self, dependency: Any, elapsed: float) -> None:
+        """
+        Called after the dependency has been successfully resolved.
+
+        :param dependency: resolved dependency.
+        :param elapsed: duration of the resolution in seconds.
+        """
+
+    def on_factory_call(self, dependency: Any, elapsed: float) -> None:
+        """
+        Called after the factory (or lifetime wrapper of factory, e.g.
+        singleton) providing the dependency has returned.
+
+        :param dependency: dependency provided by the factory.
+        :param elapsed: duration of the call in seconds.
+        """
+
+    def on_resolve_error(self, dependency: Any, error: BaseException) -> None:
+        """
+        Called instead of :meth:`on_resolve_end` if the resolution failed.
+
+        :param dependency: dependency which failed to be resolved.
+        :param error: raised exception.
+        """
+
+    def on_inject_start(self, target: type) -> None:
+        """
+        Called before dependencies are injected into an instance of class
+        marked for injection.
+
+        :param target: class whose instance is being injected.
+        """
+
+    def on_inject_end(self, target: type, elapsed: float) -> None:
+        """
+        Called after dependencies have been injected into an instance of
+        class marked for injection, also if the injection failed.
+
+        :param target: class whose instance has been injected.
+        :param elapsed: duration of the injection in seconds.
+        """
+
+
+class HooksGroup(Hooks):
+    """
+    Hooks dispatching every event to a group of hooks.
+    """
+
+    def __init__(self, hooks: Iterable[Hooks]):
+        self.hooks = tuple(hooks)
+
+    def on_resolve_start(self, dependency):
+        for hooks in self.hooks:
+            hooks.on_resolve_start(dependency)
+
+    def on_resolve_end(self, dependency, elapsed):
+        for hooks in self.hooks:
+            hooks.on_resolve_end(dependency, elapsed)
+
+    def on_factory_call(self, dependency, elapsed):
+        for hooks in self.hooks:
+            hooks.on_factory_call(dependency, elapsed)
+
+    def on_resolve_error(self, dependency, error):
+        for hooks in self.hooks:
+            hooks.on_resolve_error(dependency, error)
+
+    def on_inject_start(self, target):
+        for hooks in self.hooks:
+            hooks.on_inject_start(target)
+
+    def on_inject_end(self, target, elapsed):
+        for hooks in self.hooks:
+            hooks.on_inject_end(target, elapsed)
+
+
+def resolve(dependency: Any, entry: RegistryEntry, hooks: Hooks) -> Any:
+    """
+    Resolve synchronous registry entry reporting events to hooks.
+    """
+    hooks.on_resolve_start(dependency)
+    start = perf_counter()
+    if entry.dependency_type is DependencyType.INSTANCE:
+        value = entry.dependency_value
+    else:
+        try:
+            value = entry.provider()
+        except BaseException as err:
+            hooks.on_resolve_error(dependency, err)
+            raise
+        hooks.on_factory_call(dependency, perf_counter() - start)
+    hooks.on_resolve_end(dependency, perf_counter() - start)
+    return value
+
+
+async def resolve_async(
+    dependency: Any, entry: RegistryEntry, hooks: Hooks
+) -> Any:
+    """
+    Resolve registry entry, awaiting async factories, reporting events to
+    hooks.
+    """
+    hooks.on_resolve_start(dependency)
+    start = perf_counter()
+    if entry.dependency_type is DependencyType.INSTANCE:
+        value = entry.dependency_value
+    else:
+        try:
+            value = entry.provider()
+            if entry.is_async:
+                value = await value
+        except BaseException as err:
+            hooks.on_resolve_error(dependency, err)
+            raise
+        hooks.on_factory_call(dependency, perf_counter() - start)
+    hooks.on_resolve_end(dependency, perf_counter() - start)
+    return value
+
+
+def timed_factory(
+    dependency: Any, factory: Callable, hooks: Hooks
+) -> Callable[..., Any]:
+    """
+    Wrap factory reporting its calls to hooks.
+    """
+
+    def call(*args, **kwargs):
+        hooks.on_resolve_start(dependency)
+        start = perf_counter()
+        try:
+            value = factory(*args, **kwargs)
+        except BaseException as err:
+            hooks.on_resolve_error(dependency, err)
+            raise
+        elapsed = perf_counter() - start
+        hooks.on_factory_call(dependency, elapsed)
+        hooks.on_resolve_end(dependency, elapsed)
+        return value
+
+    return call
+
+
+DEFAULT_BUCKETS = (
+    0.000001,
+    0.00001,
+    0.0001,
+    0.001,
+    0.01,
+    0.1,
+    1.0,
+    10.0,
+)
+
+
+class Histogram:
+    """
+    Latency histogram with fixed bucket boundaries.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def as_dict(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = self.count
+        return {"buckets": buckets, "count": self.count, "sum": self.sum}
+
+
+def dependency_name(dependency: Any) -> str:
+    """
+    Get readable name of dependency.
+
+    :param dependency: dependency to be named.
+    :return: qualified name of classes, ``str()`` of other dependencies.
+    """
+    if isinstance(dependency, type):
+        return f"{dependency.__module__}.{dependency.__qualname__}"
+
+    return str(dependency)
+
+
+class ResolutionMetrics(Hooks):
+    """
+    Hooks collecting per-dependency resolution counters and latency
+    histograms.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._resolutions: Dict[Any, Histogram] = {}
+        self._factory_calls: Dict[Any, Histogram] = {}
+
+    def on_resolve_end(self, dependency, elapsed):
+        with self._lock:
+            histogram = self._resolutions.get(dependency)
+            if histogram is None:
+                histogram = Histogram(self.buckets)
+                self._resolutions[dependency] = histogram
+            histogram.observe(elapsed)
+
+    def on_factory_call(self, dependency, elapsed):
+        with self._lock:
+            histogram = self._factory_calls.get(dependency)
+            if histogram is None:
+                histogram = Histogram(self.buckets)
+                self._factory_calls[dependency] = histogram
+            histogram.observe(elapsed)
+
+    def reset(self) -> None:
+        """
+        Drop all of the collected metrics.
+        """
+        with self._lock:
+            self._resolutions = {}
+            self._factory_calls = {}
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Export collected metrics.
+
+        :return: dictionary mapping dependency names to their resolution and
+            factory call histograms.
+        """
+        with self._lock:
+            metrics = {}
+            for kind, histograms in (
+                ("resolutions", self._resolutions),
+                ("factory_calls", self._factory_calls),
+            ):
+                for dependency, histogram in histograms.items():
+                    name = dependency_name(dependency)
+                    metrics.setdefault(name, {})[kind] = histogram.as_dict()
+
+            return metrics
+
+    def to_prometheus(self, prefix: str = "injectme") -> str:
+        """
+        Export collected metrics in Prometheus text exposition format.
+
+        :param prefix: prefix of exported metric names.
+        :return: metrics in Prometheus text format.
+        """
+        metrics = self.as_dict()
+        lines: List[str] = []
+        for kind, metric in (
+            ("resolutions", "resolve_duration_seconds"),
+            ("factory_calls", "factory_duration_seconds"),
+        ):
+            name = f"{prefix}_{metric}"
+            lines.append(f"# TYPE {name} histogram")
+            for dependency, histograms in sorted(metrics.items()):
+                histogram = histograms.get(kind)
+                if histogram is None:
+                    continue
+                label = _escape_label(dependency)
+                for bound, count in histogram["buckets"].items():
+                    lines.append(
+                        f'{name}_bucket{{dependency="{label}",le="{bound}"}}'
+                        f" {count}"
+                    )
+                lines.append(
+                    f'{name}_sum{{dependency="{label}"}} {histogram["sum"]}'
+                )
+                lines.append(
+                    f'{name}_count{{dependency="{label}"}} '
+                    f'{histogram["count"]}'
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def group(hooks: Tuple[Hooks, ...]) -> Optional[Hooks]:
+    """
+    Combine installed hooks into a single object.
+
+    :param hooks: installed hooks.
+    :return: ``None`` if there are no hooks, the hooks object if there's only
+        one, :class:`HooksGroup` otherwise.
+    """
+    if not hooks:
+        return None
+    if len(hooks) == 1:
+        return hooks[0]
+    return HooksGroup(hooks)
@@ -0,0 +1,168 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+from .errors import KeyRequired
+from .graph import resolve_arguments
+from .lifetimes import reset_in_child
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class CacheStats(NamedTuple):
+    """
+    Counters of the cache of keyed dependency.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+# pylint: disable-next=too-many-instance-attributes
+class KeyedFactory:
+    """
+    Factory wrapper creating instances of the dependency for keys and caching
+    them in a bounded LRU cache.
+
+    The factory receives the key as its first argument; its other parameters
+    are resolved from the registry. Least recently used instances are evicted
+    once there are more than ``max_size`` of them, and instances older than
+    ``ttl`` seconds are created again on the next request.
+    """
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        registry,
+        dependency: Any,
+        factory: Callable[..., Any],
+        parameters: Tuple = (),
+        max_size: Optional[int] = 128,
+        ttl: Optional[float] = None,
+        dispose: Optional[Callable[[Any], Any]] = None,
+    ):
+        if max_size is not None and max_size < 1:
+            raise ValueError("max_size has to be positive")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl has to be positive")
+
+        self.registry = registry
+        self.dependency = dependency
+        self.factory = factory
+        self.parameters = parameters
+        self.max_size = max_size
+        self.ttl = ttl
+        self.dispose = dispose
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        reset_in_child(self._reset)
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        Current counters of the cache.
+        """
+        with self._lock:
+            return CacheStats(
+                self._hits, self._misses, self._evictions, len(self._cache)
+            )
+
+    def __call__(self, key: Any = _MISSING) -> Any:
+        if key is _MISSING:
+            raise KeyRequired(self.dependency)
+
+        expired = _MISSING
+        with self._lock:
+            cached = self._cache.get(key, _MISSING)
+            if cached is not _MISSING:
+                expires, value = cached
+                if expires is None or expires > time.monotonic():
+                    self._cache.move_to_end(key)
+                    self._hits += 1
+                    return value
+
+                del self._cache[key]
+                self._evictions += 1
+                expired = value
+            self._misses += 1
+
+        self._dispose([] if expired is _MISSING else [expired])
+        value = self._create(key)
+
+        evicted = []
+        with self._lock:
+            cached = self._cache.get(key, _MISSING)
+            if cached is not _MISSING:
+                # created concurrently by another thread, keep the first one
+                self._cache.move_to_end(key)
+                evicted.append(value)
+                value = cached[1]
+            else:
+                expires = None
+                if self.ttl is not None:
+                    expires = time.monotonic() + self.ttl
+                self._cache[key] = (expires, value)
+                while (
+                    self.max_size is not None
+                    and len(self._cache) > self.max_size
+                ):
+                    _, (_, oldest) = self._cache.popitem(last=False)
+                    self._evictions += 1
+                    evicted.append(oldest)
+
+        self._dispose(evicted)
+        return value
+
+    def _create(self, key):
+        positional, keyword = resolve_arguments(
+            self.registry, self.parameters, key
+        )
+        return self.factory(*positional, **keyword)
+
+    def _reset(self):
+        # cached instances belong to the parent process, so the child creates
+        # its own ones
+        self._cache = OrderedDict()
+        # the lock might have been held by another thread of the parent
+        self._lock = threading.Lock()
+
+    def evict(self, key: Any) -> None:
+        """
+        Drop the instance created for the key from the cache.
+
+        :param key: key of the instance.
+        """
+        with self._lock:
+            cached = self._cache.pop(key, _MISSING)
+
+        if cached is not _MISSING:
+            self._dispose([cached[1]])
+
+    def clear(self) -> None:
+        """
+        Drop all of the cached instances, keeping the counters.
+        """
+        with self._lock:
+            evicted = [value for _, value in self._cache.values()]
+            self._cache.clear()
+
+        self._dispose(evicted)
+
+    def _dispose(self, instances):
+        if self.dispose is None or not instances:
+            return
+
+        logger.debug(
+            "disposing %d instances of %s", len(instances), self.dependency
+        )
+        for instance in instances:
+            self.dispose(instance)
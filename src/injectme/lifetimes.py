@@ -0,0 +1,253 @@
+import gc
+import os
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional, Set
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
+
+_NOT_CREATED = object()
+
+_reset_in_child: Set[weakref.WeakMethod] = set()
+
+
+def reset_in_child(method: Callable[[], Any]) -> None:
+    """
+    Call the method in processes forked from this one, for as long as its
+    object is alive, e.g. to drop state which can't be shared with the
+    parent process.
+
+    :param method: bound method resetting state of its object.
+    """
+    _reset_in_child.add(weakref.WeakMethod(method, _reset_in_child.discard))
+
+
+def _after_fork_in_child():
+    for reference in list(_reset_in_child):
+        method = reference()
+        if method is not None:
+            method()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class Singleton:
+    """
+    Factory wrapper creating the dependency once, on first call.
+
+    Creation is guarded by a lock, so concurrent first calls never construct
+    the dependency twice. Once created, the instance is returned without
+    taking the lock.
+    """
+
+    __slots__ = ("factory", "_instance", "_future", "_lock")
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+        self._instance = _NOT_CREATED
+        self._future: Optional["Future"] = None
+        self._lock = threading.Lock()
+
+    @property
+    def created(self) -> bool:
+        """
+        Check if the dependency has already been created.
+
+        :return: ``True`` if the factory has already been called.
+        """
+        return self._instance is not _NOT_CREATED
+
+    def __call__(self) -> Any:
+        instance = self._instance
+        if instance is _NOT_CREATED:
+            with self._lock:
+                instance = self._instance
+                if instance is _NOT_CREATED:
+                    instance = self._create()
+
+        return instance
+
+    def _create(self):
+        # has to be called with the lock held
+        future = self._future
+        self._future = None
+        # creation submitted to an executor which hasn't started it yet is
+        # taken over, so callers never wait for a busy executor
+        if future is not None and not future.cancel():
+            instance = future.result()
+        else:
+            instance = self.factory()
+        self._instance = instance
+        return instance
+
+    def submit(
+        self,
+        executor: "Executor",
+        factory: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Optional["Future"]:
+        """
+        Create the dependency in the executor, unless it has already been
+        created. Calls made in the meantime wait for the submitted creation
+        instead of calling the factory again; the result has to be passed
+        to :meth:`prime`.
+
+        :param executor: executor which should create the dependency.
+        :param factory: callable creating the dependency from the arguments.
+        :param args: positional arguments of the factory.
+        :param kwargs: keyword arguments of the factory.
+        :return: future of the created instance, ``None`` if the dependency
+            has already been created.
+        """
+        with self._lock:
+            if self._instance is not _NOT_CREATED:
+                return None
+            future = executor.submit(factory, *args, **kwargs)
+            self._future = future
+            return future
+
+    def prime(self, instance: Any) -> None:
+        """
+        Set the instance created outside of this wrapper, unless the
+        dependency has already been created.
+
+        :param instance: created instance of dependency.
+        """
+        with self._lock:
+            if self._instance is _NOT_CREATED:
+                self._instance = instance
+                self._future = None
+
+
+class ProcessSingleton(Singleton):
+    """
+    Factory wrapper creating the dependency once per process.
+
+    Instance created before ``os.fork`` is dropped in the child process,
+    which creates its own one on first call. The parent keeps its instance.
+    """
+
+    __slots__ = ("__weakref__",)
+
+    def __init__(self, factory: Callable[[], Any]):
+        super().__init__(factory)
+        reset_in_child(self._reset)
+
+    def _reset(self):
+        self._instance = _NOT_CREATED
+        self._future = None
+        # the lock might have been held by another thread of the parent
+        self._lock = threading.Lock()
+
+
+class WeakSingleton:
+    """
+    Factory wrapper sharing the dependency for as long as it's referenced.
+
+    The created instance is held by a weak reference only, so it lives while
+    at least one of the objects it has been injected into (or anything else)
+    references it. Once it has been garbage collected, the next call creates
+    a new instance. The instance has to support weak references.
+    """
+
+    __slots__ = ("factory", "_reference", "_lock")
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+        self._reference = None
+        self._lock = threading.Lock()
+
+    @property
+    def created(self) -> bool:
+        """
+        Check if the shared instance is alive.
+
+        :return: ``True`` if the instance has been created and hasn't been
+            garbage collected yet.
+        """
+        reference = self._reference
+        return reference is not None and reference() is not None
+
+    def __call__(self) -> Any:
+        reference = self._reference
+        instance = reference() if reference is not None else None
+        if instance is None:
+            with self._lock:
+                reference = self._reference
+                if reference is not None:
+                    instance = reference()
+                if instance is None:
+                    instance = self.factory()
+                    try:
+                        self._reference = weakref.ref(instance)
+                    except TypeError:
+                        raise TypeError(
+                            f"{type(instance).__name__!r} instances don't "
+                            "support weak references, add '__weakref__' "
+                            "to their __slots__"
+                        ) from None
+
+        return instance
+
+
+class AsyncSingleton:
+    """
+    Async factory wrapper creating the dependency once, on first await.
+
+    Concurrent first requests await the same task, so the factory is never
+    awaited twice. If the factory fails, the next request retries.
+    """
+
+    __slots__ = ("factory", "_instance", "_task")
+
+    def __init__(self, factory: Callable[[], Awaitable[Any]]):
+        self.factory = factory
+        self._instance = _NOT_CREATED
+        self._task = None
+
+    @property
+    def created(self) -> bool:
+        """
+        Check if the dependency has already been created.
+
+        :return: ``True`` if the factory has already been awaited.
+        """
+        return self._instance is not _NOT_CREATED
+
+    async def __call__(self) -> Any:
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        instance = self._instance
+        if instance is not _NOT_CREATED:
+            return instance
+
+        task = self._task
+        if task is None:
+            task = asyncio.ensure_future(self.factory())
+            self._task = task
+
+        try:
+            instance = await asyncio.shield(task)
+        except Exception:
+            if task.done() and self._task is task:
+                self._task = None
+            raise
+
+        self._instance = instance
+        self._task = None
+        return instance
+
+
+def freeze_gc() -> None:
+    """
+    Move all objects tracked by the garbage collector to the permanent
+    generation, if the interpreter supports it.
+    """
+    freeze = getattr(gc, "freeze", None)
+    if freeze is not None:
+        gc.collect()
+        freeze()
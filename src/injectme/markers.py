@@ -0,0 +1,97 @@
+from typing import Any, NamedTuple, Tuple
+
+
+# pylint: disable-next=too-few-public-methods
+class Lazy:
+    """
+    Marker for dependencies which should be resolved on first access instead
+    of during object's initialization.
+
+    Use it as ``typing.Annotated`` metadata, e.g.
+    ``Annotated[Service, Lazy()]``.
+    """
+
+    def __repr__(self):
+        return "Lazy()"
+
+
+class Key:
+    """
+    Marker selecting instance of dependency registered with a keyed factory.
+
+    Use it as ``typing.Annotated`` metadata, e.g.
+    ``Annotated[Client, Key("eu-west")]``.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __eq__(self, other):
+        if not isinstance(other, Key):
+            return NotImplemented
+        return self.value == other.value
+
+    def __hash__(self):
+        return hash((Key, self.value))
+
+    def __repr__(self):
+        return f"Key({self.value!r})"
+
+
+class KeyedDependency(NamedTuple):
+    """
+    Registry key of dependency registered with a keyed factory, requested
+    for a single key.
+    """
+
+    dependency: Any
+    key: Any
+
+
+def split_annotation(annotation: Any) -> Tuple[Any, Tuple[Any, ...]]:
+    """
+    Split ``typing.Annotated`` annotation into underlying type and metadata.
+
+    :param annotation: annotation to be split.
+    :return: tuple of annotated type and its metadata. Annotations which are
+        not ``Annotated`` have no metadata.
+    """
+    metadata = getattr(annotation, "__metadata__", None)
+    if metadata is None:
+        return annotation, ()
+
+    return annotation.__origin__, metadata
+
+
+def is_lazy(annotation: Any) -> bool:
+    """
+    Check if annotation marks a dependency as lazy.
+
+    :param annotation: annotation to be checked.
+    :return: ``True`` if the annotation contains :class:`Lazy` marker.
+    """
+    _, metadata = split_annotation(annotation)
+    return any(isinstance(meta, Lazy) for meta in metadata)
+
+
+def dependency_key(annotation: Any) -> Any:
+    """
+    Get the registry key of dependency described by the annotation.
+
+    :param annotation: annotation of the injected attribute.
+    :return: annotation stripped of injectme's markers, or
+        :class:`KeyedDependency` if it contains :class:`Key` marker.
+    """
+    origin, metadata = split_annotation(annotation)
+    if not metadata or not all(
+        isinstance(meta, (Lazy, Key)) for meta in metadata
+    ):
+        return annotation
+
+    keys = [meta for meta in metadata if isinstance(meta, Key)]
+    if keys:
+        return KeyedDependency(origin, keys[-1].value)
+
+    return origin
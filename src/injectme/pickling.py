@@ -0,0 +1,164 @@
+import copyreg
+import functools
+import logging
+from typing import Any, Callable, Union
+
+from .deferred import import_object
+
+logger = logging.getLogger(__name__)
+
+
+def install_pickling(cls: type, plan) -> None:
+    """
+    Make instances of the class marked for injection pickle only their own
+    state. Injected attributes are left out and resolved again, from the
+    registry of the unpickling process, when the instance is unpickled.
+
+    ``__getstate__`` and ``__setstate__`` defined by the class are kept and
+    called by the installed ones.
+
+    :param cls: class marked for injection.
+    :param plan: injection plan of the class.
+    """
+    getstate = _original(cls, "__getstate__")
+    setstate = _original(cls, "__setstate__")
+    names = plan.injected_names
+    inject = plan.inject
+
+    def __getstate__(self):
+        if getstate is not None:
+            state = getstate(self)
+        else:
+            state = _default_state(self)
+
+        state = _without(state, names)
+        if not state:
+            # protocols 0 and 1 don't call __setstate__ for empty states
+            return _EmptyState(state)
+
+        return state
+
+    def __setstate__(self, state):
+        if isinstance(state, _EmptyState):
+            state = state.state
+
+        # like __init__, only the most derived marked class injects
+        if type(self).__injectme_plan__ is plan:
+            inject(self)
+
+        if setstate is not None:
+            setstate(self, state)
+        else:
+            _restore_state(self, state)
+
+    __getstate__.__injectme_original__ = getstate
+    __setstate__.__injectme_original__ = setstate
+    cls.__getstate__ = __getstate__
+    cls.__setstate__ = __setstate__
+
+
+class _EmptyState:  # pylint: disable=too-few-public-methods
+    """
+    Empty state of an instance whose attributes are all injected.
+    """
+
+    __slots__ = ("state",)
+
+    def __init__(self, state: Any):
+        self.state = state
+
+    def __reduce__(self):
+        return _EmptyState, (self.state,)
+
+
+def _original(cls, name):
+    method = getattr(cls, name, None)
+    if method is None or method is getattr(object, name, None):
+        return None
+
+    # methods installed for marked ancestors are replaced, not wrapped
+    return getattr(method, "__injectme_original__", method)
+
+
+def _default_state(instance):
+    state = getattr(instance, "__dict__", None)
+    slots = {}
+    # pylint: disable-next=protected-access
+    for name in copyreg._slotnames(type(instance)):
+        try:
+            slots[name] = getattr(instance, name)
+        except AttributeError:
+            pass
+
+    if slots:
+        return state, slots
+
+    return state
+
+
+def _without(state, names):
+    if isinstance(state, dict):
+        return {
+            name: value for name, value in state.items() if name not in names
+        }
+    if isinstance(state, tuple) and len(state) == 2:
+        return tuple(_without(part, names) for part in state)
+
+    return state
+
+
+def _restore_state(instance, state):
+    slots = None
+    if isinstance(state, tuple) and len(state) == 2:
+        state, slots = state
+
+    if state:
+        instance.__dict__.update(state)
+    if slots:
+        for name, value in slots.items():
+            setattr(instance, name, value)
+
+
+def worker_initializer(
+    configure: Union[Callable[[], Any], str, None] = None,
+    injector: Union[Any, str, None] = None,
+) -> Callable[[], None]:
+    """
+    Create initializer of worker processes, e.g. for the ``initializer``
+    argument of ``concurrent.futures.ProcessPoolExecutor``.
+
+    Each worker calls ``configure`` to register dependencies, unless it has
+    inherited an already populated registry from its parent through
+    ``fork``, and then warms the injector up, creating per-process
+    dependencies of the worker.
+
+    :param configure: function registering dependencies or its
+        ``"package.module:name"`` path.
+    :param injector: ``Injector`` whose registry should be configured or its
+        ``"package.module:name"`` path, the one used by :func:`inject` if not
+        specified. With the ``spawn`` start method, pass a path.
+    :return: picklable initializer to be called in each worker.
+    """
+    return functools.partial(_initialize_worker, configure, injector)
+
+
+def _initialize_worker(
+    configure: Union[Callable[[], Any], str, None],
+    injector: Union[Any, str, None],
+) -> None:
+    if isinstance(configure, str):
+        configure = import_object(configure)
+    if isinstance(injector, str):
+        injector = import_object(injector)
+    if injector is None:
+        # pylint: disable-next=import-outside-toplevel,cyclic-import
+        from .simple_api import _get_injector
+
+        injector = _get_injector()
+
+    registry = injector.registry
+    if configure is not None and not registry.entries():
+        logger.debug("configuring %s in worker process", registry)
+        configure()
+
+    injector.warm_up()
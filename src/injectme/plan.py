@@ -0,0 +1,525 @@
+import logging
+from functools import partial
+from time import perf_counter
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .errors import (
+    AsyncResolutionRequired,
+    DependencyNotFound,
+    InjectionFailure,
+    InjectionNotSupported,
+    KeyRequired,
+    PoolExhausted,
+    ScopeNotActive,
+)
+from .entries import DependencyType, RegistryEntry
+from .hints import ForwardDependency, resolve_dependency, resolve_fields
+from .instrumentation import Hooks, resolve, resolve_async
+from .markers import KeyedDependency
+from .pool import Pool, lease
+from .registry import DependenciesRegistry
+
+logger = logging.getLogger(__name__)
+
+RESOLUTION_ERRORS = (
+    AsyncResolutionRequired,
+    DependencyNotFound,
+    KeyRequired,
+    PoolExhausted,
+    ScopeNotActive,
+)
+
+
+class CompiledPlan(NamedTuple):
+    """
+    Snapshot of an injection plan bound to a single version of the registry.
+    """
+
+    version: int
+    values: Dict[str, Any]
+    update_dict: bool
+    providers: Tuple[Tuple[str, Callable[[], Any]], ...]
+    async_providers: Tuple[Tuple[str, Callable[[], Awaitable[Any]]], ...]
+    pooled: Tuple[Tuple[str, Callable[[], Any], Pool], ...] = ()
+    hooks: Optional[Hooks] = None
+
+
+# pylint: disable-next=too-many-instance-attributes
+class InjectionPlan:
+    """
+    Recipe for injecting dependencies into instances of a single class.
+
+    Annotations of the class and of its ancestors marked for injection are
+    inspected only once. String annotations which can't be evaluated when
+    the class is marked, e.g. because they refer to classes defined later,
+    are evaluated when the plan is compiled. Dependencies of ancestors
+    marked with other injectors are injected by plans of these ancestors,
+    from their registries. The registry entries they point to are bound
+    when the plan is compiled and the compiled plan is reused until the
+    registry changes. Instances of classes without
+    ``__dict__`` (i.e. with ``__slots__``) get dependencies set in their
+    slots.
+    """
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        cls: type,
+        fields: Tuple[Tuple[str, Any], ...],
+        registry: DependenciesRegistry,
+        lazy_fields: Tuple[Tuple[str, Any], ...] = (),
+        bound_fields: FrozenSet[str] = frozenset(),
+        parents: Tuple["InjectionPlan", ...] = (),
+    ):
+        self.cls = cls
+        self.declared_fields = fields
+        self.declared_lazy_fields = lazy_fields
+        self._forward = any(
+            isinstance(dependency, ForwardDependency)
+            for _, dependency in fields + lazy_fields
+        )
+        self.bound_fields = bound_fields
+        self.parents = parents
+        self.injected_names = frozenset(
+            name for name, _ in fields + lazy_fields
+        ).union(*(parent.injected_names for parent in parents))
+        self.registry = registry
+        self.has_dict = cls.__dictoffset__ != 0
+        self._compiled: Optional[CompiledPlan] = None
+        self._compiled_async: Optional[CompiledPlan] = None
+
+    @property
+    def fields(self) -> Tuple[Tuple[str, Any], ...]:
+        """
+        Names of attributes injected during initialization and their
+        dependencies, with forward references evaluated.
+        """
+        return self._resolve_forward()[0]
+
+    @property
+    def lazy_fields(self) -> Tuple[Tuple[str, Any], ...]:
+        """
+        Names of attributes resolved on first access and their dependencies,
+        with forward references evaluated.
+        """
+        return self._resolve_forward()[1]
+
+    def _resolve_forward(self):
+        if not self._forward:
+            return self.declared_fields, self.declared_lazy_fields
+
+        # string annotations registered as keys take precedence, so they
+        # are resolved again for each content of the registry
+        registry = self.registry
+        return (
+            resolve_fields(self.declared_fields, registry),
+            resolve_fields(self.declared_lazy_fields, registry),
+        )
+
+    def without(self, names: Set[str]) -> "InjectionPlan":
+        """
+        Get the plan which doesn't inject the given attributes, e.g. because
+        a subclass annotates them again.
+
+        :param names: names of attributes to be left out.
+        :return: this plan if it doesn't inject any of the attributes, its
+            copy without them otherwise.
+        """
+        parents = tuple(parent.without(names) for parent in self.parents)
+        overridden = any(
+            name in names
+            for name, _ in self.declared_fields + self.declared_lazy_fields
+        )
+        if not overridden and all(
+            parent is original
+            for parent, original in zip(parents, self.parents)
+        ):
+            return self
+
+        return InjectionPlan(
+            self.cls,
+            tuple(
+                field
+                for field in self.declared_fields
+                if field[0] not in names
+            ),
+            self.registry,
+            tuple(
+                field
+                for field in self.declared_lazy_fields
+                if field[0] not in names
+            ),
+            self.bound_fields.difference(names),
+            parents,
+        )
+
+    def validate(self) -> None:
+        """
+        Check that all of the dependencies of the class, including lazy ones,
+        have been registered.
+
+        :raises InjectionFailure: raised if any of the required dependencies
+            can't be found in the registry or if a keyed dependency is
+            requested without a key.
+        """
+        for parent in self.parents:
+            parent.validate()
+
+        registry = self.registry
+        try:
+            for _, dependency in self.fields + self.lazy_fields:
+                _get_entry(registry, dependency)
+        except RESOLUTION_ERRORS as err:
+            raise InjectionFailure(self.cls) from err
+
+    def warm_up(self) -> CompiledPlan:
+        """
+        Compile the plan which will be used to inject the dependencies:
+        asynchronous if any of the dependencies requires async resolution,
+        synchronous otherwise.
+
+        :raises InjectionFailure: raised if any of the required dependencies
+            can't be found in the registry.
+        :return: compiled plan.
+        """
+        self.validate()
+        for parent in self.parents:
+            parent.warm_up()
+
+        registry = self.registry
+        asynchronous = any(
+            registry.get_entry(dependency).is_async
+            for _, dependency in self.fields
+        )
+        return self.compile(asynchronous=asynchronous)
+
+    def compile(self, asynchronous: bool = False) -> CompiledPlan:
+        """
+        Bind the plan to the current content of the registry.
+
+        :param asynchronous: if ``True``, the plan is compiled for
+            :meth:`inject_async` and may contain async factories.
+        :raises InjectionFailure: raised if any of the required dependencies
+            can't be found in the registry or, for synchronous plans, if any
+            of them requires async resolution.
+        :raises InjectionNotSupported: raised if a dependency bound to the
+            class of instances without ``__dict__`` is provided by a factory.
+        :return: compiled plan.
+        """
+        logger.debug("compiling injection plan for %s", self.cls)
+        registry = self.registry
+        version = registry.version
+        hooks = registry.hooks
+
+        values = {}
+        providers = []
+        async_providers = []
+        pooled = []
+        try:
+            for name, dependency in self.fields:
+                entry = _get_entry(registry, dependency)
+                if name in self.bound_fields:
+                    if entry.dependency_type is DependencyType.INSTANCE:
+                        continue
+                    if not self.has_dict:
+                        raise InjectionNotSupported(self.cls)
+
+                if entry.is_async and not asynchronous:
+                    raise AsyncResolutionRequired(dependency)
+
+                provider = _provider(dependency, entry, hooks)
+                if entry.dependency_type is DependencyType.POOLED:
+                    pooled.append((name, provider, entry.provider))
+                elif (
+                    hooks is None
+                    and entry.dependency_type is DependencyType.INSTANCE
+                ):
+                    values[name] = entry.dependency_value
+                elif entry.is_async:
+                    async_providers.append((name, provider))
+                else:
+                    providers.append((name, provider))
+        except RESOLUTION_ERRORS as err:
+            raise InjectionFailure(self.cls) from err
+
+        compiled = CompiledPlan(
+            version,
+            values,
+            # values can bypass setattr only if nothing would intercept it
+            self.has_dict and _plain_attributes(self.cls, values),
+            tuple(providers),
+            tuple(async_providers),
+            tuple(pooled),
+            hooks,
+        )
+        if asynchronous:
+            self._compiled_async = compiled
+        else:
+            self._compiled = compiled
+        return compiled
+
+    def inject(self, instance: Any) -> None:
+        """
+        Set all of the dependencies on the instance.
+
+        :param instance: object to inject the dependencies into.
+        :raises InjectionFailure: raised if any of the required dependencies
+            can't be found in the registry.
+        """
+        compiled = self._compiled
+        if compiled is None or compiled.version != self.registry.version:
+            compiled = self.compile()
+
+        hooks = compiled.hooks
+        if hooks is None:
+            self._inject(instance, compiled)
+            return
+
+        hooks.on_inject_start(self.cls)
+        start = perf_counter()
+        try:
+            self._inject(instance, compiled)
+        finally:
+            hooks.on_inject_end(self.cls, perf_counter() - start)
+
+    def _inject(self, instance, compiled):
+        for parent in self.parents:
+            parent.inject(instance)
+
+        if compiled.update_dict:
+            instance.__dict__.update(compiled.values)
+        else:
+            for name, value in compiled.values.items():
+                setattr(instance, name, value)
+
+        try:
+            for name, provider in compiled.providers:
+                setattr(instance, name, provider())
+            for name, provider, pool in compiled.pooled:
+                value = provider()
+                lease(instance, pool, value)
+                setattr(instance, name, value)
+        except RESOLUTION_ERRORS as err:
+            raise InjectionFailure(self.cls) from err
+
+    async def inject_async(self, instance: Any) -> None:
+        """
+        Set all of the dependencies on the instance, awaiting async factories
+        concurrently.
+
+        :param instance: object to inject the dependencies into.
+        :raises InjectionFailure: raised if any of the required dependencies
+            can't be found in the registry.
+        """
+        compiled = self._compiled_async
+        if compiled is None or compiled.version != self.registry.version:
+            compiled = self.compile(asynchronous=True)
+
+        hooks = compiled.hooks
+        if hooks is None:
+            await self._inject_async(instance, compiled)
+            return
+
+        hooks.on_inject_start(self.cls)
+        start = perf_counter()
+        try:
+            await self._inject_async(instance, compiled)
+        finally:
+            hooks.on_inject_end(self.cls, perf_counter() - start)
+
+    async def _inject_async(self, instance, compiled):
+        for parent in self.parents:
+            await parent.inject_async(instance)
+
+        if compiled.update_dict:
+            instance.__dict__.update(compiled.values)
+        else:
+            for name, value in compiled.values.items():
+                setattr(instance, name, value)
+
+        try:
+            for name, provider in compiled.providers:
+                setattr(instance, name, provider())
+            for name, provider, pool in compiled.pooled:
+                value = provider()
+                lease(instance, pool, value)
+                setattr(instance, name, value)
+
+            async_providers = compiled.async_providers
+            if async_providers:
+                import asyncio  # pylint: disable=import-outside-toplevel
+
+                results = await asyncio.gather(
+                    *(provider() for _, provider in async_providers)
+                )
+                for (name, _), result in zip(async_providers, results):
+                    setattr(instance, name, result)
+        except RESOLUTION_ERRORS as err:
+            raise InjectionFailure(self.cls) from err
+
+
+def _get_entry(
+    registry: DependenciesRegistry, dependency: Any
+) -> RegistryEntry:
+    """
+    Get entry of the dependency requested by an injected attribute.
+
+    :param registry: registry the dependency is looked up in.
+    :param dependency: requested dependency.
+    :raises DependencyNotFound: raised if the dependency has not been
+        registered.
+    :raises KeyRequired: raised if the dependency is registered with a keyed
+        factory, but requested without a key.
+    :return: registry entry of the dependency.
+    """
+    entry = registry.get_entry(dependency)
+    if entry.dependency_type is DependencyType.KEYED and not isinstance(
+        dependency, KeyedDependency
+    ):
+        raise KeyRequired(dependency)
+
+    return entry
+
+
+def _provider(
+    dependency: Any, entry: RegistryEntry, hooks: Optional[Hooks]
+) -> Callable[[], Any]:
+    """
+    Get provider of the dependency, reporting its resolution to the hooks.
+
+    :param dependency: requested dependency.
+    :param entry: registry entry of the dependency.
+    :param hooks: instrumentation hooks of the registry, if any.
+    :return: provider of dependency instances.
+    """
+    if hooks is None:
+        return entry.provider
+    if entry.is_async:
+        return partial(resolve_async, dependency, entry, hooks)
+    return partial(resolve, dependency, entry, hooks)
+
+
+def _plain_attributes(cls: type, names) -> bool:
+    """
+    Check if setting the attributes on instances of the class only stores
+    them in the instance's ``__dict__``.
+
+    :param cls: class of the instances.
+    :param names: names of the attributes.
+    :return: ``False`` if the class customizes ``__setattr__`` or any of the
+        attributes is a data descriptor, e.g. a property.
+    """
+    if cls.__setattr__ is not object.__setattr__:
+        return False
+
+    for name in names:
+        for klass in cls.__mro__:
+            if name in klass.__dict__:
+                attribute = type(klass.__dict__[name])
+                if hasattr(attribute, "__set__") or hasattr(
+                    attribute, "__delete__"
+                ):
+                    return False
+                break
+
+    return True
+
+
+# pylint: disable-next=too-few-public-methods
+class LazyDependency:
+    """
+    Descriptor resolving the dependency on first attribute access.
+
+    Resolved dependency is stored in the instance's ``__dict__`` which
+    shadows the descriptor, so following accesses are plain attribute reads.
+    """
+
+    def __init__(
+        self,
+        cls: type,
+        name: str,
+        dependency: Any,
+        registry: DependenciesRegistry,
+    ):
+        self.cls = cls
+        self.name = name
+        self.dependency = dependency
+        self.registry = registry
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        if instance is None:
+            return self
+
+        registry = self.registry
+        dependency = resolve_dependency(self.dependency, registry)
+        try:
+            value = registry.get(dependency)
+            entry = registry.get_entry(dependency)
+        except RESOLUTION_ERRORS as err:
+            raise InjectionFailure(self.cls) from err
+
+        if entry.dependency_type is DependencyType.POOLED:
+            lease(instance, entry.provider, value)
+
+        instance.__dict__[self.name] = value
+        return value
+
+
+# pylint: disable-next=too-few-public-methods
+class BoundDependency:
+    """
+    Descriptor reading dependency registered as an instance from the registry.
+
+    Instances don't store such dependencies at all. Dependencies provided by
+    factories are set in the instance's ``__dict__`` by the injection plan,
+    which shadows the descriptor.
+    """
+
+    def __init__(
+        self,
+        cls: type,
+        name: str,
+        dependency: Any,
+        registry: DependenciesRegistry,
+    ):
+        self.cls = cls
+        self.name = name
+        self.dependency = dependency
+        self.registry = registry
+        self._cached: Tuple[int, Any] = (-1, None)
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        if instance is None:
+            return self
+
+        registry = self.registry
+        version = registry.version
+        cached_version, value = self._cached
+        if cached_version == version:
+            return value
+
+        dependency = resolve_dependency(self.dependency, registry)
+        try:
+            entry = registry.get_entry(dependency)
+            if entry.dependency_type is not DependencyType.INSTANCE:
+                # registered again with a factory since the injection
+                value = registry.get(dependency)
+                if self.cls.__dictoffset__ != 0:
+                    instance.__dict__[self.name] = value
+                return value
+        except RESOLUTION_ERRORS as err:
+            raise InjectionFailure(self.cls) from err
+
+        value = entry.dependency_value
+        self._cached = (version, value)
+        return value
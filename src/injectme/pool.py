@@ -0,0 +1,248 @@
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .errors import InjectionNotSupported, PoolExhausted
+from .lifetimes import reset_in_child
+
+logger = logging.getLogger(__name__)
+
+_EMPTY = object()
+
+_leases: Dict[int, List[weakref.finalize]] = {}
+
+
+# pylint: disable-next=too-many-instance-attributes
+class Pool:
+    """
+    Factory wrapper reusing released instances of the dependency.
+
+    Instances are checked out with :meth:`acquire` and checked in with
+    :meth:`release`. The most recently released instance is reused first, so
+    the remaining ones can stay idle long enough to be evicted.
+    """
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        dependency: Any,
+        factory: Callable[[], Any],
+        min_size: int = 0,
+        max_size: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        timeout: Optional[float] = None,
+        dispose: Optional[Callable[[Any], Any]] = None,
+    ):
+        if min_size < 0:
+            raise ValueError("min_size can't be negative")
+        if max_size is not None and max_size < max(min_size, 1):
+            raise ValueError("max_size has to be positive and >= min_size")
+
+        self.dependency = dependency
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.dispose = dispose
+        self._idle: deque = deque()
+        self._in_use = 0
+        self._condition = threading.Condition()
+        reset_in_child(self._reset)
+
+    @property
+    def idle(self) -> int:
+        """
+        Number of instances waiting in the pool.
+        """
+        return len(self._idle)
+
+    @property
+    def in_use(self) -> int:
+        """
+        Number of instances checked out of the pool.
+        """
+        return self._in_use
+
+    def acquire(self) -> Any:
+        """
+        Check out an idle instance or create a new one.
+
+        :raises PoolExhausted: raised if ``max_size`` instances are checked
+            out and none of them has been released within ``timeout``.
+        :return: instance of dependency.
+        """
+        condition = self._condition
+        with condition:
+            evicted = self._evict()
+            deadline = None
+            if self.timeout is not None:
+                deadline = time.monotonic() + self.timeout
+
+            while not self._idle and self._is_full():
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhausted(self.dependency)
+                condition.wait(remaining)
+
+            self._in_use += 1
+            instance = self._idle.pop()[0] if self._idle else _EMPTY
+
+        self._dispose(evicted)
+        if instance is not _EMPTY:
+            return instance
+
+        try:
+            return self.factory()
+        except BaseException:
+            with condition:
+                self._in_use -= 1
+                condition.notify()
+            raise
+
+    __call__ = acquire
+
+    def release(self, instance: Any) -> None:
+        """
+        Check the instance back into the pool.
+
+        :param instance: instance returned by :meth:`acquire`.
+        """
+        with self._condition:
+            self._in_use -= 1
+            self._idle.append((instance, time.monotonic()))
+            evicted = self._evict()
+            self._condition.notify()
+
+        self._dispose(evicted)
+
+    def fill(self) -> None:
+        """
+        Create instances until the pool holds at least ``min_size`` of them.
+        """
+        while True:
+            with self._condition:
+                if len(self._idle) + self._in_use >= self.min_size:
+                    return
+
+            instance = self.factory()
+            with self._condition:
+                self._idle.append((instance, time.monotonic()))
+                self._condition.notify()
+
+    def clear(self) -> None:
+        """
+        Drop all of the idle instances.
+        """
+        with self._condition:
+            evicted = [instance for instance, _ in self._idle]
+            self._idle.clear()
+
+        self._dispose(evicted)
+
+    def _reset(self):
+        # instances created by the parent process still belong to it, e.g.
+        # connections can't be used by both, so they're dropped without
+        # being disposed
+        self._idle = deque()
+        self._in_use = 0
+        # the condition might have been held by another thread of the parent
+        self._condition = threading.Condition()
+
+    def _is_full(self) -> bool:
+        return self.max_size is not None and self._in_use >= self.max_size
+
+    def _evict(self) -> List[Any]:
+        idle_timeout = self.idle_timeout
+        if idle_timeout is None:
+            return []
+
+        idle = self._idle
+        threshold = time.monotonic() - idle_timeout
+        evicted = []
+        while len(idle) > self.min_size and idle[0][1] <= threshold:
+            evicted.append(idle.popleft()[0])
+
+        return evicted
+
+    def _dispose(self, instances: List[Any]) -> None:
+        if instances:
+            logger.debug(
+                "evicting %d instances of %s", len(instances), self.dependency
+            )
+
+        if self.dispose is not None:
+            for instance in instances:
+                self.dispose(instance)
+
+
+def lease(owner: Any, pool: Pool, instance: Any) -> None:
+    """
+    Return the instance to the pool when the owner is released or garbage
+    collected.
+
+    :param owner: object holding the instance.
+    :param pool: pool the instance has been acquired from.
+    :param instance: acquired instance.
+    :raises InjectionNotSupported: raised if the owner doesn't support weak
+        references, e.g. its class defines ``__slots__`` without
+        ``__weakref__``.
+    """
+    key = id(owner)
+    try:
+        finalizer = weakref.finalize(owner, _return, key, pool, instance)
+    except TypeError as err:
+        pool.release(instance)
+        raise InjectionNotSupported(type(owner)) from err
+
+    _leases.setdefault(key, []).append(finalizer)
+
+
+def _return(key: int, pool: Pool, instance: Any) -> None:
+    _leases.pop(key, None)
+    pool.release(instance)
+
+
+def _after_fork_in_child():
+    # instances leased in the parent process don't return to the pools of
+    # the child
+    for finalizers in list(_leases.values()):
+        for finalizer in finalizers:
+            finalizer.detach()
+    _leases.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def release(owner: Any) -> None:
+    """
+    Return all of the pooled dependencies injected into the owner to their
+    pools.
+
+    :param owner: object with injected dependencies.
+    """
+    for finalizer in _leases.pop(id(owner), ()):
+        finalizer()
+
+
+@contextmanager
+def releasing(owner: Any) -> Iterator[Any]:
+    """
+    Context manager calling :func:`release` on the owner at exit.
+
+    :param owner: object with injected dependencies.
+    :return: the owner.
+    """
+    try:
+        yield owner
+    finally:
+        release(owner)
@@ -0,0 +1,122 @@
+from typing import Any, Callable, Optional
+
+from .deferred import DeferredFactory
+from .entries import ASYNC_DEPENDENCY_TYPES, DependencyType, RegistryEntry
+from .graph import AsyncGraphFactory, GraphFactory, factory_dependencies
+from .lifetimes import (
+    AsyncSingleton,
+    ProcessSingleton,
+    Singleton,
+    WeakSingleton,
+)
+from .pool import Pool
+from .scope import Scoped
+
+
+def factory_entry(
+    registry,
+    dependency: Any,
+    factory: Any,
+    dependency_type: DependencyType,
+    dispose: Optional[Callable[[Any], Any]] = None,
+    **options: Any,
+) -> RegistryEntry:
+    """
+    Create entry of the factory, wrapping it with the provider managing
+    lifetime of its instances.
+
+    :param registry: registry the dependencies of the factory are resolved
+        from.
+    :param dependency: registered dependency.
+    :param factory: factory of dependency instances or path to it.
+    :param dependency_type: type of the registration.
+    :param dispose: callable disposing instances which are no longer used.
+    :param options: options of the provider, e.g. size of the pool.
+    :return: entry to be registered.
+    """
+    if dependency_type is DependencyType.KEYED:
+        # pylint: disable-next=import-outside-toplevel
+        from .keyed import KeyedFactory
+
+        parameters = factory_dependencies(factory, skip=1, registry=registry)
+        provider = KeyedFactory(
+            registry,
+            dependency,
+            factory,
+            parameters,
+            dispose=dispose,
+            **options,
+        )
+        return RegistryEntry.factory(
+            factory, dependency_type, provider, parameters
+        )
+
+    if isinstance(factory, str):
+        factory = DeferredFactory(
+            registry,
+            dependency,
+            factory,
+            asynchronous=dependency_type in ASYNC_DEPENDENCY_TYPES,
+        )
+        parameters = ()
+    else:
+        parameters = factory_dependencies(factory, registry=registry)
+
+    provider = factory
+    if parameters and dependency_type in ASYNC_DEPENDENCY_TYPES:
+        provider = AsyncGraphFactory(registry, dependency, factory, parameters)
+    elif parameters:
+        provider = GraphFactory(registry, dependency, factory, parameters)
+
+    if dependency_type is DependencyType.SINGLETON:
+        provider = Singleton(provider)
+    elif dependency_type is DependencyType.PER_PROCESS:
+        provider = ProcessSingleton(provider)
+    elif dependency_type is DependencyType.OWNED:
+        provider = WeakSingleton(provider)
+    elif dependency_type is DependencyType.ASYNC_SINGLETON:
+        provider = AsyncSingleton(provider)
+    elif dependency_type is DependencyType.SCOPED:
+        provider = Scoped(dependency, provider, dispose)
+    elif dependency_type is DependencyType.POOLED:
+        provider = Pool(dependency, provider, dispose=dispose, **options)
+
+    return RegistryEntry.factory(
+        factory, dependency_type, provider, parameters
+    )
+
+
+def rebind_entry(
+    registry, dependency: Any, entry: RegistryEntry
+) -> RegistryEntry:
+    """
+    Create copy of the parent's factory entry resolving its dependencies
+    from the child registry, so the factory sees the child's overrides.
+
+    :param registry: child registry.
+    :param dependency: registered dependency.
+    :param entry: entry of the parent registry.
+    :return: entry to be published by the child registry, the parent's one
+        if the factory doesn't have any dependencies.
+    """
+    factory = entry.dependency_value
+    if isinstance(factory, DeferredFactory):
+        # dependencies aren't known until the factory is imported
+        factory = factory.bind(registry)
+        return RegistryEntry.factory(factory, entry.dependency_type, factory)
+
+    if not entry.dependencies:
+        return entry
+
+    if entry.is_async:
+        provider = AsyncGraphFactory(
+            registry, dependency, factory, entry.dependencies
+        )
+    else:
+        provider = GraphFactory(
+            registry, dependency, factory, entry.dependencies
+        )
+
+    return RegistryEntry.factory(
+        factory, entry.dependency_type, provider, entry.dependencies
+    )
@@ -1,51 +1,179 @@
 import logging
-from dataclasses import dataclass
-from enum import Enum
-from typing import Any, Callable
+import threading
+import weakref
+from collections import ChainMap
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Union,
+)
 
-from .errors import DependencyNotFound, DependencyAlreadyRegistered
+from . import instrumentation
+from .entries import (
+    ASYNC_DEPENDENCY_TYPES,
+    SHARED_DEPENDENCY_TYPES,
+    DependencyType,
+    RegistryEntry,
+)
+from .errors import (
+    AsyncResolutionRequired,
+    CircularDependency,
+    DependencyAlreadyRegistered,
+    DependencyNotFound,
+    RegistryFrozen,
+)
+from .graph import GraphFactory, find_cycle
+from .instrumentation import Hooks
+from .markers import KeyedDependency
+from .lifetimes import freeze_gc
+from .providers import factory_entry, rebind_entry
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
 
-class DependencyType(Enum):
-    INSTANCE = 1
-    FACTORY = 2
+FactoryTarget = Union[Callable[..., Any], str]
+AsyncFactoryTarget = Union[Callable[..., Awaitable[Any]], str]
 
+REBOUND_DEPENDENCY_TYPES = frozenset(
+    (DependencyType.FACTORY, DependencyType.ASYNC_FACTORY)
+)
 
-@dataclass
-class RegistryEntry:
-    dependency_type: DependencyType
-    dependency_value: Any
 
-    @classmethod
-    def factory(cls, factory) -> "RegistryEntry":
-        return cls(
-            dependency_type=DependencyType.FACTORY,
-            dependency_value=factory,
-        )
+# pylint: disable-next=too-few-public-methods
+class _PendingSnapshot:
+    """
+    Placeholder for snapshot of registered dependencies, published by
+    a registration. The first lookup publishes a fresh snapshot, so a burst
+    of registrations copies registered dependencies only once.
+    """
 
-    @classmethod
-    def instance(cls, instance) -> "RegistryEntry":
-        return cls(
-            dependency_type=DependencyType.INSTANCE,
-            dependency_value=instance,
-        )
+    __slots__ = ("_publish",)
+
+    def __init__(self, publish):
+        self._publish = publish
 
+    def get(self, dependency, default=None):
+        return self._publish().get(dependency, default)
 
+
+# pylint: disable-next=too-many-instance-attributes,too-many-public-methods
 class DependenciesRegistry:
     """
     Class used as a registry of instances and factories which can be used
     for injection.
+
+    The registry is safe to use from multiple threads. Registrations are
+    serialized and publish a new snapshot of registered dependencies, which
+    is never modified afterwards, so lookups do not take any lock.
+
+    Dependencies are registered under any hashable keys, usually classes.
+    Classes can also be requested by ``"module:qualname"`` or
+    ``"module.qualname"`` strings, so string annotations don't need to
+    import them.
+
+    A registry created with a parent (see :meth:`child`) stores only its own
+    registrations, which override the parent's ones. Its snapshot is
+    flattened, so lookups don't walk the chain of parents, and it's
+    published again whenever any of the ancestors changes.
     """
 
-    def __init__(self):
+    def __init__(self, parent: Optional["DependenciesRegistry"] = None):
+        """
+        Initialize the registry.
+
+        :param parent: registry providing dependencies which are not
+            registered in this one.
+        """
+        self._registered = {}
         self._dependencies = {}
+        self._pending = _PendingSnapshot(self._publish)
+        self._version = 0
+        self._lock = threading.Lock()
+        self._installed_hooks = ()
+        self._hooks = None
+        self._parent = parent
+        self._children = weakref.WeakSet()
+        self._aliases = (None, {})
+        self._frozen = False
+
+        if parent is not None:
+            self._dependencies = self._pending
+            with parent._lock:
+                parent._children.add(self)
+
+    @property
+    def parent(self) -> Optional["DependenciesRegistry"]:
+        """
+        Registry overlaid by this one.
 
+        :return: parent registry, ``None`` for a root registry.
+        """
+        return self._parent
+
+    def child(self) -> "DependenciesRegistry":
+        """
+        Create a registry overlaying this one. Dependencies registered in the
+        child override the ones registered here, without changing this
+        registry. Factories registered here without a shared lifetime are
+        resolved in the child with its overrides; singletons, scoped and
+        pooled dependencies stay shared with this registry.
+
+        :return: new child registry.
+        """
+        return type(self)(self)
+
+    @property
+    def version(self) -> int:
+        """
+        Counter incremented each time the content of the registry changes.
+
+        :return: current version of the registry.
+        """
+        return self._version
+
+    # shadowed by instance attributes, see _install_get
+    # pylint: disable-next=method-hidden
     def get(self, dependency: type) -> Any:
         """
         Get object registered as an instance of dependency or call callable
-        registered as a factory of dependency.
+        registered as a factory of dependency. Singletons are created on
+        the first call and reused afterwards.
+
+        :param dependency: dependency for which a registered instance will be
+            returned.
+        :raises DependencyNotFound: raised if the dependency passed as argument
+            has not been registered prior to making this call.
+        :raises AsyncResolutionRequired: raised if the dependency has been
+            registered with an async factory.
+        :return: instance of dependency.
+        """
+        entry = self._dependencies.get(dependency)
+        if entry is None:
+            entry = self._aliased(dependency)
+
+        if entry.dependency_type is DependencyType.INSTANCE:
+            return entry.dependency_value
+
+        if entry.dependency_type in ASYNC_DEPENDENCY_TYPES:
+            raise AsyncResolutionRequired(dependency)
+
+        return entry.provider()
+
+    # shadowed by instance attributes, see _install_get
+    # pylint: disable-next=method-hidden
+    async def aget(self, dependency: type) -> Any:
+        """
+        Asynchronous version of :meth:`get`, which additionally supports
+        dependencies registered with async factories.
 
         :param dependency: dependency for which a registered instance will be
             returned.
@@ -53,15 +181,213 @@ class DependenciesRegistry:
             has not been registered prior to making this call.
         :return: instance of dependency.
         """
-        logger.debug("looking for %s in %s", dependency, self)
+        entry = self.get_entry(dependency)
+
+        if entry.dependency_type is DependencyType.INSTANCE:
+            return entry.dependency_value
+
+        if entry.is_async:
+            return await entry.provider()
+
+        return entry.provider()
+
+    def _instrumented_get(self, dependency):
+        entry = self.get_entry(dependency)
+        if entry.is_async:
+            raise AsyncResolutionRequired(dependency)
+
+        return instrumentation.resolve(dependency, entry, self._hooks)
+
+    async def _instrumented_aget(self, dependency):
+        entry = self.get_entry(dependency)
+        return await instrumentation.resolve_async(
+            dependency, entry, self._hooks
+        )
+
+    @property
+    def hooks(self) -> Optional[Hooks]:
+        """
+        Instrumentation hooks installed in the registry.
+
+        :return: installed hooks, ``None`` if no hooks are installed.
+        """
+        return self._hooks
+
+    def add_hooks(self, hooks: Hooks) -> None:
+        """
+        Install instrumentation hooks, which will be notified about
+        resolution of dependencies and calls of their factories.
+
+        Without installed hooks, resolution does not pay any instrumentation
+        cost.
+
+        :param hooks: hooks to be installed.
+        """
+        logger.debug("adding %s hooks to %s", hooks, self)
+        with self._lock:
+            self._installed_hooks = self._installed_hooks + (hooks,)
+            self._update_hooks()
+
+    def remove_hooks(self, hooks: Hooks) -> None:
+        """
+        Uninstall instrumentation hooks installed with :meth:`add_hooks`.
+
+        :param hooks: hooks to be uninstalled.
+        """
+        logger.debug("removing %s hooks from %s", hooks, self)
+        with self._lock:
+            self._installed_hooks = tuple(
+                installed
+                for installed in self._installed_hooks
+                if installed is not hooks
+            )
+            self._update_hooks()
+
+    def _update_hooks(self):
+        self._hooks = instrumentation.group(self._installed_hooks)
+        self._install_get()
+        self._version += 1
+
+    def _install_get(self):
+        # get is shadowed by instance attributes for instrumentation and for
+        # frozen registries, so the default path doesn't check for either
+        if self._hooks is not None:
+            self.get = self._instrumented_get
+            self.aget = self._instrumented_aget
+        elif self._frozen:
+            self.get = self._frozen_get()
+            self.__dict__.pop("aget", None)
+        else:
+            self.__dict__.pop("get", None)
+            self.__dict__.pop("aget", None)
+
+    def _frozen_get(self):
+        instances = {}
+        providers = {}
+        for dependency, entry in self._current().items():
+            provider = entry.provider
+            if entry.dependency_type is DependencyType.INSTANCE:
+                instances[dependency] = entry.dependency_value
+            elif (
+                entry.dependency_type is DependencyType.SINGLETON
+                and provider.created
+            ):
+                instances[dependency] = provider()
+            elif not entry.is_async:
+                providers[dependency] = entry.provider
+
+        get_entry = self.get_entry
+        instance_of = instances.get
+        provider_of = providers.get
+
+        def get(dependency):
+            instance = instance_of(dependency, _MISSING)
+            if instance is not _MISSING:
+                return instance
+
+            provider = provider_of(dependency)
+            if provider is not None:
+                return provider()
+
+            # aliases and async dependencies
+            entry = get_entry(dependency)
+            if entry.is_async:
+                raise AsyncResolutionRequired(dependency)
+            if entry.dependency_type is DependencyType.INSTANCE:
+                return entry.dependency_value
+            return entry.provider()
+
+        return get
+
+    @property
+    def frozen(self) -> bool:
+        """
+        Check if the registry has been frozen with :meth:`freeze`.
+
+        :return: ``True`` if the registry is frozen.
+        """
+        return self._frozen
+
+    def freeze(self) -> None:
+        """
+        Make the registry immutable and switch :meth:`get` to lookup tables
+        specialized for its content: instances and already created
+        singletons are returned directly and factories are called without
+        checking their types.
+
+        Registering dependencies in or clearing a frozen registry raises
+        :exc:`injectme.RegistryFrozen`. Changes of a parent registry, which
+        is possible only after thawing it, are still reflected.
+        """
+        logger.debug("freezing %s", self)
+        with self._lock:
+            self._frozen = True
+            self._install_get()
+
+    def thaw(self) -> None:
+        """
+        Make the frozen registry mutable again.
+        """
+        logger.debug("thawing %s", self)
+        with self._lock:
+            self._frozen = False
+            self._install_get()
+
+    def get_entry(self, dependency: type) -> RegistryEntry:
+        """
+        Get the registry entry describing how the dependency is provided.
+
+        :param dependency: dependency for which the entry will be returned.
+        :raises DependencyNotFound: raised if the dependency passed as argument
+            has not been registered prior to making this call.
+        :return: registry entry of dependency.
+        """
         entry = self._dependencies.get(dependency)
+        if entry is None:
+            entry = self._aliased(dependency)
+
+        return entry
+
+    def _aliased(self, dependency):
+        if isinstance(dependency, KeyedDependency):
+            return self._keyed(dependency)
+
+        # classes can be referred to by "module:qualname" strings, so
+        # annotations don't have to import them
+        if not isinstance(dependency, str):
+            raise DependencyNotFound(dependency)
+
+        snapshot = self._snapshot()
+        aliases = self._aliases
+        if aliases[0] is not snapshot:
+            aliases = (snapshot, {})
+            for key, entry in snapshot.items():
+                if isinstance(key, type):
+                    aliases[1][f"{key.__module__}:{key.__qualname__}"] = entry
+                    aliases[1][f"{key.__module__}.{key.__qualname__}"] = entry
+            self._aliases = aliases
+
+        entry = aliases[1].get(dependency)
         if entry is None:
             raise DependencyNotFound(dependency)
 
-        if entry.dependency_type == DependencyType.FACTORY:
-            return entry.dependency_value()
+        return entry
 
-        return entry.dependency_value
+    def _keyed(self, dependency):
+        # entries of keys are not stored, so the registry doesn't grow with
+        # the number of requested keys
+        try:
+            entry = self.get_entry(dependency.dependency)
+        except DependencyNotFound:
+            raise DependencyNotFound(dependency) from None
+        if entry.dependency_type is not DependencyType.KEYED:
+            raise DependencyNotFound(dependency)
+
+        return RegistryEntry.factory(
+            entry.dependency_value,
+            DependencyType.KEYED,
+            partial(entry.provider, dependency.key),
+        )
 
     def register_instance(self, dependency: type, instance: Any) -> None:
         """
@@ -80,22 +406,33 @@ class DependenciesRegistry:
             dependency,
             self,
         )
-        self._ensure_not_registered(dependency)
         entry = RegistryEntry.instance(instance)
-        self._dependencies[dependency] = entry
+        self._register(dependency, entry)
 
     def register_factory(
-        self, dependency: type, factory: Callable[[], Any]
+        self, dependency: type, factory: FactoryTarget
     ) -> None:
         """
         Register passed callable as a factory of dependency instances.
 
+        Required parameters of the factory have to be annotated with
+        dependencies, which are resolved from this registry and passed as
+        arguments each time the factory is called.
+
+        Instead of a callable, a ``"package.module:name"`` path can be passed
+        to every ``register_*`` method taking a factory. The factory is then
+        imported on the first resolution of the dependency and its
+        dependencies are inspected only after the import.
+
         :param dependency: dependency for which an instance should be
-            registered.
+            registered. Any hashable key can be used, e.g. a string.
         :param factory: a callable which should be registered as a factory of
-            dependency instances
+            dependency instances or path to it.
+        :raises ValueError: raised if the path to factory is malformed.
         :raises DependencyAlreadyRegistered: raised if dependency has been
             already registered.
+        :raises CircularDependency: raised if dependencies of the factory
+            depend on the registered dependency.
         """
         logger.debug(
             "registering %s as %s dependency in %s",
@@ -103,17 +440,487 @@ class DependenciesRegistry:
             dependency,
             self,
         )
-        self._ensure_not_registered(dependency)
-        entry = RegistryEntry.factory(factory)
-        self._dependencies[dependency] = entry
+        entry = factory_entry(
+            self, dependency, factory, DependencyType.FACTORY
+        )
+        self._register(dependency, entry)
+
+    def register_singleton(
+        self, dependency: type, factory: FactoryTarget
+    ) -> None:
+        """
+        Register passed callable as a factory of single, lazily created
+        dependency instance. The factory is called on the first request for
+        the dependency and its result is reused for all following requests.
+
+        :param dependency: dependency for which an instance should be
+            registered.
+        :param factory: a callable which should be used to create the instance
+            of dependency.
+        :raises DependencyAlreadyRegistered: raised if dependency has been
+            already registered.
+        :raises CircularDependency: raised if dependencies of the factory
+            depend on the registered dependency.
+        """
+        logger.debug(
+            "registering %s as %s singleton dependency in %s",
+            factory,
+            dependency,
+            self,
+        )
+        entry = factory_entry(
+            self, dependency, factory, DependencyType.SINGLETON
+        )
+        self._register(dependency, entry)
+
+    def register_per_process(
+        self, dependency: type, factory: FactoryTarget
+    ) -> None:
+        """
+        Register passed callable as a factory of dependency instance created
+        once per process. It behaves like a singleton, except that processes
+        forked after the instance has been created don't inherit it and
+        create their own one, e.g. for sockets, thread pools or random
+        number generators.
+
+        :param dependency: dependency for which an instance should be
+            registered.
+        :param factory: a callable which should be used to create the instance
+            of dependency.
+        :raises DependencyAlreadyRegistered: raised if dependency has been
+            already registered.
+        :raises CircularDependency: raised if dependencies of the factory
+            depend on the registered dependency.
+        """
+        logger.debug(
+            "registering %s as %s per-process dependency in %s",
+            factory,
+            dependency,
+            self,
+        )
+        entry = factory_entry(
+            self, dependency, factory, DependencyType.PER_PROCESS
+        )
+        self._register(dependency, entry)
+
+    def register_owned(self, dependency: type, factory: FactoryTarget) -> None:
+        """
+        Register passed callable as a factory of dependency instance shared
+        by the objects it's injected into, for as long as any of them
+        references it. The registry keeps only a weak reference to the
+        instance, so it's garbage collected with its last owner and created
+        again on the next request, e.g. for heavy objects needed during
+        bursts of work. The instance has to support weak references.
+
+        :param dependency: dependency for which an instance should be
+            registered.
+        :param factory: a callable which should be used to create the instance
+            of dependency.
+        :raises DependencyAlreadyRegistered: raised if dependency has been
+            already registered.
+        :raises CircularDependency: raised if dependencies of the factory
+            depend on the registered dependency.
+        """
+        logger.debug(
+            "registering %s as %s owned dependency in %s",
+            factory,
+            dependency,
+            self,
+        )
+        entry = factory_entry(self, dependency, factory, DependencyType.OWNED)
+        self._register(dependency, entry)
+
+    # pylint: disable-next=too-many-arguments
+    def register_keyed(
+        self,
+        dependency: type,
+        factory: Callable[..., Any],
+        max_size: Optional[int] = 128,
+        ttl: Optional[float] = None,
+        dispose: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        """
+        Register passed callable as a factory of dependency instances
+        created for keys, e.g. per-tenant clients. Instances are requested
+        with :class:`injectme.Key` marker, e.g.
+        ``Annotated[Client, Key("eu-west")]``, or with
+        ``registry.get(KeyedDependency(Client, "eu-west"))``, and cached in
+        a bounded LRU cache. Its counters are available as
+        ``registry.get_entry(dependency).provider.stats``.
+
+        :param dependency: dependency for which an instance should be
+            registered.
+        :param factory: a callable receiving the key as its first argument.
+            Its other required parameters have to be annotated with
+            dependencies, which are resolved from this registry.
+        :param max_size: maximum number of cached instances, unlimited if
+            ``None``. Least recently used instances are evicted first.
+        :param ttl: seconds after which cached instances are created again,
+            never if not specified.
+        :param dispose: optional callable receiving evicted instances.
+        :raises DependencyAlreadyRegistered: raised if dependency has been
+            already registered.
+        :raises CircularDependency: raised if dependencies of the factory
+            depend on the registered dependency.
+        :raises ValueError: raised if ``max_size`` or ``ttl`` is invalid.
+        """
+        logger.debug(
+            "registering %s as %s keyed dependency in %s",
+            factory,
+            dependency,
+            self,
+        )
+        entry = factory_entry(
+            self,
+            dependency,
+            factory,
+            DependencyType.KEYED,
+            dispose=dispose,
+            max_size=max_size,
+            ttl=ttl,
+        )
+        self._register(dependency, entry)
+
+    def register_async_factory(
+        self,
+        dependency: type,
+        factory: AsyncFactoryTarget,
+        singleton: bool = False,
+    ) -> None:
+        """
+        Register passed coroutine function as an async factory of dependency
+        instances. Such dependencies can be resolved only with :meth:`aget`
+        or :meth:`injectme.Injector.create_async`.
+
+        :param dependency: dependency for which an instance should be
+            registered.
+        :param factory: a coroutine function which should be registered as
+            a factory of dependency instances.
+        :param singleton: if ``True``, the factory is awaited once, on first
+            request, and its result is reused afterwards.
+        :raises DependencyAlreadyRegistered: raised if dependency has been
+            already registered.
+        :raises CircularDependency: raised if dependencies of the factory
+            depend on the registered dependency.
+        """
+        logger.debug(
+            "registering %s as %s async dependency in %s",
+            factory,
+            dependency,
+            self,
+        )
+        if singleton:
+            dependency_type = DependencyType.ASYNC_SINGLETON
+        else:
+            dependency_type = DependencyType.ASYNC_FACTORY
+        entry = factory_entry(self, dependency, factory, dependency_type)
+        self._register(dependency, entry)
+
+    def register_scoped(
+        self,
+        dependency: type,
+        factory: FactoryTarget,
+        dispose: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        """
+        Register passed callable as a factory of dependency instances shared
+        within a scope. The factory is called at most once per scope entered
+        with :meth:`injectme.Injector.scope` and the created instance is
+        dropped when the scope exits.
+
+        :param dependency: dependency for which an instance should be
+            registered.
+        :param factory: a callable which should be used to create the instance
+            of dependency.
+        :param dispose: optional callable receiving the instance when its
+            scope exits, e.g. to close a session. If it returns an awaitable,
+            it's awaited when the scope is used with ``async with``.
+        :raises DependencyAlreadyRegistered: raised if dependency has been
+            already registered.
+        :raises CircularDependency: raised if dependencies of the factory
+            depend on the registered dependency.
+        """
+        logger.debug(
+            "registering %s as %s scoped dependency in %s",
+            factory,
+            dependency,
+            self,
+        )
+        entry = factory_entry(
+            self, dependency, factory, DependencyType.SCOPED, dispose=dispose
+        )
+        self._register(dependency, entry)
+
+    # pylint: disable-next=too-many-arguments
+    def register_pooled(
+        self,
+        dependency: type,
+        factory: FactoryTarget,
+        min_size: int = 0,
+        max_size: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        timeout: Optional[float] = None,
+        dispose: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        """
+        Register passed callable as a factory of dependency instances reused
+        through a pool. Objects injected with the dependency check an
+        instance out on construction and check it back in when they are
+        garbage collected or passed to :func:`injectme.release`. Instances
+        resolved directly with :meth:`get` have to be returned with
+        ``registry.get_entry(dependency).provider.release(instance)``.
+
+        :param dependency: dependency for which an instance should be
+            registered.
+        :param factory: a callable which should be used to create the instance
+            of dependency.
+        :param min_size: number of instances created by :meth:`warm_up` and
+            never evicted.
+        :param max_size: maximum number of instances checked out at the same
+            time, unlimited if not specified.
+        :param idle_timeout: seconds after which idle instances above
+            ``min_size`` are evicted, never if not specified.
+        :param timeout: seconds to wait for a released instance once
+            ``max_size`` is reached, forever if not specified.
+        :param dispose: optional callable receiving evicted instances.
+        :raises DependencyAlreadyRegistered: raised if dependency has been
+            already registered.
+        :raises CircularDependency: raised if dependencies of the factory
+            depend on the registered dependency.
+        :raises ValueError: raised if sizes of the pool are invalid.
+        """
+        logger.debug(
+            "registering %s as %s pooled dependency in %s",
+            factory,
+            dependency,
+            self,
+        )
+        entry = factory_entry(
+            self,
+            dependency,
+            factory,
+            DependencyType.POOLED,
+            dispose=dispose,
+            min_size=min_size,
+            max_size=max_size,
+            idle_timeout=idle_timeout,
+            timeout=timeout,
+        )
+        self._register(dependency, entry)
 
     def clear(self) -> None:
         """
         Remove all of the registered dependencies.
         """
         logger.debug("clearing %s registry", self)
-        self._dependencies = {}
+        with self._lock:
+            self._ensure_not_frozen()
+            self._registered = {}
+            self._dependencies = self._pending
+            self._version += 1
+
+        self._invalidate_children()
+
+    def validate(self) -> None:
+        """
+        Check that all of the dependencies required by registered factories
+        have been registered as well.
+
+        :raises DependencyNotFound: raised if any of the dependencies required
+            by registered factories has not been registered.
+        """
+        dependencies = self.entries()
+        for entry in dependencies.values():
+            for parameter in entry.dependencies:
+                if parameter.dependency not in dependencies:
+                    # raises for missing aliases and keyed dependencies
+                    self.get_entry(parameter.dependency)
+
+    def entries(self) -> Dict[Any, RegistryEntry]:
+        """
+        Get all of the registered entries, including the ones inherited from
+        ancestors.
+
+        :return: copy of mapping of dependencies to their registry entries.
+        """
+        return dict(self._snapshot())
+
+    def warm_up(
+        self,
+        max_workers: Optional[int] = None,
+        executor: Optional["Executor"] = None,
+        per_process: bool = True,
+    ) -> None:
+        """
+        Create all of the registered singletons, fill pools up to their
+        ``min_size`` and compile resolution order of factories with
+        dependencies.
+
+        :param max_workers: if specified, singletons are created concurrently
+            by :meth:`bootstrap` in a thread pool with this many workers.
+        :param executor: if specified, singletons are created concurrently by
+            :meth:`bootstrap` in this executor.
+        :param per_process: if ``False``, neither per-process dependencies
+            are created nor pools are filled, see :meth:`prefork`.
+        :raises DependencyNotFound: raised if any of the dependencies required
+            by registered factories has not been registered.
+        """
+        logger.debug("warming up %s", self)
+        entries = self.entries()
+        for entry in entries.values():
+            if isinstance(entry.provider, GraphFactory):
+                entry.provider.compile()
+
+        if executor is not None:
+            self.bootstrap(executor)
+        elif max_workers is not None:
+            # pylint: disable-next=import-outside-toplevel
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers) as pool:
+                self.bootstrap(pool)
+        else:
+            for dependency, entry in entries.items():
+                if entry.dependency_type in SHARED_DEPENDENCY_TYPES:
+                    self.get(dependency)
+
+        if not per_process:
+            return
+
+        for dependency, entry in entries.items():
+            if entry.dependency_type is DependencyType.PER_PROCESS:
+                self.get(dependency)
+            elif entry.dependency_type is DependencyType.POOLED:
+                entry.provider.fill()
+
+    def prefork(
+        self,
+        max_workers: Optional[int] = None,
+        executor: Optional["Executor"] = None,
+    ) -> None:
+        """
+        Prepare the registry to be inherited by forked worker processes.
+
+        Singletons are created in the parent process, so the workers share
+        them instead of creating their own copies. Per-process dependencies
+        and pooled instances are left for the workers. Finally, all objects
+        tracked by the garbage collector are moved to the permanent
+        generation with ``gc.freeze``, so collections in the workers don't
+        touch them and their memory pages stay shared.
+
+        :param max_workers: if specified, singletons are created concurrently
+            by :meth:`bootstrap` in a thread pool with this many workers.
+        :param executor: if specified, singletons are created concurrently by
+            :meth:`bootstrap` in this executor.
+        :raises DependencyNotFound: raised if any of the dependencies required
+            by registered factories has not been registered.
+        """
+        logger.debug("preparing %s for fork", self)
+        self.warm_up(max_workers, executor, per_process=False)
+        freeze_gc()
+
+    def bootstrap(self, executor: "Executor") -> None:
+        """
+        Create all of the singletons concurrently, following the graph of
+        their dependencies.
+
+        Singleton's factory is submitted to the executor as soon as all of
+        the singletons it depends on have been created, so the time needed
+        is close to the longest chain of dependent factories rather than the
+        sum of all of them. With ``ProcessPoolExecutor``, only singletons
+        which don't depend on other singletons are created in its workers,
+        so their factories and results have to be picklable; the other ones
+        are created in the calling thread, so they don't get copies of the
+        singletons they depend on.
+
+        :param executor: thread or process pool executing the factories.
+        :raises DependencyNotFound: raised if any of the dependencies required
+            by registered factories has not been registered.
+        """
+        # pylint: disable-next=import-outside-toplevel
+        from .bootstrap import bootstrap
+
+        self.validate()
+        bootstrap(self, executor)
+
+    def _register(self, dependency, entry):
+        with self._lock:
+            self._ensure_not_frozen()
+            self._ensure_not_registered(dependency)
+
+            registered = self._registered
+            entries = registered
+            if self._parent is not None:
+                # pylint: disable-next=protected-access
+                entries = ChainMap(registered, self._parent._snapshot())
+            cycle = find_cycle(dependency, entry.dependencies, entries)
+            if cycle is not None:
+                raise CircularDependency(cycle)
+
+            registered[dependency] = entry
+            self._dependencies = self._pending
+            self._version += 1
+
+        self._invalidate_children()
+
+    def _snapshot(self):
+        snapshot = self._dependencies
+        if snapshot is self._pending:
+            snapshot = self._publish()
+
+        return snapshot
+
+    def _publish(self):
+        with self._lock:
+            return self._current()
+
+    def _current(self):
+        # has to be called with the lock held
+        snapshot = self._dependencies
+        if snapshot is self._pending:
+            snapshot = self._flatten()
+            self._dependencies = snapshot
+
+        return snapshot
+
+    def _flatten(self):
+        if self._parent is None:
+            return dict(self._registered)
+
+        snapshot = {}
+        # pylint: disable-next=protected-access
+        for dependency, entry in self._parent._snapshot().items():
+            if entry.dependency_type in REBOUND_DEPENDENCY_TYPES:
+                entry = rebind_entry(self, dependency, entry)
+            snapshot[dependency] = entry
+
+        snapshot.update(self._registered)
+        return snapshot
+
+    def _invalidate_children(self):
+        # called without holding the lock, children lock their parents
+        # while publishing snapshots
+        with self._lock:
+            children = list(self._children)
+
+        for child in children:
+            # pylint: disable-next=protected-access
+            child._invalidate()
+
+    def _invalidate(self):
+        # called by the parent when its snapshot changes
+        with self._lock:
+            self._dependencies = self._pending
+            self._version += 1
+            if self._frozen:
+                self._install_get()
+
+        self._invalidate_children()
+
+    def _ensure_not_frozen(self):
+        if self._frozen:
+            raise RegistryFrozen(self)
 
     def _ensure_not_registered(self, dependency):
-        if dependency in self._dependencies:
+        if dependency in self._registered:
             raise DependencyAlreadyRegistered(dependency)
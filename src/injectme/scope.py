@@ -0,0 +1,92 @@
+import inspect
+import logging
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+from .errors import ScopeNotActive
+
+logger = logging.getLogger(__name__)
+
+_NOT_CREATED = object()
+
+_scope_cache = ContextVar("injectme_scope_cache", default=None)
+
+
+class Scope:
+    """
+    Context manager delimiting the lifetime of scoped dependencies.
+
+    Scoped dependencies are created at most once within a scope and are
+    dropped when the scope exits. The scope is stored in a context variable,
+    so it follows asyncio tasks and ``contextvars.copy_context()``. It can be
+    used both with ``with`` and ``async with``.
+    """
+
+    def __init__(self):
+        self._cache: Optional[Dict[Any, Any]] = None
+        self._token = None
+
+    def __enter__(self) -> "Scope":
+        logger.debug("entering %s", self)
+        self._cache = {}
+        self._token = _scope_cache.set(self._cache)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for dispose, instance in self._exit():
+            dispose(instance)
+
+    async def __aenter__(self) -> "Scope":
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info) -> None:
+        for dispose, instance in self._exit():
+            result = dispose(instance)
+            if inspect.isawaitable(result):
+                await result
+
+    def _exit(self):
+        logger.debug("exiting %s", self)
+        _scope_cache.reset(self._token)
+        cache = self._cache
+        self._cache = None
+        self._token = None
+
+        disposals = [
+            (holder.dispose, instance)
+            for holder, instance in reversed(list(cache.items()))
+            if holder.dispose is not None
+        ]
+        cache.clear()
+        return disposals
+
+
+# pylint: disable-next=too-few-public-methods
+class Scoped:
+    """
+    Factory wrapper creating the dependency once per active :class:`Scope`.
+    """
+
+    __slots__ = ("dependency", "factory", "dispose")
+
+    def __init__(
+        self,
+        dependency: Any,
+        factory: Callable[[], Any],
+        dispose: Optional[Callable[[Any], Any]] = None,
+    ):
+        self.dependency = dependency
+        self.factory = factory
+        self.dispose = dispose
+
+    def __call__(self) -> Any:
+        cache = _scope_cache.get()
+        if cache is None:
+            raise ScopeNotActive(self.dependency)
+
+        instance = cache.get(self, _NOT_CREATED)
+        if instance is _NOT_CREATED:
+            instance = self.factory()
+            cache[self] = instance
+
+        return instance
@@ -1,6 +1,10 @@
-from typing import Any, Callable
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
 
 from .injector import Injector
+from .scope import Scope
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
 
 _injector = Injector()
 
@@ -13,13 +17,14 @@ def _get_registry():
     return _get_injector().registry
 
 
-def inject(cls: type) -> None:
+def inject(cls: Any) -> Any:
     """
-    Mark class as a target for the injection.
+    Mark class, function or method as a target for the injection.
 
     :param cls: Target for injection.
-    :raise injectme.InjectionNotSupported: If the cls argument is not an
-        instance of ``type``.
+    :raise injectme.InjectionNotSupported: If the cls argument is neither an
+        instance of ``type`` nor a function.
+    :return: Marked class or wrapped function.
     """
     injector = _get_injector()
     return injector(cls)
@@ -38,7 +43,7 @@ def register(dependency: type, instance: Any) -> None:
     registry.register_instance(dependency, instance)
 
 
-def register_factory(dependency: type, factory: Callable[[], Any]) -> None:
+def register_factory(dependency: type, factory: Callable[..., Any]) -> None:
     """
     Register dependency factory to be used during injection phase.
 
@@ -51,10 +56,234 @@ def register_factory(dependency: type, factory: Callable[[], Any]) -> None:
     registry.register_factory(dependency, factory)
 
 
+def register_singleton(dependency: type, factory: Callable[..., Any]) -> None:
+    """
+    Register factory of single dependency instance, created on first use.
+
+    :param dependency: class of dependency to be registered
+    :param factory: factory of dependency to be registered
+    :raise injectme.DependencyAlreadyRegistered: If the dependency has already
+        been registered.
+    """
+    registry = _get_registry()
+    registry.register_singleton(dependency, factory)
+
+
+def register_per_process(
+    dependency: type, factory: Callable[..., Any]
+) -> None:
+    """
+    Register factory of dependency instance created once per process, e.g.
+    again in each worker forked by a pre-forking server.
+
+    :param dependency: class of dependency to be registered
+    :param factory: factory of dependency to be registered
+    :raise injectme.DependencyAlreadyRegistered: If the dependency has already
+        been registered.
+    """
+    registry = _get_registry()
+    registry.register_per_process(dependency, factory)
+
+
+def register_owned(dependency: type, factory: Callable[..., Any]) -> None:
+    """
+    Register factory of dependency instance shared by the objects it's
+    injected into, for as long as any of them references it.
+
+    :param dependency: class of dependency to be registered
+    :param factory: factory of dependency to be registered
+    :raise injectme.DependencyAlreadyRegistered: If the dependency has already
+        been registered.
+    """
+    registry = _get_registry()
+    registry.register_owned(dependency, factory)
+
+
+def register_keyed(
+    dependency: type,
+    factory: Callable[..., Any],
+    max_size: Optional[int] = 128,
+    ttl: Optional[float] = None,
+    dispose: Optional[Callable[[Any], Any]] = None,
+) -> None:
+    """
+    Register factory of dependency instances created for keys, requested
+    with :class:`injectme.Key` marker, e.g.
+    ``Annotated[Client, Key("eu-west")]``.
+
+    :param dependency: class of dependency to be registered
+    :param factory: factory receiving the key as its first argument
+    :param max_size: maximum number of cached instances
+    :param ttl: seconds after which cached instances are created again
+    :param dispose: callable receiving evicted instances
+    :raise injectme.DependencyAlreadyRegistered: If the dependency has already
+        been registered.
+    """
+    registry = _get_registry()
+    registry.register_keyed(dependency, factory, max_size, ttl, dispose)
+
+
+def register_async_factory(
+    dependency: type,
+    factory: Callable[..., Awaitable[Any]],
+    singleton: bool = False,
+) -> None:
+    """
+    Register async dependency factory to be used during asynchronous
+    injection phase.
+
+    :param dependency: class of dependency to be registered
+    :param factory: coroutine function creating the dependency
+    :param singleton: await the factory only once and reuse its result
+    :raise injectme.DependencyAlreadyRegistered: If the dependency has already
+        been registered.
+    """
+    registry = _get_registry()
+    registry.register_async_factory(dependency, factory, singleton)
+
+
+def register_scoped(
+    dependency: type,
+    factory: Callable[..., Any],
+    dispose: Optional[Callable[[Any], Any]] = None,
+) -> None:
+    """
+    Register dependency factory called at most once per scope.
+
+    :param dependency: class of dependency to be registered
+    :param factory: factory of dependency to be registered
+    :param dispose: callable receiving the instance when its scope exits
+    :raise injectme.DependencyAlreadyRegistered: If the dependency has already
+        been registered.
+    """
+    registry = _get_registry()
+    registry.register_scoped(dependency, factory, dispose)
+
+
+# pylint: disable-next=too-many-arguments
+def register_pooled(
+    dependency: type,
+    factory: Callable[..., Any],
+    min_size: int = 0,
+    max_size: Optional[int] = None,
+    idle_timeout: Optional[float] = None,
+    timeout: Optional[float] = None,
+    dispose: Optional[Callable[[Any], Any]] = None,
+) -> None:
+    """
+    Register dependency factory whose instances are reused through a pool.
+    Instances are returned to the pool when the objects they were injected
+    into are garbage collected or passed to :func:`injectme.release`.
+
+    :param dependency: class of dependency to be registered
+    :param factory: factory of dependency to be registered
+    :param min_size: number of instances created by :func:`injectme.warm_up`
+        and never evicted
+    :param max_size: maximum number of instances in use at the same time
+    :param idle_timeout: seconds after which idle instances are evicted
+    :param timeout: seconds to wait for an instance once ``max_size`` is
+        reached
+    :param dispose: callable receiving evicted instances
+    :raise injectme.DependencyAlreadyRegistered: If the dependency has already
+        been registered.
+    """
+    registry = _get_registry()
+    registry.register_pooled(
+        dependency, factory, min_size, max_size, idle_timeout, timeout, dispose
+    )
+
+
+def scope() -> Scope:
+    """
+    Create a scope for dependencies registered with
+    :func:`injectme.register_scoped`.
+    """
+    injector = _get_injector()
+    return injector.scope()
+
+
+def validate() -> None:
+    """
+    Check that all of the dependencies of classes marked with
+    :func:`injectme.inject` can be resolved.
+
+    :raise injectme.InjectionFailure: If any of the dependencies of marked
+        classes has not been registered.
+    :raise injectme.DependencyNotFound: If any of the dependencies of
+        registered factories has not been registered.
+    """
+    injector = _get_injector()
+    injector.validate()
+
+
+def warm_up(
+    max_workers: Optional[int] = None, executor: Optional["Executor"] = None
+) -> None:
+    """
+    Validate dependencies, create singletons and compile injection plans of
+    classes marked with :func:`injectme.inject`.
+
+    :param max_workers: number of threads creating singletons concurrently,
+        singletons are created sequentially if not specified.
+    :param executor: thread or process pool executor creating singletons
+        concurrently, following the graph of their dependencies.
+    :raise injectme.InjectionFailure: If any of the dependencies of marked
+        classes has not been registered.
+    :raise injectme.DependencyNotFound: If any of the dependencies of
+        registered factories has not been registered.
+    """
+    injector = _get_injector()
+    injector.warm_up(max_workers, executor)
+
+
+def prefork(
+    max_workers: Optional[int] = None, executor: Optional["Executor"] = None
+) -> None:
+    """
+    Create singletons and compile injection plans of classes marked with
+    :func:`injectme.inject` before forking worker processes, so the workers
+    share them. Per-process dependencies are left for the workers.
+
+    :param max_workers: number of threads creating singletons concurrently,
+        singletons are created sequentially if not specified.
+    :param executor: thread or process pool executor creating singletons
+        concurrently, following the graph of their dependencies.
+    :raise injectme.InjectionFailure: If any of the dependencies of marked
+        classes has not been registered.
+    :raise injectme.DependencyNotFound: If any of the dependencies of
+        registered factories has not been registered.
+    """
+    injector = _get_injector()
+    injector.prefork(max_workers, executor)
+
+
+def freeze() -> None:
+    """
+    Warm up and freeze the registry for production use. Registering
+    dependencies afterwards raises :exc:`injectme.RegistryFrozen`.
+
+    :raise injectme.InjectionFailure: If any of the dependencies of marked
+        classes has not been registered.
+    :raise injectme.DependencyNotFound: If any of the dependencies of
+        registered factories has not been registered.
+    """
+    injector = _get_injector()
+    injector.freeze()
+
+
+def thaw() -> None:
+    """
+    Make the registry frozen with :func:`injectme.freeze` mutable again.
+    """
+    injector = _get_injector()
+    injector.thaw()
+
+
 def clear_dependencies() -> None:
     """
-    Clear all of the dependencies registered with :func:`injectme.register` or
-    :func:`injectme.register_factory` prior to calling this function.
+    Clear all of the dependencies registered with :func:`injectme.register`,
+    :func:`injectme.register_factory` or :func:`injectme.register_singleton`
+    prior to calling this function.
     """
     registry = _get_registry()
     registry.clear()
@@ -0,0 +1,360 @@
+import threading
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from .instrumentation import Hooks, dependency_name
+
+CONSTRUCTION = "construction"
+RESOLUTION = "resolution"
+
+
+class TraceNode:
+    """
+    Single construction of an instance or resolution of a dependency,
+    together with the resolutions it triggered.
+    """
+
+    __slots__ = (
+        "dependency",
+        "kind",
+        "elapsed",
+        "factory_elapsed",
+        "children",
+        "parent",
+    )
+
+    def __init__(
+        self, dependency: Any, kind: str, parent: Optional["TraceNode"]
+    ):
+        self.dependency = dependency
+        self.kind = kind
+        self.elapsed = 0.0
+        self.factory_elapsed: Optional[float] = None
+        self.children: List["TraceNode"] = []
+        self.parent = parent
+
+    @property
+    def self_elapsed(self) -> float:
+        """
+        Time spent in this node, excluding its children.
+        """
+        return max(
+            self.elapsed - sum(child.elapsed for child in self.children), 0.0
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Export the node and its children.
+
+        :return: dictionary describing the tree rooted at this node.
+        """
+        return {
+            "dependency": dependency_name(self.dependency),
+            "kind": self.kind,
+            "elapsed": self.elapsed,
+            "factory_elapsed": self.factory_elapsed,
+            "children": [child.as_dict() for child in self.children],
+        }
+
+
+class _Stats:  # pylint: disable=too-few-public-methods
+    __slots__ = ("kind", "calls", "elapsed", "self_elapsed")
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.calls = 0
+        self.elapsed = 0.0
+        self.self_elapsed = 0.0
+
+    @property
+    def mean_self_elapsed(self):
+        return self.self_elapsed / self.calls if self.calls else 0.0
+
+
+class Tracer(Hooks):
+    """
+    Hooks recording a tree of resolutions for each construction of a class
+    marked for injection and for each resolution of a dependency outside of
+    constructions, with wall time spent in each of them.
+
+    Trees are aggregated into a graph of dependencies, which can be exported
+    as JSON or Graphviz DOT together with its critical path: the chain of
+    dependencies which would still take the longest if all of the
+    independent resolutions ran in parallel. Only the last ``max_traces``
+    trees are kept, the aggregated graph covers all of them.
+
+    Resolutions are tracked per thread and per asyncio task. Resolutions
+    which fail are left out.
+    """
+
+    def __init__(self, registry=None, max_traces: Optional[int] = 100):
+        """
+        Initialize the tracer.
+
+        :param registry: if specified, edges between traced dependencies are
+            completed with dependencies of their factories registered there,
+            which are resolved as siblings when factories are flattened into
+            a single graph.
+        :param max_traces: number of kept trees, all if ``None``.
+        """
+        self.registry = registry
+        self._current = ContextVar(f"injectme_trace_{id(self)}", default=None)
+        self._lock = threading.Lock()
+        self._traces: deque = deque(maxlen=max_traces)
+        self._stats: Dict[Any, _Stats] = {}
+        self._edges: Dict[Tuple[Any, Any], int] = {}
+
+    def on_resolve_start(self, dependency):
+        self._start(dependency, RESOLUTION)
+
+    def on_resolve_end(self, dependency, elapsed):
+        self._end(dependency, elapsed)
+
+    def on_resolve_error(self, dependency, error):
+        node = self._current.get()
+        if node is not None and node.dependency == dependency:
+            self._current.set(node.parent)
+
+    def on_factory_call(self, dependency, elapsed):
+        node = self._current.get()
+        if node is not None and node.dependency == dependency:
+            node.factory_elapsed = elapsed
+
+    def on_inject_start(self, target):
+        self._start(target, CONSTRUCTION)
+
+    def on_inject_end(self, target, elapsed):
+        self._end(target, elapsed)
+
+    def _start(self, dependency, kind):
+        current = self._current
+        current.set(TraceNode(dependency, kind, current.get()))
+
+    def _end(self, dependency, elapsed):
+        node = self._current.get()
+        # ends without a matching start, e.g. of resolutions started before
+        # the tracer was installed, are ignored
+        while node is not None and node.dependency != dependency:
+            node = node.parent
+        if node is None:
+            return
+
+        node.elapsed = elapsed
+        parent = node.parent
+        self._current.set(parent)
+        if parent is not None:
+            parent.children.append(node)
+            return
+
+        with self._lock:
+            self._traces.append(node)
+            self._aggregate(node)
+
+    def _aggregate(self, node):
+        stats = self._stats.get(node.dependency)
+        if stats is None:
+            stats = _Stats(node.kind)
+            self._stats[node.dependency] = stats
+        stats.calls += 1
+        stats.elapsed += node.elapsed
+        stats.self_elapsed += node.self_elapsed
+
+        for child in node.children:
+            edge = (node.dependency, child.dependency)
+            self._edges[edge] = self._edges.get(edge, 0) + 1
+            self._aggregate(child)
+
+    @property
+    def traces(self) -> List[TraceNode]:
+        """
+        Recorded trees, oldest first.
+        """
+        with self._lock:
+            return list(self._traces)
+
+    def reset(self) -> None:
+        """
+        Drop all of the recorded trees and the aggregated graph.
+        """
+        with self._lock:
+            self._traces.clear()
+            self._stats = {}
+            self._edges = {}
+
+    def critical_path(self) -> Tuple[List[Any], float]:
+        """
+        Find the chain of dependencies with the longest sum of mean times
+        spent in their own factories or initializers.
+
+        :return: dependencies of the chain, starting with the outermost one,
+            and its duration in seconds.
+        """
+        with self._lock:
+            stats, edges = self._graph()
+
+        successors: Dict[Any, List[Any]] = {}
+        for parent, child in edges:
+            successors.setdefault(parent, []).append(child)
+
+        costs: Dict[Any, Tuple[float, Optional[Any]]] = {}
+        visiting = set()
+
+        def cost(dependency):
+            known = costs.get(dependency)
+            if known is not None:
+                return known[0]
+            if dependency in visiting:
+                return 0.0
+
+            visiting.add(dependency)
+            best, best_child = 0.0, None
+            for child in successors.get(dependency, ()):
+                child_cost = cost(child)
+                if child_cost > best:
+                    best, best_child = child_cost, child
+            visiting.discard(dependency)
+
+            total = stats[dependency].mean_self_elapsed + best
+            costs[dependency] = (total, best_child)
+            return total
+
+        start, duration = None, 0.0
+        for dependency in stats:
+            total = cost(dependency)
+            if start is None or total > duration:
+                start, duration = dependency, total
+
+        path = []
+        while start is not None:
+            path.append(start)
+            start = costs[start][1]
+
+        return path, duration
+
+    def _graph(self):
+        # has to be called with the lock held
+        stats = dict(self._stats)
+        edges = dict(self._edges)
+        registry = self.registry
+        if registry is None:
+            return stats, edges
+
+        entries = registry.entries()
+        for dependency in stats:
+            entry = entries.get(dependency)
+            if entry is None:
+                continue
+            for parameter in entry.dependencies:
+                if parameter.dependency in stats:
+                    edges.setdefault((dependency, parameter.dependency), 0)
+
+        return stats, edges
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Export the aggregated graph, its critical path and recorded trees.
+
+        :return: dictionary with ``nodes``, ``edges``, ``critical_path`` and
+            ``traces`` keys. Times are in seconds; edges completed from the
+            registry have zero ``calls``.
+        """
+        path, duration = self.critical_path()
+        with self._lock:
+            stats, edges = self._graph()
+            traces = [trace.as_dict() for trace in self._traces]
+
+        return {
+            "nodes": [
+                {
+                    "dependency": dependency_name(dependency),
+                    "kind": node.kind,
+                    "calls": node.calls,
+                    "elapsed": node.elapsed,
+                    "self_elapsed": node.self_elapsed,
+                    "mean_self_elapsed": node.mean_self_elapsed,
+                }
+                for dependency, node in stats.items()
+            ],
+            "edges": [
+                {
+                    "from": dependency_name(parent),
+                    "to": dependency_name(child),
+                    "calls": calls,
+                }
+                for (parent, child), calls in edges.items()
+            ],
+            "critical_path": {
+                "dependencies": [dependency_name(dep) for dep in path],
+                "duration": duration,
+            },
+            "traces": traces,
+        }
+
+    def to_json(self, **kwargs: Any) -> str:
+        """
+        Export :meth:`as_dict` as JSON.
+
+        :param kwargs: keyword arguments passed to ``json.dumps``.
+        :return: JSON document.
+        """
+        import json  # pylint: disable=import-outside-toplevel
+
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def to_dot(self) -> str:
+        """
+        Export the aggregated graph in Graphviz DOT format, with the critical
+        path highlighted.
+
+        :return: DOT document.
+        """
+        path, _ = self.critical_path()
+        critical = set(path)
+        critical_edges = set(zip(path, path[1:]))
+        with self._lock:
+            stats, edges = self._graph()
+
+        lines = [
+            "digraph injectme {",
+            "    rankdir=LR;",
+            "    node [shape=box];",
+        ]
+        for dependency, node in stats.items():
+            label = "\\n".join(
+                _escape(line)
+                for line in (
+                    dependency_name(dependency),
+                    f"calls: {node.calls}",
+                    f"mean: {_milliseconds(node.elapsed / node.calls)}",
+                    f"self: {_milliseconds(node.mean_self_elapsed)}",
+                )
+            )
+            attributes = f'label="{label}"'
+            if node.kind == CONSTRUCTION:
+                attributes += ", style=rounded"
+            if dependency in critical:
+                attributes += ", color=red"
+            lines.append(f'    "{_node_id(dependency)}" [{attributes}];')
+        for (parent, child), calls in edges.items():
+            attributes = f'label="{calls}"' if calls else "style=dashed"
+            if (parent, child) in critical_edges:
+                attributes += ", color=red, penwidth=2"
+            lines.append(
+                f'    "{_node_id(parent)}" -> "{_node_id(child)}"'
+                f" [{attributes}];"
+            )
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+
+def _milliseconds(seconds: float) -> str:
+    return f"{seconds * 1000:.3f} ms"
+
+
+def _node_id(dependency: Any) -> str:
+    return _escape(dependency_name(dependency))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
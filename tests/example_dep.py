@@ -12,3 +12,9 @@ class FactoryA:
 
     def __call__(self):
         return self.instance
+
+
+def make_b(dep: DependencyA) -> DependencyB:
+    instance = DependencyB()
+    instance.dep = dep
+    return instance
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from injectme import Injector
+
+from .example_dep import DependencyA
+
+injector = Injector()
+
+
+@injector
+class Consumer:
+    dep_a: DependencyA
+    service: Service
+
+
+@injector
+def handle(service: Service) -> Service:
+    return service
+
+
+def create_consumer(service: Service) -> Consumer:
+    consumer = Consumer.__new__(Consumer)
+    consumer.service = service
+    return consumer
+
+
+class Service:
+    pass
@@ -0,0 +1,68 @@
+import threading
+
+from injectme import Injector
+
+from .example_dep import DependencyA
+
+injector = Injector()
+
+
+class Connection:
+    def __init__(self):
+        # locks can't be pickled
+        self.lock = threading.Lock()
+
+
+@injector
+class Task:
+    connection: Connection
+
+    def __init__(self, payload):
+        self.payload = payload
+
+
+@injector
+class Handler:
+    connection: Connection
+
+
+@injector
+class SlottedTask:
+    __slots__ = ("payload",)
+
+    connection: Connection
+
+    def __init__(self, payload):
+        self.payload = payload
+
+
+@injector
+class StatefulTask:
+    connection: Connection
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def __getstate__(self):
+        return {"payload": self.payload, "connection": self.connection}
+
+    def __setstate__(self, state):
+        self.restored = state
+
+
+@injector
+class DerivedTask(Task):
+    dep_a: DependencyA
+
+
+def configure():
+    injector.registry.register_factory(Connection, Connection)
+    injector.registry.register_factory(DependencyA, DependencyA)
+
+
+def run(task):
+    return (
+        task.payload,
+        isinstance(task.connection, Connection),
+        injector.registry.get_entry(Connection).dependency_value,
+    )
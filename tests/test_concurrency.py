@@ -0,0 +1,250 @@
+"""
+Stress tests of the registry and injection from many threads.
+
+Each test runs its workers for ``INJECTME_STRESS_SECONDS`` (0.2 by default)
+and checks invariants which races would break. On interpreters with the GIL
+the switch interval is shortened to interleave threads more often; on
+free-threaded builds (e.g. CPython 3.13t) the workers run in parallel.
+"""
+import os
+import sys
+import threading
+import time
+import unittest
+
+from injectme import (
+    DependenciesRegistry,
+    DependencyAlreadyRegistered,
+    DependencyNotFound,
+    InjectionFailure,
+    Injector,
+    KeyedDependency,
+)
+
+FREE_THREADED = not getattr(sys, "_is_gil_enabled", lambda: True)()
+DURATION = float(os.environ.get("INJECTME_STRESS_SECONDS", "0.2"))
+THREADS = 16 if FREE_THREADED else 8
+
+
+class Service:
+    def __init__(self, generation=0):
+        self.generation = generation
+
+
+class Repository:
+    def __init__(self, generation=0):
+        self.generation = generation
+
+
+def run_concurrently(*workers, duration=DURATION):
+    """
+    Run each worker in its own thread, repeatedly, until the duration
+    elapses or any of them fails.
+
+    :return: exceptions raised by the workers.
+    """
+    stop = threading.Event()
+    barrier = threading.Barrier(len(workers))
+    errors = []
+
+    def run(worker):
+        try:
+            barrier.wait()
+            while not stop.is_set():
+                worker()
+        except BaseException as error:  # pylint: disable=broad-except
+            errors.append(error)
+            stop.set()
+
+    threads = [threading.Thread(target=run, args=(w,)) for w in workers]
+    for thread in threads:
+        thread.start()
+    stop.wait(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return errors
+
+
+class TestConcurrency(unittest.TestCase):
+    def setUp(self):
+        if not FREE_THREADED:
+            interval = sys.getswitchinterval()
+            self.addCleanup(sys.setswitchinterval, interval)
+            sys.setswitchinterval(1e-6)
+
+    def test_single_registration_wins(self):
+        registry = DependenciesRegistry()
+        barrier = threading.Barrier(THREADS)
+        rounds = 0
+
+        def register(index, registered):
+            barrier.wait()
+            try:
+                registry.register_instance(Service, Service(index))
+            except DependencyAlreadyRegistered:
+                return
+            registered.append(index)
+
+        deadline = time.monotonic() + DURATION
+        while time.monotonic() < deadline or rounds < 10:
+            registered = []
+            threads = [
+                threading.Thread(target=register, args=(i, registered))
+                for i in range(THREADS)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(len(registered), 1)
+            self.assertEqual(registry.get(Service).generation, registered[0])
+            registry.clear()
+            rounds += 1
+
+    def test_reads_during_registration_and_clear(self):
+        registry = DependenciesRegistry()
+        generation = [0]
+
+        def writer():
+            registry.clear()
+            generation[0] += 1
+            registry.register_instance(Service, Service(generation[0]))
+            registry.register_factory(Repository, Repository)
+
+        def reader():
+            version = registry.version
+            for dependency in (Service, Repository):
+                try:
+                    instance = registry.get(dependency)
+                except DependencyNotFound:
+                    continue
+                self.assertIsInstance(instance, dependency)
+                self.assertLessEqual(instance.generation, generation[0])
+            for entry in registry.entries().values():
+                self.assertIsNotNone(entry.dependency_type)
+            self.assertGreaterEqual(registry.version, version)
+
+        errors = run_concurrently(writer, *[reader] * (THREADS - 1))
+
+        self.assertEqual(errors, [])
+
+    def test_singleton_created_once(self):
+        calls = []
+
+        def factory():
+            calls.append(None)
+            return Service()
+
+        deadline = time.monotonic() + DURATION
+        while time.monotonic() < deadline or not calls:
+            calls.clear()
+            registry = DependenciesRegistry()
+            registry.register_singleton(Service, factory)
+            barrier = threading.Barrier(THREADS)
+            instances = []
+
+            def get(registry=registry, barrier=barrier, instances=instances):
+                barrier.wait()
+                instances.append(registry.get(Service))
+
+            threads = [threading.Thread(target=get) for _ in range(THREADS)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(len(calls), 1)
+            self.assertTrue(all(i is instances[0] for i in instances))
+
+    def test_injection_during_registration(self):
+        injector = Injector()
+        registry = injector.registry
+
+        @injector
+        class Consumer:
+            service: Service
+            repository: Repository
+
+        registry.register_instance(Service, Service())
+        registry.register_factory(Repository, Repository)
+        scratch = []
+
+        def writer():
+            # every registration invalidates compiled injection plans
+            dependency = type("Scratch", (), {})
+            registry.register_instance(dependency, dependency())
+            scratch.append(dependency)
+            if len(scratch) > 100:
+                # re-register everything, consumers may see it missing
+                registry.clear()
+                scratch.clear()
+                registry.register_instance(Service, Service())
+                registry.register_factory(Repository, Repository)
+
+        def consumer():
+            try:
+                instance = Consumer()
+            except InjectionFailure as error:
+                self.assertIsInstance(error.__cause__, DependencyNotFound)
+                return
+            self.assertIsInstance(instance.service, Service)
+            self.assertIsInstance(instance.repository, Repository)
+
+        errors = run_concurrently(writer, *[consumer] * (THREADS - 1))
+
+        self.assertEqual(errors, [])
+
+    def test_child_registries_during_parent_registration(self):
+        parent = DependenciesRegistry()
+        parent.register_factory(Repository, Repository)
+        children = [parent.child() for _ in range(THREADS - 1)]
+        for child in children:
+            child.register_instance(Service, Service(1))
+        scratch = []
+
+        def writer():
+            dependency = type("Scratch", (), {})
+            parent.register_instance(dependency, dependency())
+            scratch.append(dependency)
+            if len(scratch) > 100:
+                parent.clear()
+                scratch.clear()
+                parent.register_factory(Repository, Repository)
+
+        def reader(child):
+            def read():
+                self.assertEqual(child.get(Service).generation, 1)
+                try:
+                    repository = child.get(Repository)
+                except DependencyNotFound:
+                    return
+                self.assertIsInstance(repository, Repository)
+
+            return read
+
+        errors = run_concurrently(writer, *map(reader, children))
+
+        self.assertEqual(errors, [])
+
+    def test_keyed_cache_bounded(self):
+        registry = DependenciesRegistry()
+        registry.register_keyed(Service, Service, max_size=4)
+        counts = []
+        lock = threading.Lock()
+
+        def reader():
+            for key in range(8):
+                instance = registry.get(KeyedDependency(Service, key))
+                self.assertEqual(instance.generation, key)
+            with lock:
+                counts.append(8)
+
+        errors = run_concurrently(*[reader] * THREADS)
+        stats = registry.get_entry(Service).provider.stats
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(stats.size, 4)
+        self.assertGreaterEqual(stats.hits + stats.misses, sum(counts))
@@ -1,10 +1,19 @@
+import asyncio
+import gc
+import threading
 import unittest
 
+try:
+    from typing import Annotated
+except ImportError:  # python < 3.9
+    Annotated = None
+
 from injectme import (
     InjectionFailure,
     InjectionNotSupported,
     Injector,
     DependenciesRegistry,
+    Lazy,
 )
 
 from .example_dep import (
@@ -76,12 +85,8 @@ class TestBasicInjecting(unittest.TestCase):
             some_class = SomeClass()
 
     def test_unsupported_injection_target(self):
-        def some_func():
-            pass
-
-
         with self.assertRaises(InjectionNotSupported):
-            self.injector(some_func)
+            self.injector(42)
 
     def test_custom_registry(self):
         registry = DependenciesRegistry()
@@ -227,7 +232,7 @@ class TestAdvandedInjecting(unittest.TestCase):
         self.assertIs(instance_a, some_derived_class.init_dep_aa)
         self.assertIs(instance_b, some_derived_class.init_dep_b)
 
-    def test_lack_of_super_does_not_initialize_dependency(self):
+    def test_lack_of_super_initializes_parent_dependency(self):
         injector = Injector()
         registry = injector.registry
 
@@ -249,7 +254,740 @@ class TestAdvandedInjecting(unittest.TestCase):
         registry.register_instance(DependencyB, instance_b)
 
         some_derived_class = SomeDerivedClass()
+        self.assertIs(instance_a, some_derived_class.dep_a)
         self.assertIs(instance_b, some_derived_class.dep_b)
 
-        with self.assertRaises(AttributeError):
-            getattr(some_derived_class, "dep_a")
+    def test_undecorated_base_dependency(self):
+        injector = Injector()
+        registry = injector.registry
+
+        class SomeBaseClass:
+            dep_a: DependencyA
+
+        @injector
+        class SomeDerivedClass(SomeBaseClass):
+            dep_b: DependencyB
+
+        instance_a = DependencyA()
+        instance_b = DependencyB()
+        registry.register_instance(DependencyA, instance_a)
+        registry.register_instance(DependencyB, instance_b)
+
+        some_derived_class = SomeDerivedClass()
+        self.assertIs(instance_a, some_derived_class.dep_a)
+        self.assertIs(instance_b, some_derived_class.dep_b)
+
+    def test_dependency_resolved_once_in_hierarchy(self):
+        injector = Injector()
+        registry = injector.registry
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return DependencyA()
+
+        @injector
+        class SomeBaseClass:
+            dep_a: DependencyA
+
+        @injector
+        class SomeMiddleClass(SomeBaseClass):
+            def __init__(self):
+                super().__init__()
+
+        @injector
+        class SomeDerivedClass(SomeMiddleClass):
+            dep_b: DependencyB
+
+        registry.register_factory(DependencyA, factory)
+        registry.register_instance(DependencyB, DependencyB())
+
+        some_derived_class = SomeDerivedClass()
+        self.assertIsInstance(some_derived_class.dep_a, DependencyA)
+        self.assertEqual(1, len(calls))
+
+    def test_dependency_resolved_once_when_decorated_twice(self):
+        injector = Injector()
+        registry = injector.registry
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return DependencyA()
+
+        @injector
+        @injector
+        class SomeClass:
+            dep_a: DependencyA
+
+        registry.register_factory(DependencyA, factory)
+
+        some_class = SomeClass()
+        self.assertIsInstance(some_class.dep_a, DependencyA)
+        self.assertEqual(1, len(calls))
+
+    def test_subclass_overrides_dependency(self):
+        injector = Injector()
+        registry = injector.registry
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return DependencyA()
+
+        @injector
+        class SomeBaseClass:
+            dep: DependencyA
+
+        @injector
+        class SomeDerivedClass(SomeBaseClass):
+            dep: DependencyB
+
+        instance_b = DependencyB()
+        registry.register_factory(DependencyA, factory)
+        registry.register_instance(DependencyB, instance_b)
+
+        some_derived_class = SomeDerivedClass()
+        self.assertIs(instance_b, some_derived_class.dep)
+        self.assertEqual([], calls)
+
+    def test_forward_reference(self):
+        from . import example_forward
+
+        registry = example_forward.injector.registry
+        instance_a = DependencyA()
+        service = example_forward.Service()
+        registry.register_instance(DependencyA, instance_a)
+        registry.register_instance(example_forward.Service, service)
+
+        consumer = example_forward.Consumer()
+        self.assertIs(instance_a, consumer.dep_a)
+        self.assertIs(service, consumer.service)
+        self.assertIs(service, example_forward.handle())
+
+    def test_string_annotation_of_factory(self):
+        from . import example_forward
+
+        registry = DependenciesRegistry()
+        service = example_forward.Service()
+        registry.register_instance(example_forward.Service, service)
+        registry.register_factory(
+            example_forward.Consumer, example_forward.create_consumer
+        )
+
+        consumer = registry.get(example_forward.Consumer)
+        self.assertIs(service, consumer.service)
+
+
+class TestInjectionPlan(unittest.TestCase):
+    def test_plan_reused_between_instantiations(self):
+        injector = Injector()
+        registry = injector.registry
+
+        @injector
+        class SomeClass:
+            dep: DependencyA
+
+        registry.register_instance(DependencyA, DependencyA())
+
+        SomeClass()
+        compiled = SomeClass.__injectme_plan__.compile()
+        SomeClass()
+
+        self.assertIs(compiled, SomeClass.__injectme_plan__._compiled)
+
+    def test_plan_invalidated_by_registry_change(self):
+        injector = Injector()
+        registry = injector.registry
+
+        @injector
+        class SomeClass:
+            dep: DependencyA
+
+        instance_a = DependencyA()
+        registry.register_instance(DependencyA, instance_a)
+        self.assertIs(instance_a, SomeClass().dep)
+
+        registry.clear()
+        with self.assertRaises(InjectionFailure):
+            SomeClass()
+
+        factory = FactoryA()
+        registry.register_factory(DependencyA, factory)
+        self.assertIs(factory.instance, SomeClass().dep)
+
+    def test_instances_set_through_property_setter(self):
+        injector = Injector()
+        registry = injector.registry
+
+        @injector
+        class SomeClass:
+            dep: DependencyA
+
+            @property
+            def dep(self):
+                return self._dep
+
+            @dep.setter
+            def dep(self, value):
+                self._dep = value
+
+        instance = DependencyA()
+        registry.register_instance(DependencyA, instance)
+
+        self.assertIs(SomeClass().dep, instance)
+
+    def test_instances_set_through_custom_setattr(self):
+        injector = Injector()
+        registry = injector.registry
+        assigned = []
+
+        @injector
+        class SomeClass:
+            dep: DependencyA
+
+            def __setattr__(self, name, value):
+                assigned.append(name)
+                super().__setattr__(name, value)
+
+        instance = DependencyA()
+        registry.register_instance(DependencyA, instance)
+
+        self.assertIs(SomeClass().dep, instance)
+        self.assertEqual(assigned, ["dep"])
+
+    def test_compiled_plans_keep_their_own_setattr_mode(self):
+        injector = Injector()
+        registry = injector.registry
+        assigned = []
+
+        @injector
+        class SomeClass:
+            dep: DependencyA
+
+            @property
+            def dep(self):
+                return self._dep
+
+            @dep.setter
+            def dep(self, value):
+                assigned.append(value)
+                self._dep = value
+
+        instance = DependencyA()
+        registry.register_instance(DependencyA, instance)
+        plan = SomeClass.__injectme_plan__
+        stale = plan.compile()
+        registry.clear()
+        registry.register_factory(DependencyA, DependencyA)
+        plan.compile()
+
+        # injection still running with the older plan honours the setter
+        plan._inject(SomeClass.__new__(SomeClass), stale)
+
+        self.assertFalse(stale.update_dict)
+        self.assertEqual(assigned, [instance])
+
+
+class TestSlotsInjecting(unittest.TestCase):
+    def setUp(self):
+        self.injector = Injector()
+        self.registry = self.injector.registry
+        self.registry.register_instance(DependencyA, DependencyA())
+        self.registry.register_factory(DependencyB, DependencyB)
+
+    def test_declared_slots(self):
+        @self.injector
+        class SomeClass:
+            __slots__ = ("dep", "dep_b")
+
+            dep: DependencyA
+            dep_b: DependencyB
+
+        some_class = SomeClass()
+
+        self.assertFalse(hasattr(some_class, "__dict__"))
+        self.assertIs(some_class.dep, self.registry.get(DependencyA))
+        self.assertIsInstance(some_class.dep_b, DependencyB)
+
+    def test_missing_slots_added(self):
+        @self.injector
+        class SomeClass:
+            __slots__ = "value"
+
+            dep: DependencyA
+
+            def __init__(self, value):
+                self.value = value
+
+        some_class = SomeClass(1)
+
+        self.assertFalse(hasattr(some_class, "__dict__"))
+        self.assertEqual(some_class.value, 1)
+        self.assertIs(some_class.dep, self.registry.get(DependencyA))
+
+    def test_super_in_slotted_copy(self):
+        class Base:
+            __slots__ = ()
+
+            def __init__(self):
+                self.initialized = True
+
+        @self.injector
+        class SomeClass(Base):
+            __slots__ = ("initialized",)
+
+            dep: DependencyA
+
+            def __init__(self):
+                super().__init__()
+
+        self.assertTrue(SomeClass().initialized)
+
+    def test_lazy_dependency_without_dict(self):
+        with self.assertRaises(InjectionNotSupported):
+
+            @Injector(self.registry, lazy=True)
+            class SomeClass:
+                __slots__ = ()
+
+                dep: DependencyA
+
+
+class TestBoundInstances(unittest.TestCase):
+    def setUp(self):
+        self.injector = Injector(bind_instances=True)
+        self.registry = self.injector.registry
+
+    def test_instance_not_stored_in_object(self):
+        @self.injector
+        class SomeClass:
+            dep: DependencyA
+
+        instance = DependencyA()
+        self.registry.register_instance(DependencyA, instance)
+
+        some_class = SomeClass()
+
+        self.assertIs(some_class.dep, instance)
+        self.assertNotIn("dep", vars(some_class))
+
+    def test_factory_stored_in_object(self):
+        @self.injector
+        class SomeClass:
+            dep: DependencyA
+
+        self.registry.register_factory(DependencyA, DependencyA)
+
+        some_class = SomeClass()
+
+        self.assertIs(some_class.dep, vars(some_class)["dep"])
+
+    def test_registry_changes_reflected(self):
+        @self.injector
+        class SomeClass:
+            dep: DependencyA
+
+        self.registry.register_instance(DependencyA, DependencyA())
+        some_class = SomeClass()
+
+        self.registry.clear()
+        with self.assertRaises(InjectionFailure):
+            some_class.dep
+
+        instance = DependencyA()
+        self.registry.register_instance(DependencyA, instance)
+        self.assertIs(some_class.dep, instance)
+
+        self.registry.clear()
+        factory = FactoryA()
+        self.registry.register_factory(DependencyA, factory)
+        self.assertIs(some_class.dep, factory.instance)
+
+    def test_slotted_class_without_slots(self):
+        @self.injector
+        class SomeClass:
+            __slots__ = ()
+
+            dep: DependencyA
+
+        instance = DependencyA()
+        self.registry.register_instance(DependencyA, instance)
+
+        self.assertIs(SomeClass().dep, instance)
+
+        self.registry.clear()
+        self.registry.register_factory(DependencyA, DependencyA)
+        with self.assertRaises(InjectionNotSupported):
+            SomeClass()
+
+
+class TestFunctionInjecting(unittest.TestCase):
+    def setUp(self):
+        self.injector = Injector()
+        self.registry = self.injector.registry
+        self.instance = DependencyA()
+        self.registry.register_instance(DependencyA, self.instance)
+
+    def test_function(self):
+        @self.injector
+        def some_func(value, dep: DependencyA, *, dep_b: DependencyB):
+            return value, dep, dep_b
+
+        self.registry.register_factory(DependencyB, DependencyB)
+
+        value, dep, dep_b = some_func(1)
+
+        self.assertEqual(value, 1)
+        self.assertIs(dep, self.instance)
+        self.assertIsInstance(dep_b, DependencyB)
+
+    def test_passed_arguments_not_injected(self):
+        @self.injector
+        def some_func(dep: DependencyA, dep_b: DependencyB):
+            return dep, dep_b
+
+        dep = DependencyA()
+        dep_b = DependencyB()
+
+        self.assertEqual(some_func(dep, dep_b), (dep, dep_b))
+        self.assertEqual(some_func(dep_b=dep_b), (self.instance, dep_b))
+
+    def test_default_used_for_missing_dependency(self):
+        @self.injector
+        def some_func(dep: DependencyA, dep_b: DependencyB = None):
+            return dep, dep_b
+
+        self.assertEqual(some_func(), (self.instance, None))
+
+    def test_missing_dependency(self):
+        @self.injector
+        def some_func(dep_b: DependencyB):
+            return dep_b
+
+        with self.assertRaises(InjectionFailure):
+            some_func()
+
+    def test_registry_changes_reflected(self):
+        @self.injector
+        def some_func(dep_b: DependencyB = None):
+            return dep_b
+
+        self.assertIsNone(some_func())
+
+        self.registry.register_factory(DependencyB, DependencyB)
+        self.assertIsInstance(some_func(), DependencyB)
+
+    def test_method(self):
+        injector = self.injector
+
+        class SomeClass:
+            @injector
+            def method(self, dep: DependencyA):
+                return self, dep
+
+        some_class = SomeClass()
+
+        self.assertEqual(some_class.method(), (some_class, self.instance))
+
+    def test_bound_method(self):
+        class SomeClass:
+            def method(self, dep: DependencyA):
+                return dep
+
+        method = self.injector(SomeClass().method)
+
+        self.assertIs(method(), self.instance)
+
+    def test_async_function(self):
+        async def factory():
+            return DependencyB()
+
+        @self.injector
+        async def some_func(dep: DependencyA, dep_b: DependencyB):
+            return dep, dep_b
+
+        self.registry.register_async_factory(DependencyB, factory)
+
+        dep, dep_b = asyncio.run(some_func())
+
+        self.assertIs(dep, self.instance)
+        self.assertIsInstance(dep_b, DependencyB)
+
+    def test_async_dependency_in_sync_function(self):
+        async def factory():
+            return DependencyB()
+
+        @self.injector
+        def some_func(dep_b: DependencyB):
+            return dep_b
+
+        self.registry.register_async_factory(DependencyB, factory)
+
+        with self.assertRaises(InjectionFailure):
+            some_func()
+
+    def test_pooled_dependency_released_after_call(self):
+        @self.injector
+        def some_func(dep_b: DependencyB):
+            return dep_b
+
+        self.registry.register_pooled(DependencyB, DependencyB)
+        pool = self.registry.get_entry(DependencyB).provider
+
+        self.assertIs(some_func(), some_func())
+        self.assertEqual(pool.in_use, 0)
+
+
+class TestLazyInjecting(unittest.TestCase):
+    def test_lazy_injector(self):
+        injector = Injector(lazy=True)
+        registry = injector.registry
+
+        @injector
+        class SomeClass:
+            dep: DependencyA
+
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return DependencyA()
+
+        registry.register_factory(DependencyA, factory)
+
+        some_class = SomeClass()
+        self.assertEqual(calls, [])
+
+        dep = some_class.dep
+        self.assertIs(dep, some_class.dep)
+        self.assertEqual(calls, [1])
+
+    @unittest.skipIf(Annotated is None, "typing.Annotated not available")
+    def test_lazy_field(self):
+        injector = Injector()
+        registry = injector.registry
+
+        @injector
+        class SomeClass:
+            dep_a: Annotated[DependencyA, Lazy()]
+            dep_b: DependencyB
+
+        instance_b = DependencyB()
+        registry.register_instance(DependencyB, instance_b)
+
+        some_class = SomeClass()
+        self.assertIs(instance_b, some_class.dep_b)
+        self.assertNotIn("dep_a", some_class.__dict__)
+
+        instance_a = DependencyA()
+        registry.register_instance(DependencyA, instance_a)
+        self.assertIs(instance_a, some_class.dep_a)
+
+    def test_lazy_injection_fail(self):
+        injector = Injector(lazy=True)
+
+        @injector
+        class SomeClass:
+            dep: DependencyA
+
+        some_class = SomeClass()
+        with self.assertRaises(InjectionFailure):
+            some_class.dep
+
+
+class TestAsyncInjecting(unittest.TestCase):
+    def test_create_async(self):
+        injector = Injector()
+        registry = injector.registry
+
+        @injector
+        class SomeClass:
+            dep_a: DependencyA
+            dep_b: DependencyB
+
+            def __init__(self, value):
+                self.value = value
+
+        arrived = []
+
+        async def create():
+            # awaited sequentially, the first factory would time out
+            started = asyncio.Event()
+
+            async def start():
+                arrived.append(None)
+                if len(arrived) == 2:
+                    started.set()
+                await asyncio.wait_for(started.wait(), 5)
+
+            async def factory_a():
+                await start()
+                return DependencyA()
+
+            async def factory_b():
+                await start()
+                return DependencyB()
+
+            registry.register_async_factory(DependencyA, factory_a)
+            registry.register_async_factory(DependencyB, factory_b)
+            return await injector.create_async(SomeClass, 1)
+
+        some_class = asyncio.run(create())
+
+        self.assertIsInstance(some_class.dep_a, DependencyA)
+        self.assertIsInstance(some_class.dep_b, DependencyB)
+        self.assertEqual(some_class.value, 1)
+        self.assertEqual(len(arrived), 2)
+
+    def test_sync_creation_with_async_dependency(self):
+        injector = Injector()
+
+        @injector
+        class SomeClass:
+            dep: DependencyA
+
+        async def factory():
+            return DependencyA()
+
+        injector.registry.register_async_factory(DependencyA, factory)
+
+        with self.assertRaises(InjectionFailure):
+            SomeClass()
+
+    def test_create_async_not_marked_class(self):
+        class SomeClass:
+            dep: DependencyA
+
+        with self.assertRaises(InjectionNotSupported):
+            asyncio.run(Injector().create_async(SomeClass))
+
+
+class TestWarmUp(unittest.TestCase):
+    def setUp(self):
+        self.injector = Injector()
+        self.registry = self.injector.registry
+
+    def test_targets(self):
+        @self.injector
+        class SomeClass:
+            dep: DependencyA
+
+        self.assertEqual(self.injector.targets, [SomeClass])
+
+    def test_validate(self):
+        @self.injector
+        class SomeClass:
+            dep: DependencyA
+
+        with self.assertRaises(InjectionFailure):
+            self.injector.validate()
+
+        self.registry.register_instance(DependencyA, DependencyA())
+        self.injector.validate()
+
+    def test_validate_lazy(self):
+        injector = Injector(lazy=True)
+
+        @injector
+        class SomeClass:
+            dep: DependencyA
+
+        with self.assertRaises(InjectionFailure):
+            injector.validate()
+
+    def test_warm_up_creates_singletons(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return DependencyA()
+
+        @self.injector
+        class SomeClass:
+            dep: DependencyA
+
+        self.registry.register_singleton(DependencyA, factory)
+        self.injector.warm_up()
+
+        self.assertEqual(calls, [1])
+        self.assertIsNotNone(SomeClass.__injectme_plan__._compiled)
+
+        SomeClass()
+        self.assertEqual(calls, [1])
+
+    def test_prefork(self):
+        @self.injector
+        class SomeClass:
+            dep_a: DependencyA
+            dep_b: DependencyB
+
+        self.registry.register_singleton(DependencyA, DependencyA)
+        self.registry.register_per_process(DependencyB, DependencyB)
+        self.addCleanup(gc.unfreeze)
+
+        self.injector.prefork()
+
+        self.assertIsNotNone(SomeClass.__injectme_plan__._compiled)
+        self.assertTrue(self.registry.get_entry(DependencyA).provider.created)
+        self.assertFalse(
+            self.registry.get_entry(DependencyB).provider.created
+        )
+
+    def test_warm_up_in_threads(self):
+        # created one after another, the first factory would time out
+        started = threading.Barrier(2, timeout=5)
+
+        def factory():
+            started.wait()
+            return DependencyA()
+
+        def other_factory():
+            started.wait()
+            return DependencyB()
+
+        self.registry.register_singleton(DependencyA, factory)
+        self.registry.register_singleton(DependencyB, other_factory)
+
+        self.injector.warm_up(max_workers=2)
+
+        self.assertTrue(self.registry.get_entry(DependencyA).provider.created)
+        self.assertTrue(self.registry.get_entry(DependencyB).provider.created)
+
+    def test_warm_up_async_plan(self):
+        @self.injector
+        class SomeClass:
+            dep: DependencyA
+
+        async def factory():
+            return DependencyA()
+
+        self.registry.register_async_factory(DependencyA, factory)
+        self.injector.warm_up()
+
+        self.assertIsNotNone(SomeClass.__injectme_plan__._compiled_async)
+
+    def test_warm_up_failure(self):
+        @self.injector
+        class SomeClass:
+            dep: DependencyA
+
+        with self.assertRaises(InjectionFailure):
+            self.injector.warm_up()
+
+    def test_freeze(self):
+        @self.injector
+        class SomeClass:
+            dep: DependencyA
+
+        self.registry.register_singleton(DependencyA, DependencyA)
+        self.injector.freeze()
+
+        self.assertTrue(self.registry.frozen)
+        self.assertIsNotNone(SomeClass.__injectme_plan__._compiled)
+        self.assertIs(SomeClass().dep, self.registry.get(DependencyA))
+
+        self.injector.thaw()
+        self.registry.clear()
+        with self.assertRaises(InjectionFailure):
+            SomeClass()
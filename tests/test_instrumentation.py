@@ -0,0 +1,339 @@
+import asyncio
+import json
+import time
+import unittest
+
+from injectme import (
+    DependenciesRegistry,
+    Hooks,
+    Injector,
+    ResolutionMetrics,
+    Tracer,
+)
+
+from .example_dep import DependencyA, DependencyB
+
+
+class RecordingHooks(Hooks):
+    def __init__(self):
+        self.events = []
+
+    def on_resolve_start(self, dependency):
+        self.events.append(("start", dependency))
+
+    def on_resolve_end(self, dependency, elapsed):
+        self.events.append(("end", dependency))
+
+    def on_factory_call(self, dependency, elapsed):
+        self.events.append(("factory", dependency))
+
+
+class Service:
+    def __init__(self, dep_a: DependencyA):
+        self.dep_a = dep_a
+
+
+class TestHooks(unittest.TestCase):
+    def test_no_hooks_installed(self):
+        registry = DependenciesRegistry()
+
+        self.assertIsNone(registry.hooks)
+        self.assertNotIn("get", registry.__dict__)
+
+    def test_registry_get(self):
+        registry = DependenciesRegistry()
+        hooks = RecordingHooks()
+        registry.register_instance(DependencyA, DependencyA())
+        registry.register_factory(DependencyB, DependencyB)
+        registry.add_hooks(hooks)
+
+        registry.get(DependencyA)
+        registry.get(DependencyB)
+
+        self.assertEqual(
+            hooks.events,
+            [
+                ("start", DependencyA),
+                ("end", DependencyA),
+                ("start", DependencyB),
+                ("factory", DependencyB),
+                ("end", DependencyB),
+            ],
+        )
+
+    def test_remove_hooks(self):
+        registry = DependenciesRegistry()
+        hooks = RecordingHooks()
+        registry.register_instance(DependencyA, DependencyA())
+        registry.add_hooks(hooks)
+        registry.remove_hooks(hooks)
+
+        registry.get(DependencyA)
+
+        self.assertEqual(hooks.events, [])
+        self.assertIsNone(registry.hooks)
+
+    def test_injection(self):
+        injector = Injector()
+        hooks = RecordingHooks()
+
+        @injector
+        class SomeClass:
+            dep_a: DependencyA
+            dep_b: DependencyB
+
+        injector.registry.register_instance(DependencyA, DependencyA())
+        injector.registry.register_factory(DependencyB, DependencyB)
+
+        SomeClass()
+        injector.add_hooks(hooks)
+        SomeClass()
+        injector.remove_hooks(hooks)
+        SomeClass()
+
+        self.assertEqual(
+            hooks.events,
+            [
+                ("start", DependencyA),
+                ("end", DependencyA),
+                ("start", DependencyB),
+                ("factory", DependencyB),
+                ("end", DependencyB),
+            ],
+        )
+
+    def test_factory_graph(self):
+        registry = DependenciesRegistry()
+        hooks = RecordingHooks()
+        registry.register_factory(DependencyA, DependencyA)
+        registry.register_factory(Service, Service)
+        registry.add_hooks(hooks)
+
+        registry.get(Service)
+
+        self.assertEqual(
+            hooks.events,
+            [
+                ("start", Service),
+                ("start", DependencyA),
+                ("factory", DependencyA),
+                ("end", DependencyA),
+                ("factory", Service),
+                ("end", Service),
+            ],
+        )
+
+    def test_async_resolution(self):
+        registry = DependenciesRegistry()
+        hooks = RecordingHooks()
+
+        async def factory():
+            return DependencyA()
+
+        registry.register_async_factory(DependencyA, factory)
+        registry.add_hooks(hooks)
+
+        dep = asyncio.run(registry.aget(DependencyA))
+
+        self.assertIsInstance(dep, DependencyA)
+        self.assertEqual(
+            hooks.events,
+            [
+                ("start", DependencyA),
+                ("factory", DependencyA),
+                ("end", DependencyA),
+            ],
+        )
+
+
+class TestResolutionMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = DependenciesRegistry()
+        self.metrics = ResolutionMetrics()
+        self.registry.register_instance(DependencyA, DependencyA())
+        self.registry.register_factory(DependencyB, DependencyB)
+        self.registry.add_hooks(self.metrics)
+
+    def test_as_dict(self):
+        for _ in range(3):
+            self.registry.get(DependencyA)
+        self.registry.get(DependencyB)
+
+        metrics = self.metrics.as_dict()
+        name_a = "tests.example_dep.DependencyA"
+        name_b = "tests.example_dep.DependencyB"
+
+        self.assertEqual(metrics[name_a]["resolutions"]["count"], 3)
+        self.assertNotIn("factory_calls", metrics[name_a])
+        self.assertEqual(metrics[name_b]["resolutions"]["count"], 1)
+        self.assertEqual(metrics[name_b]["factory_calls"]["count"], 1)
+        self.assertEqual(
+            metrics[name_a]["resolutions"]["buckets"]["+Inf"], 3
+        )
+
+    def test_to_prometheus(self):
+        self.registry.get(DependencyB)
+
+        text = self.metrics.to_prometheus()
+
+        self.assertIn("# TYPE injectme_resolve_duration_seconds histogram", text)
+        self.assertIn(
+            'injectme_factory_duration_seconds_count{dependency='
+            '"tests.example_dep.DependencyB"} 1',
+            text,
+        )
+        self.assertIn(
+            'injectme_resolve_duration_seconds_bucket{dependency='
+            '"tests.example_dep.DependencyB",le="+Inf"} 1',
+            text,
+        )
+
+    def test_reset(self):
+        self.registry.get(DependencyA)
+        self.metrics.reset()
+
+        self.assertEqual(self.metrics.as_dict(), {})
+
+
+class Repository:
+    def __init__(self, dep_a: DependencyA):
+        time.sleep(0.01)
+        self.dep_a = dep_a
+
+
+class Handler:
+    def __init__(self, repository: Repository, dep_a: DependencyA):
+        self.repository = repository
+
+
+def slow_dependency():
+    time.sleep(0.02)
+    return DependencyA()
+
+
+class TestTracer(unittest.TestCase):
+    def setUp(self):
+        self.injector = Injector()
+        self.registry = self.injector.registry
+
+    def test_construction_tree(self):
+        @self.injector
+        class SomeClass:
+            dep_a: DependencyA
+            dep_b: DependencyB
+
+        self.registry.register_instance(DependencyA, DependencyA())
+        self.registry.register_factory(DependencyB, DependencyB)
+
+        with self.injector.tracing() as tracer:
+            SomeClass()
+
+        (trace,) = tracer.traces
+        self.assertIs(trace.dependency, SomeClass)
+        self.assertEqual(trace.kind, "construction")
+        self.assertEqual(
+            [child.dependency for child in trace.children],
+            [DependencyA, DependencyB],
+        )
+        self.assertIsNone(trace.children[0].factory_elapsed)
+        self.assertIsNotNone(trace.children[1].factory_elapsed)
+        self.assertIsNone(self.registry.hooks)
+
+    def test_critical_path(self):
+        @self.injector
+        class SomeClass:
+            handler: Handler
+            dep_b: DependencyB
+
+        self.registry.register_factory(DependencyA, slow_dependency)
+        self.registry.register_factory(DependencyB, DependencyB)
+        self.registry.register_factory(Repository, Repository)
+        self.registry.register_factory(Handler, Handler)
+
+        with self.injector.tracing() as tracer:
+            SomeClass()
+
+        path, duration = tracer.critical_path()
+        self.assertEqual(path, [SomeClass, Handler, Repository, DependencyA])
+        self.assertGreaterEqual(duration, 0.03)
+
+    def test_async_construction_tree(self):
+        @self.injector
+        class SomeClass:
+            dep_a: DependencyA
+            dep_b: DependencyB
+
+        async def factory_a():
+            await asyncio.sleep(0.01)
+            return DependencyA()
+
+        async def factory_b():
+            return DependencyB()
+
+        self.registry.register_async_factory(DependencyA, factory_a)
+        self.registry.register_async_factory(DependencyB, factory_b)
+
+        with self.injector.tracing() as tracer:
+            asyncio.run(self.injector.create_async(SomeClass))
+
+        (trace,) = tracer.traces
+        self.assertIs(trace.dependency, SomeClass)
+        self.assertEqual(
+            {child.dependency for child in trace.children},
+            {DependencyA, DependencyB},
+        )
+
+    def test_failed_resolution_is_skipped(self):
+        def failing():
+            raise ValueError()
+
+        self.registry.register_factory(DependencyA, failing)
+        self.registry.register_factory(DependencyB, DependencyB)
+        tracer = Tracer()
+        self.registry.add_hooks(tracer)
+
+        with self.assertRaises(ValueError):
+            self.registry.get(DependencyA)
+        self.registry.get(DependencyB)
+
+        (trace,) = tracer.traces
+        self.assertIs(trace.dependency, DependencyB)
+        self.assertEqual(trace.children, [])
+
+    def test_exports(self):
+        self.registry.register_factory(DependencyA, DependencyA)
+        self.registry.register_factory(Repository, Repository)
+
+        with self.injector.tracing(max_traces=1) as tracer:
+            self.registry.get(Repository)
+            self.registry.get(Repository)
+
+        exported = json.loads(tracer.to_json())
+        self.assertEqual(len(exported["traces"]), 1)
+        self.assertEqual(
+            exported["critical_path"]["dependencies"],
+            [
+                "tests.test_instrumentation.Repository",
+                "tests.example_dep.DependencyA",
+            ],
+        )
+        (edge,) = exported["edges"]
+        self.assertEqual(edge["calls"], 2)
+
+        dot = tracer.to_dot()
+        self.assertTrue(dot.startswith("digraph injectme {"))
+        self.assertIn(
+            '"tests.test_instrumentation.Repository" -> '
+            '"tests.example_dep.DependencyA" [label="2", color=red',
+            dot,
+        )
+
+    def test_reset(self):
+        self.registry.register_factory(DependencyA, DependencyA)
+
+        with self.injector.tracing() as tracer:
+            self.registry.get(DependencyA)
+        tracer.reset()
+
+        self.assertEqual(tracer.traces, [])
+        self.assertEqual(tracer.critical_path(), ([], 0.0))
@@ -0,0 +1,159 @@
+import time
+import unittest
+
+try:
+    from typing import Annotated
+except ImportError:  # python < 3.9
+    Annotated = None
+
+from injectme import (
+    DependencyNotFound,
+    InjectionFailure,
+    Injector,
+    Key,
+    KeyedDependency,
+    KeyRequired,
+    Lazy,
+)
+
+from .example_dep import DependencyA, DependencyB
+
+
+class Client:
+    def __init__(self, region, dep_a: DependencyA):
+        self.region = region
+        self.dep_a = dep_a
+
+
+class TestKeyedFactory(unittest.TestCase):
+    def setUp(self):
+        self.injector = Injector()
+        self.registry = self.injector.registry
+        self.registry.register_instance(DependencyA, DependencyA())
+
+    def stats(self):
+        return self.registry.get_entry(Client).provider.stats
+
+    def test_instances_cached_per_key(self):
+        self.registry.register_keyed(Client, Client)
+
+        eu_west = self.registry.get(KeyedDependency(Client, "eu-west"))
+        us_east = self.registry.get(KeyedDependency(Client, "us-east"))
+
+        self.assertEqual(eu_west.region, "eu-west")
+        self.assertIs(eu_west.dep_a, self.registry.get(DependencyA))
+        self.assertEqual(us_east.region, "us-east")
+        self.assertIs(
+            self.registry.get(KeyedDependency(Client, "eu-west")), eu_west
+        )
+        self.assertEqual(self.stats(), (1, 2, 0, 2))
+
+    def test_least_recently_used_evicted(self):
+        disposed = []
+        self.registry.register_keyed(
+            Client, Client, max_size=2, dispose=disposed.append
+        )
+
+        first = self.registry.get(KeyedDependency(Client, 1))
+        self.registry.get(KeyedDependency(Client, 2))
+        self.registry.get(KeyedDependency(Client, 1))
+        second = self.registry.get(KeyedDependency(Client, 3))
+
+        self.assertIs(self.registry.get(KeyedDependency(Client, 1)), first)
+        self.assertEqual([client.region for client in disposed], [2])
+        self.assertIs(second.region, 3)
+        self.assertEqual(self.stats().evictions, 1)
+        self.assertEqual(self.stats().size, 2)
+
+    def test_ttl(self):
+        self.registry.register_keyed(Client, Client, ttl=0.01)
+
+        first = self.registry.get(KeyedDependency(Client, "eu-west"))
+        time.sleep(0.02)
+        second = self.registry.get(KeyedDependency(Client, "eu-west"))
+
+        self.assertIsNot(first, second)
+        self.assertEqual(self.stats(), (0, 2, 1, 1))
+
+    def test_evict_and_clear(self):
+        disposed = []
+        self.registry.register_keyed(Client, Client, dispose=disposed.append)
+        first = self.registry.get(KeyedDependency(Client, 1))
+        self.registry.get(KeyedDependency(Client, 2))
+        provider = self.registry.get_entry(Client).provider
+
+        provider.evict(1)
+        self.assertIsNot(self.registry.get(KeyedDependency(Client, 1)), first)
+
+        provider.clear()
+        self.assertEqual(len(disposed), 3)
+        self.assertEqual(self.stats().size, 0)
+
+    def test_key_required(self):
+        self.registry.register_keyed(Client, Client)
+
+        with self.assertRaises(KeyRequired):
+            self.registry.get(Client)
+
+    def test_not_keyed_dependency(self):
+        self.registry.register_factory(DependencyB, DependencyB)
+
+        with self.assertRaises(DependencyNotFound):
+            self.registry.get(KeyedDependency(DependencyB, 1))
+        with self.assertRaises(DependencyNotFound):
+            self.registry.get(KeyedDependency(Client, 1))
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            self.registry.register_keyed(Client, Client, max_size=0)
+        with self.assertRaises(ValueError):
+            self.registry.register_keyed(Client, Client, ttl=0)
+
+    @unittest.skipIf(Annotated is None, "typing.Annotated not available")
+    def test_injection(self):
+        @self.injector
+        class SomeClass:
+            eu_west: Annotated[Client, Key("eu-west")]
+            us_east: Annotated[Client, Key("us-east"), Lazy()]
+
+        @self.injector
+        def handler(client: Annotated[Client, Key("eu-west")]):
+            return client
+
+        def factory(client: Annotated[Client, Key("us-east")]):
+            return DependencyB()
+
+        self.registry.register_keyed(Client, Client)
+        self.registry.register_factory(DependencyB, factory)
+        self.registry.validate()
+
+        some_class = SomeClass()
+
+        self.assertEqual(some_class.eu_west.region, "eu-west")
+        self.assertEqual(some_class.us_east.region, "us-east")
+        self.assertIs(handler(), some_class.eu_west)
+        self.assertIsInstance(self.registry.get(DependencyB), DependencyB)
+
+    @unittest.skipIf(Annotated is None, "typing.Annotated not available")
+    def test_injection_of_missing_keyed_dependency(self):
+        @self.injector
+        class SomeClass:
+            client: Annotated[Client, Key("eu-west")]
+
+        with self.assertRaises(InjectionFailure):
+            SomeClass()
+
+    def test_injection_without_key(self):
+        @self.injector
+        class SomeClass:
+            client: Client
+
+        self.registry.register_keyed(Client, Client)
+
+        with self.assertRaises(InjectionFailure):
+            self.injector.validate()
+        with self.assertRaises(InjectionFailure):
+            self.injector.warm_up()
+        with self.assertRaises(InjectionFailure) as context:
+            SomeClass()
+        self.assertIsInstance(context.exception.__cause__, KeyRequired)
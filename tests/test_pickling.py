@@ -0,0 +1,157 @@
+import copy
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from injectme import Injector, worker_initializer
+
+from . import example_pickle
+from .example_dep import DependencyA
+from .example_pickle import (
+    Connection,
+    DerivedTask,
+    Handler,
+    SlottedTask,
+    StatefulTask,
+    Task,
+)
+
+
+class TestPickling(unittest.TestCase):
+    def setUp(self):
+        self.registry = example_pickle.injector.registry
+        self.registry.clear()
+        self.addCleanup(self.registry.clear)
+        example_pickle.configure()
+
+    def test_injected_attributes_are_not_pickled(self):
+        task = Task("payload")
+
+        restored = pickle.loads(pickle.dumps(task))
+
+        self.assertEqual(restored.payload, "payload")
+        self.assertIsInstance(restored.connection, Connection)
+        self.assertIsNot(restored.connection, task.connection)
+
+    def test_all_protocols(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            for task in (
+                Task("payload"),
+                SlottedTask("payload"),
+                StatefulTask("payload"),
+                DerivedTask("payload"),
+            ):
+                with self.subTest(protocol=protocol, cls=type(task)):
+                    restored = pickle.loads(pickle.dumps(task, protocol))
+
+                    self.assertIsInstance(restored.connection, Connection)
+
+    def test_only_injected_attributes(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            with self.subTest(protocol=protocol):
+                handler = Handler()
+
+                restored = pickle.loads(pickle.dumps(handler, protocol))
+
+                self.assertIsInstance(restored.connection, Connection)
+                self.assertIsNot(restored.connection, handler.connection)
+
+    def test_dependencies_resolved_from_current_registry(self):
+        data = pickle.dumps(Task("payload"))
+        connection = Connection()
+        self.registry.clear()
+        self.registry.register_instance(Connection, connection)
+
+        restored = pickle.loads(data)
+
+        self.assertIs(restored.connection, connection)
+
+    def test_slots(self):
+        task = SlottedTask("payload")
+
+        restored = pickle.loads(pickle.dumps(task))
+
+        self.assertEqual(restored.payload, "payload")
+        self.assertIsInstance(restored.connection, Connection)
+
+    def test_own_state_methods(self):
+        task = StatefulTask("payload")
+
+        restored = pickle.loads(pickle.dumps(task))
+
+        self.assertEqual(restored.restored, {"payload": "payload"})
+        self.assertIsInstance(restored.connection, Connection)
+
+    def test_inheritance(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return DependencyA()
+
+        data = pickle.dumps(DerivedTask("payload"))
+        self.registry.clear()
+        self.registry.register_factory(Connection, Connection)
+        self.registry.register_factory(DependencyA, factory)
+
+        restored = pickle.loads(data)
+
+        self.assertEqual(restored.payload, "payload")
+        self.assertIsInstance(restored.connection, Connection)
+        self.assertIsInstance(restored.dep_a, DependencyA)
+        self.assertEqual(calls, [1])
+
+    def test_copy(self):
+        task = Task("payload")
+
+        copied = copy.copy(task)
+
+        self.assertEqual(copied.payload, "payload")
+        self.assertIsInstance(copied.connection, Connection)
+
+    def test_process_pool(self):
+        initializer = worker_initializer(
+            "tests.example_pickle:configure", "tests.example_pickle:injector"
+        )
+        with ProcessPoolExecutor(1, initializer=initializer) as pool:
+            payload, injected, factory = pool.submit(
+                example_pickle.run, Task("payload")
+            ).result()
+
+        self.assertEqual(payload, "payload")
+        self.assertTrue(injected)
+        self.assertIs(factory, Connection)
+
+
+class TestWorkerInitializer(unittest.TestCase):
+    def test_configures_empty_registry(self):
+        injector = Injector()
+        calls = []
+
+        def configure():
+            calls.append(1)
+            injector.registry.register_singleton(DependencyA, DependencyA)
+
+        initializer = worker_initializer(configure, injector)
+        initializer()
+
+        self.assertEqual(calls, [1])
+        entry = injector.registry.get_entry(DependencyA)
+        self.assertTrue(entry.provider.created)
+
+    def test_inherited_registry_is_not_configured_again(self):
+        injector = Injector()
+        injector.registry.register_instance(DependencyA, DependencyA())
+        calls = []
+
+        initializer = worker_initializer(lambda: calls.append(1), injector)
+        initializer()
+
+        self.assertEqual(calls, [])
+
+    def test_initializer_is_picklable(self):
+        initializer = worker_initializer(
+            "tests.example_pickle:configure", "tests.example_pickle:injector"
+        )
+
+        self.assertIsNotNone(pickle.loads(pickle.dumps(initializer)))
@@ -0,0 +1,168 @@
+import gc
+import threading
+import time
+import unittest
+
+from injectme import (
+    InjectionFailure,
+    InjectionNotSupported,
+    Injector,
+    PoolExhausted,
+    release,
+    releasing,
+)
+
+from .example_dep import DependencyA
+
+
+class TestPool(unittest.TestCase):
+    def setUp(self):
+        self.injector = Injector()
+        self.registry = self.injector.registry
+
+        @self.injector
+        class SomeClass:
+            dep: DependencyA
+
+        self.some_class = SomeClass
+
+    def pool(self):
+        return self.registry.get_entry(DependencyA).provider
+
+    def test_released_instance_is_reused(self):
+        self.registry.register_pooled(DependencyA, DependencyA)
+
+        with releasing(self.some_class()) as first:
+            dep = first.dep
+            self.assertEqual(self.pool().in_use, 1)
+
+        second = self.some_class()
+
+        self.assertIs(second.dep, dep)
+        self.assertEqual(self.pool().idle, 0)
+
+    def test_instances_in_use_are_not_shared(self):
+        self.registry.register_pooled(DependencyA, DependencyA)
+
+        first = self.some_class()
+        second = self.some_class()
+
+        self.assertIsNot(first.dep, second.dep)
+
+    def test_garbage_collected_owner_releases_instance(self):
+        self.registry.register_pooled(DependencyA, DependencyA)
+
+        owner = self.some_class()
+        del owner
+        gc.collect()
+
+        self.assertEqual(self.pool().in_use, 0)
+        self.assertEqual(self.pool().idle, 1)
+
+    def test_release_is_idempotent(self):
+        self.registry.register_pooled(DependencyA, DependencyA)
+
+        owner = self.some_class()
+        release(owner)
+        release(owner)
+        del owner
+        gc.collect()
+
+        self.assertEqual(self.pool().idle, 1)
+
+    def test_max_size_timeout(self):
+        self.registry.register_pooled(
+            DependencyA, DependencyA, max_size=1, timeout=0.01
+        )
+
+        owner = self.some_class()
+
+        with self.assertRaises(PoolExhausted):
+            self.pool().acquire()
+
+        release(owner)
+        self.assertIs(self.pool().acquire(), owner.dep)
+
+
+    def test_exhausted_pool_fails_injection(self):
+        self.registry.register_pooled(
+            DependencyA, DependencyA, max_size=1, timeout=0.01
+        )
+
+        owner = self.some_class()
+
+        with self.assertRaises(InjectionFailure) as context:
+            self.some_class()
+        self.assertIsInstance(context.exception.__cause__, PoolExhausted)
+        release(owner)
+    def test_waits_for_released_instance(self):
+        self.registry.register_pooled(DependencyA, DependencyA, max_size=1)
+        owner = self.some_class()
+        timer = threading.Timer(0.05, release, (owner,))
+        timer.start()
+
+        other = self.some_class()
+        timer.join()
+
+        self.assertIs(other.dep, owner.dep)
+
+    def test_idle_eviction(self):
+        disposed = []
+        self.registry.register_pooled(
+            DependencyA,
+            DependencyA,
+            min_size=1,
+            idle_timeout=0.01,
+            dispose=disposed.append,
+        )
+        pool = self.pool()
+        instances = [pool.acquire() for _ in range(3)]
+        for instance in instances:
+            pool.release(instance)
+
+        time.sleep(0.02)
+        pool.acquire()
+
+        self.assertEqual(disposed, instances[:2])
+        self.assertEqual(pool.idle, 0)
+
+    def test_warm_up_fills_pool(self):
+        self.registry.register_pooled(DependencyA, DependencyA, min_size=2)
+
+        self.injector.warm_up()
+
+        self.assertEqual(self.pool().idle, 2)
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            self.registry.register_pooled(
+                DependencyA, DependencyA, min_size=2, max_size=1
+            )
+
+    def test_owner_without_weakref(self):
+        self.registry.register_pooled(DependencyA, DependencyA)
+
+        @self.injector
+        class Slotted:
+            __slots__ = ("dep",)
+
+            dep: DependencyA
+
+        with self.assertRaises(InjectionNotSupported):
+            Slotted()
+
+        self.assertEqual(self.pool().in_use, 0)
+
+    def test_slotted_owner(self):
+        self.registry.register_pooled(DependencyA, DependencyA)
+
+        @self.injector
+        class Slotted:
+            __slots__ = ("dep", "__weakref__")
+
+            dep: DependencyA
+
+        owner = Slotted()
+        release(owner)
+
+        self.assertEqual(self.pool().idle, 1)
@@ -1,12 +1,35 @@
+import asyncio
+import gc
+import os
+import threading
+import time
 import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from injectme import (
+    AsyncResolutionRequired,
+    CircularDependency,
     DependenciesRegistry,
     DependencyAlreadyRegistered,
     DependencyNotFound,
+    Hooks,
+    InjectionFailure,
+    InjectionNotSupported,
+    Injector,
+    KeyedDependency,
+    RegistryFrozen,
+    release,
 )
 
-from .example_dep import DependencyA as Dependency, FactoryA as Factory
+from .example_dep import (
+    DependencyA as Dependency,
+    DependencyB,
+    FactoryA as Factory,
+)
+
+
+# module name colliding with the "settings" string key
+settings = {"debug": True}
 
 
 class TestRegistry(unittest.TestCase):
@@ -74,3 +97,910 @@ class TestRegistry(unittest.TestCase):
 
         with self.assertRaises(DependencyNotFound):
             registry.get(Dependency)
+
+    def test_register_singleton(self):
+        registry = DependenciesRegistry()
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return Dependency()
+
+        registry.register_singleton(Dependency, factory)
+        self.assertEqual(calls, [])
+
+        result_a = registry.get(Dependency)
+        result_b = registry.get(Dependency)
+
+        self.assertIs(result_a, result_b)
+        self.assertEqual(calls, [1])
+
+    def test_register_singleton_twice(self):
+        registry = DependenciesRegistry()
+        registry.register_singleton(Dependency, Dependency)
+        with self.assertRaises(DependencyAlreadyRegistered):
+            registry.register_singleton(Dependency, Dependency)
+
+    def test_singleton_concurrent_creation(self):
+        registry = DependenciesRegistry()
+        calls = []
+
+        def factory():
+            calls.append(1)
+            time.sleep(0.01)
+            return Dependency()
+
+        registry.register_singleton(Dependency, factory)
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(registry.get(Dependency))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_concurrent_registration(self):
+        registry = DependenciesRegistry()
+        keys = [type(f"Key{i}", (), {}) for i in range(64)]
+        registered = []
+        barrier = threading.Barrier(16)
+
+        def register(thread_id):
+            barrier.wait()
+            for key in keys:
+                try:
+                    registry.register_instance(key, thread_id)
+                except DependencyAlreadyRegistered:
+                    continue
+                registered.append(key)
+
+        threads = [
+            threading.Thread(target=register, args=(i,)) for i in range(16)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(map(id, registered)), sorted(map(id, keys)))
+        for key in keys:
+            registry.get(key)
+
+
+class TestAsyncRegistry(unittest.TestCase):
+    def test_register_async_factory(self):
+        registry = DependenciesRegistry()
+
+        async def factory():
+            return Dependency()
+
+        registry.register_async_factory(Dependency, factory)
+
+        result_a = asyncio.run(registry.aget(Dependency))
+        result_b = asyncio.run(registry.aget(Dependency))
+
+        self.assertIsInstance(result_a, Dependency)
+        self.assertIsNot(result_a, result_b)
+
+    def test_async_factory_requires_aget(self):
+        registry = DependenciesRegistry()
+
+        async def factory():
+            return Dependency()
+
+        registry.register_async_factory(Dependency, factory)
+
+        with self.assertRaises(AsyncResolutionRequired):
+            registry.get(Dependency)
+
+    def test_aget_sync_dependencies(self):
+        registry = DependenciesRegistry()
+        instance = Dependency()
+        registry.register_instance(Dependency, instance)
+
+        self.assertIs(instance, asyncio.run(registry.aget(Dependency)))
+
+    def test_async_singleton(self):
+        registry = DependenciesRegistry()
+        calls = []
+
+        async def factory():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return Dependency()
+
+        registry.register_async_factory(Dependency, factory, singleton=True)
+
+        async def resolve():
+            return await asyncio.gather(
+                *(registry.aget(Dependency) for _ in range(5))
+            )
+
+        results = asyncio.run(resolve())
+
+        self.assertEqual(calls, [1])
+        self.assertTrue(all(result is results[0] for result in results))
+
+
+class Service:
+    def __init__(self, dep: Dependency, dep_b: DependencyB):
+        self.dep = dep
+        self.dep_b = dep_b
+
+
+class TestFactoryDependencies(unittest.TestCase):
+    def test_class_with_dependencies(self):
+        registry = DependenciesRegistry()
+        instance = Dependency()
+        registry.register_instance(Dependency, instance)
+        registry.register_factory(DependencyB, DependencyB)
+        registry.register_factory(Service, Service)
+
+        service = registry.get(Service)
+
+        self.assertIs(service.dep, instance)
+        self.assertIsInstance(service.dep_b, DependencyB)
+
+    def test_dependency_shared_within_graph(self):
+        registry = DependenciesRegistry()
+
+        def factory_b(dep: Dependency):
+            return (DependencyB(), dep)
+
+        def factory_service(dep: Dependency, dep_b: DependencyB):
+            return dep, dep_b
+
+        registry.register_factory(Dependency, Dependency)
+        registry.register_factory(DependencyB, factory_b)
+        registry.register_factory(Service, factory_service)
+
+        dep, (_, dep_of_b) = registry.get(Service)
+        other_dep, _ = registry.get(Service)
+
+        self.assertIs(dep, dep_of_b)
+        self.assertIsNot(dep, other_dep)
+
+    def test_singleton_with_dependencies(self):
+        registry = DependenciesRegistry()
+        registry.register_factory(Dependency, Dependency)
+        registry.register_factory(DependencyB, DependencyB)
+        registry.register_singleton(Service, Service)
+
+        self.assertIs(registry.get(Service), registry.get(Service))
+
+    def test_graph_reflects_registry_changes(self):
+        registry = DependenciesRegistry()
+        registry.register_factory(Service, Service)
+        registry.register_factory(DependencyB, DependencyB)
+
+        with self.assertRaises(DependencyNotFound):
+            registry.get(Service)
+
+        instance = Dependency()
+        registry.register_instance(Dependency, instance)
+
+        self.assertIs(registry.get(Service).dep, instance)
+
+    def test_circular_dependency(self):
+        registry = DependenciesRegistry()
+
+        def factory_a(dep_b: DependencyB):
+            return Dependency()
+
+        def factory_b(dep: Dependency):
+            return DependencyB()
+
+        registry.register_factory(Dependency, factory_a)
+        with self.assertRaises(CircularDependency):
+            registry.register_singleton(DependencyB, factory_b)
+
+        with self.assertRaises(DependencyNotFound):
+            registry.get(DependencyB)
+
+    def test_self_dependency(self):
+        registry = DependenciesRegistry()
+
+        def factory(dep: Dependency):
+            return Dependency()
+
+        with self.assertRaises(CircularDependency):
+            registry.register_factory(Dependency, factory)
+
+    def test_not_annotated_parameter(self):
+        registry = DependenciesRegistry()
+
+        def factory(dep):
+            return Dependency()
+
+        with self.assertRaises(InjectionNotSupported):
+            registry.register_factory(Dependency, factory)
+
+    def test_validate(self):
+        registry = DependenciesRegistry()
+        registry.register_factory(Service, Service)
+        registry.register_factory(DependencyB, DependencyB)
+
+        with self.assertRaises(DependencyNotFound):
+            registry.validate()
+
+        registry.register_factory(Dependency, Dependency)
+        registry.validate()
+
+    def test_async_factory_with_dependencies(self):
+        registry = DependenciesRegistry()
+        instance = Dependency()
+
+        async def factory(dep: Dependency):
+            return dep
+
+        registry.register_instance(Dependency, instance)
+        registry.register_async_factory(DependencyB, factory)
+
+        self.assertIs(instance, asyncio.run(registry.aget(DependencyB)))
+
+
+class TestBootstrap(unittest.TestCase):
+    def test_independent_singletons_created_concurrently(self):
+        registry = DependenciesRegistry()
+
+        # created one after another, the first factory would time out
+        started = threading.Barrier(2, timeout=5)
+
+        def waiting(cls):
+            def factory():
+                started.wait()
+                return cls()
+
+            return factory
+
+        registry.register_singleton(Dependency, waiting(Dependency))
+        registry.register_singleton(DependencyB, waiting(DependencyB))
+
+        with ThreadPoolExecutor(2) as executor:
+            registry.bootstrap(executor)
+
+        self.assertIsInstance(registry.get(Dependency), Dependency)
+        self.assertIsInstance(registry.get(DependencyB), DependencyB)
+
+    def test_dependent_singleton_created_after_its_dependencies(self):
+        registry = DependenciesRegistry()
+        created = []
+
+        def factory_b(dep: Dependency):
+            created.append(DependencyB)
+            return DependencyB()
+
+        def factory_service(dep: Dependency, dep_b: DependencyB):
+            created.append(Service)
+            return Service(dep, dep_b)
+
+        registry.register_singleton(Dependency, Dependency)
+        registry.register_factory(DependencyB, factory_b)
+        registry.register_singleton(Service, factory_service)
+
+        with ThreadPoolExecutor(2) as executor:
+            registry.bootstrap(executor)
+
+        service = registry.get(Service)
+        self.assertIs(service, registry.get(Service))
+        self.assertIs(service.dep, registry.get(Dependency))
+        self.assertEqual(created, [DependencyB, Service])
+
+    def test_created_singletons_are_kept(self):
+        registry = DependenciesRegistry()
+        registry.register_singleton(Dependency, Dependency)
+        instance = registry.get(Dependency)
+
+        with ThreadPoolExecutor(1) as executor:
+            registry.bootstrap(executor)
+
+        self.assertIs(instance, registry.get(Dependency))
+
+    def test_failure_is_raised(self):
+        registry = DependenciesRegistry()
+
+        def factory():
+            raise RuntimeError("broken")
+
+        def factory_b(dep: Dependency):
+            return DependencyB()
+
+        registry.register_singleton(Dependency, factory)
+        registry.register_singleton(DependencyB, factory_b)
+
+        with ThreadPoolExecutor(1) as executor:
+            with self.assertRaises(RuntimeError):
+                registry.bootstrap(executor)
+
+    def test_deferred_singleton_created_after_its_dependencies(self):
+        registry = DependenciesRegistry()
+        created = []
+
+        def factory():
+            time.sleep(0.05)
+            created.append(Dependency)
+            return Dependency()
+
+        registry.register_singleton(Dependency, factory)
+        registry.register_singleton(DependencyB, "tests.example_dep:make_b")
+
+        with ThreadPoolExecutor(2) as executor:
+            registry.bootstrap(executor)
+
+        self.assertEqual(created, [Dependency])
+        self.assertIs(registry.get(DependencyB).dep, registry.get(Dependency))
+
+    def test_process_pool(self):
+        registry = DependenciesRegistry()
+        registry.register_singleton(
+            Dependency, "tests.example_dep:DependencyA"
+        )
+        registry.register_singleton(DependencyB, "tests.example_dep:make_b")
+
+        with ProcessPoolExecutor(2) as executor:
+            registry.warm_up(executor=executor)
+
+        self.assertIsInstance(registry.get(Dependency), Dependency)
+        self.assertIs(registry.get(DependencyB).dep, registry.get(Dependency))
+
+    def test_singleton_requested_during_bootstrap_created_once(self):
+        registry = DependenciesRegistry()
+        started = threading.Event()
+        release = threading.Event()
+        created = []
+
+        def factory():
+            started.set()
+            release.wait(5)
+            created.append(Dependency)
+            return Dependency()
+
+        registry.register_singleton(Dependency, factory)
+        instances = []
+        with ThreadPoolExecutor(1) as executor:
+            bootstrap = threading.Thread(
+                target=registry.bootstrap, args=(executor,)
+            )
+            bootstrap.start()
+            started.wait(5)
+            getter = threading.Thread(
+                target=lambda: instances.append(registry.get(Dependency))
+            )
+            getter.start()
+            release.set()
+            getter.join()
+            bootstrap.join()
+
+        self.assertEqual(created, [Dependency])
+        self.assertIs(instances[0], registry.get(Dependency))
+
+    def test_singleton_requested_before_submitted_creation_starts(self):
+        registry = DependenciesRegistry()
+        release = threading.Event()
+        created = []
+
+        def factory():
+            created.append(Dependency)
+            return Dependency()
+
+        registry.register_singleton(Dependency, factory)
+        provider = registry.get_entry(Dependency).provider
+        with ThreadPoolExecutor(1) as executor:
+            executor.submit(release.wait, 5)
+            future = provider.submit(executor, factory)
+            instance = registry.get(Dependency)
+            release.set()
+
+        self.assertTrue(future.cancelled())
+        self.assertEqual(created, [Dependency])
+        self.assertIs(registry.get(Dependency), instance)
+
+    def test_missing_dependency(self):
+        registry = DependenciesRegistry()
+        registry.register_singleton(Service, Service)
+
+        with ThreadPoolExecutor(1) as executor:
+            with self.assertRaises(DependencyNotFound):
+                registry.bootstrap(executor)
+
+
+class TestChildRegistry(unittest.TestCase):
+    def setUp(self):
+        self.parent = DependenciesRegistry()
+        self.child = self.parent.child()
+
+    def test_inherits_parent_dependencies(self):
+        instance = Dependency()
+        self.parent.register_instance(Dependency, instance)
+
+        self.assertIs(self.child.parent, self.parent)
+        self.assertIs(self.child.get(Dependency), instance)
+
+    def test_override_does_not_change_parent(self):
+        instance = Dependency()
+        override = Dependency()
+        self.parent.register_instance(Dependency, instance)
+
+        self.child.register_instance(Dependency, override)
+
+        self.assertIs(self.child.get(Dependency), override)
+        self.assertIs(self.parent.get(Dependency), instance)
+
+    def test_parent_changes_reflected(self):
+        grandchild = self.child.child()
+        version = grandchild.version
+
+        instance = Dependency()
+        self.parent.register_instance(Dependency, instance)
+
+        self.assertGreater(grandchild.version, version)
+        self.assertIs(grandchild.get(Dependency), instance)
+
+        self.parent.clear()
+        with self.assertRaises(DependencyNotFound):
+            grandchild.get(Dependency)
+
+    def test_clear_removes_only_overrides(self):
+        instance = Dependency()
+        self.parent.register_instance(Dependency, instance)
+        self.child.register_instance(Dependency, Dependency())
+
+        self.child.clear()
+
+        self.assertIs(self.child.get(Dependency), instance)
+
+    def test_parent_factory_uses_overrides(self):
+        override = Dependency()
+        self.parent.register_factory(Dependency, Dependency)
+        self.parent.register_factory(DependencyB, DependencyB)
+        self.parent.register_factory(Service, Service)
+        self.child.register_instance(Dependency, override)
+
+        self.assertIs(self.child.get(Service).dep, override)
+        self.assertIsNot(self.parent.get(Service).dep, override)
+
+    def test_parent_path_factory_uses_overrides(self):
+        override = Dependency()
+        self.parent.register_factory(Dependency, Dependency)
+        self.parent.register_factory(DependencyB, "tests.example_dep:make_b")
+        self.parent.get(DependencyB)
+        self.child.register_instance(Dependency, override)
+
+        self.assertIs(self.child.get(DependencyB).dep, override)
+        self.assertIsNot(self.parent.get(DependencyB).dep, override)
+
+    def test_parent_singleton_shared(self):
+        self.parent.register_singleton(Dependency, Dependency)
+
+        self.assertIs(self.child.get(Dependency), self.parent.get(Dependency))
+
+    def test_circular_dependency_through_parent(self):
+        def factory_b(dep: Dependency):
+            return DependencyB()
+
+        def factory_a(dep_b: DependencyB):
+            return Dependency()
+
+        self.parent.register_factory(DependencyB, factory_b)
+
+        with self.assertRaises(CircularDependency):
+            self.child.register_factory(Dependency, factory_a)
+
+    def test_injector_with_child_registry(self):
+        instance = Dependency()
+        self.parent.register_instance(Dependency, Dependency())
+        self.child.register_instance(Dependency, instance)
+        injector = Injector(self.child)
+
+        @injector
+        class SomeClass:
+            dep: Dependency
+
+        self.assertIs(SomeClass().dep, instance)
+
+
+class TestDeferredRegistration(unittest.TestCase):
+    def setUp(self):
+        self.registry = DependenciesRegistry()
+
+    def test_factory_imported_on_first_get(self):
+        self.registry.register_factory(
+            "missing", "tests.not_existing_module:Factory"
+        )
+
+        with self.assertRaises(ImportError):
+            self.registry.get("missing")
+
+    def test_string_key_and_path(self):
+        self.registry.register_singleton(
+            "dependency", "tests.example_dep:DependencyA"
+        )
+
+        instance = self.registry.get("dependency")
+
+        self.assertIsInstance(instance, Dependency)
+        self.assertIs(instance, self.registry.get("dependency"))
+
+    def test_imported_factory_dependencies(self):
+        instance = Dependency()
+        self.registry.register_instance(Dependency, instance)
+        self.registry.register_factory(DependencyB, DependencyB)
+        self.registry.register_factory(Service, "tests.test_registry:Service")
+
+        self.assertIs(self.registry.get(Service).dep, instance)
+
+    def test_malformed_path(self):
+        with self.assertRaises(ValueError):
+            self.registry.register_factory(Dependency, "tests.example_dep")
+
+    def test_class_by_qualified_name(self):
+        instance = Dependency()
+        self.registry.register_instance(Dependency, instance)
+
+        for key in (
+            "tests.example_dep:DependencyA",
+            "tests.example_dep.DependencyA",
+        ):
+            self.assertIs(self.registry.get(key), instance)
+
+        with self.assertRaises(DependencyNotFound):
+            self.registry.get("tests.example_dep:DependencyB")
+
+    def test_string_annotations(self):
+        injector = Injector(self.registry)
+        instance = Dependency()
+        self.registry.register_instance(Dependency, instance)
+        self.registry.register_singleton(
+            "dependency_b", "tests.example_dep:DependencyB"
+        )
+
+        @injector
+        class SomeClass:
+            dep: "tests.example_dep:DependencyA"
+            dep_b: "dependency_b"
+
+        some_class = SomeClass()
+
+        self.assertIs(some_class.dep, instance)
+        self.assertIsInstance(some_class.dep_b, DependencyB)
+
+    def test_registered_string_key_precedes_module_name(self):
+        injector = Injector(self.registry)
+        settings = Dependency()
+        self.registry.register_instance("settings", settings)
+
+        @injector
+        class SomeClass:
+            settings: "settings"
+
+        @injector
+        def handler(settings: "settings"):
+            return settings
+
+        self.assertIs(SomeClass().settings, settings)
+        self.assertIs(handler(), settings)
+
+    def test_string_annotation_of_unhashable_module_name(self):
+        injector = Injector(self.registry)
+
+        @injector
+        class SomeClass:
+            settings: "settings"
+
+        with self.assertRaises(InjectionFailure):
+            SomeClass()
+
+        self.registry.register_instance("settings", Dependency())
+        self.assertIsInstance(SomeClass().settings, Dependency)
+
+    def test_string_annotation_evaluated_in_module(self):
+        injector = Injector(self.registry)
+        instance = Dependency()
+        self.registry.register_instance(Dependency, instance)
+
+        @injector
+        class SomeClass:
+            dep: "Dependency"
+
+        self.assertIs(SomeClass().dep, instance)
+
+
+class TestFrozenRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = DependenciesRegistry()
+
+    def test_frozen_lookups(self):
+        instance = Dependency()
+        self.registry.register_instance(Dependency, instance)
+        self.registry.register_factory(DependencyB, DependencyB)
+        self.registry.register_singleton(Service, Service)
+        service = self.registry.get(Service)
+
+        self.registry.freeze()
+
+        self.assertTrue(self.registry.frozen)
+        self.assertIs(self.registry.get(Dependency), instance)
+        self.assertIsInstance(self.registry.get(DependencyB), DependencyB)
+        self.assertIs(self.registry.get(Service), service)
+        self.assertIs(
+            self.registry.get("tests.example_dep:DependencyA"), instance
+        )
+        with self.assertRaises(DependencyNotFound):
+            self.registry.get(Factory)
+
+    def test_frozen_async_dependency(self):
+        async def factory():
+            return Dependency()
+
+        self.registry.register_async_factory(Dependency, factory)
+        self.registry.freeze()
+
+        with self.assertRaises(AsyncResolutionRequired):
+            self.registry.get(Dependency)
+        self.assertIsInstance(
+            asyncio.run(self.registry.aget(Dependency)), Dependency
+        )
+
+    def test_modification_of_frozen_registry(self):
+        self.registry.register_instance(Dependency, Dependency())
+        self.registry.freeze()
+
+        with self.assertRaises(RegistryFrozen):
+            self.registry.register_factory(DependencyB, DependencyB)
+        with self.assertRaises(RegistryFrozen):
+            self.registry.clear()
+
+    def test_thaw(self):
+        self.registry.freeze()
+        self.registry.thaw()
+
+        self.registry.register_factory(Dependency, Dependency)
+
+        self.assertFalse(self.registry.frozen)
+        self.assertIsInstance(self.registry.get(Dependency), Dependency)
+
+    def test_frozen_child_reflects_parent(self):
+        child = self.registry.child()
+        child.freeze()
+
+        instance = Dependency()
+        self.registry.register_instance(Dependency, instance)
+
+        self.assertIs(child.get(Dependency), instance)
+
+    def test_hooks_on_frozen_registry(self):
+        calls = []
+
+        class Recorder(Hooks):
+            def on_resolve_start(self, dependency):
+                calls.append(dependency)
+
+        hooks = Recorder()
+        self.registry.register_instance(Dependency, Dependency())
+        self.registry.freeze()
+        self.registry.add_hooks(hooks)
+        self.registry.get(Dependency)
+        self.registry.remove_hooks(hooks)
+        self.registry.get(Dependency)
+
+        self.assertEqual(calls, [Dependency])
+        self.assertTrue(self.registry.frozen)
+
+
+class TestPerProcessRegistration(unittest.TestCase):
+    def setUp(self):
+        self.registry = DependenciesRegistry()
+
+    def test_instance_created_once(self):
+        self.registry.register_per_process(Dependency, Dependency)
+
+        instance = self.registry.get(Dependency)
+
+        self.assertIsInstance(instance, Dependency)
+        self.assertIs(self.registry.get(Dependency), instance)
+
+    def test_frozen_registry_keeps_per_process_provider(self):
+        self.registry.register_per_process(Dependency, Dependency)
+        instance = self.registry.get(Dependency)
+        self.registry.freeze()
+
+        entry = self.registry.get_entry(Dependency)
+        entry.provider._reset()
+
+        self.assertIsNot(self.registry.get(Dependency), instance)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_instance_recreated_in_forked_process(self):
+        self.registry.register_singleton(Dependency, Dependency)
+        self.registry.register_per_process(DependencyB, DependencyB)
+        shared = self.registry.get(Dependency)
+        per_process = self.registry.get(DependencyB)
+
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                os.close(read_end)
+                shared_kept = self.registry.get(Dependency) is shared
+                per_process_again = self.registry.get(DependencyB)
+                recreated = per_process_again is not per_process
+                reused = self.registry.get(DependencyB) is per_process_again
+                os.write(write_end, bytes([shared_kept, recreated, reused]))
+                status = 0
+            finally:
+                os._exit(status)
+
+        os.close(write_end)
+        with os.fdopen(read_end, "rb") as pipe:
+            result = pipe.read()
+        _, status = os.waitpid(pid, 0)
+
+        self.assertEqual(status, 0)
+        self.assertEqual(result, bytes([True, True, True]))
+        self.assertIs(self.registry.get(DependencyB), per_process)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_pooled_and_keyed_instances_dropped_in_forked_process(self):
+        injector = Injector(self.registry)
+
+        @injector
+        class Owner:
+            dep: Dependency
+
+        self.registry.register_pooled(Dependency, Dependency)
+        self.registry.register_keyed(DependencyB, lambda key: DependencyB())
+        pool = self.registry.get_entry(Dependency).provider
+        owner = Owner()
+        idle = pool.acquire()
+        pool.release(idle)
+        keyed = self.registry.get(KeyedDependency(DependencyB, 1))
+
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                os.close(read_end)
+                acquired = pool.acquire()
+                idle_dropped = acquired is not idle and pool.in_use == 1
+                release(owner)
+                lease_detached = pool.idle == 0
+                keyed_again = self.registry.get(
+                    KeyedDependency(DependencyB, 1)
+                )
+                os.write(
+                    write_end,
+                    bytes(
+                        [
+                            idle_dropped,
+                            lease_detached,
+                            keyed_again is not keyed,
+                        ]
+                    ),
+                )
+                status = 0
+            finally:
+                os._exit(status)
+
+        os.close(write_end)
+        with os.fdopen(read_end, "rb") as pipe:
+            result = pipe.read()
+        _, status = os.waitpid(pid, 0)
+
+        self.assertEqual(status, 0)
+        self.assertEqual(result, bytes([True, True, True]))
+        self.assertIs(pool.acquire(), idle)
+        release(owner)
+        self.assertEqual(pool.idle, 1)
+        self.assertIs(
+            self.registry.get(KeyedDependency(DependencyB, 1)), keyed
+        )
+
+    def test_prefork(self):
+        self.registry.register_singleton(Dependency, Dependency)
+        self.registry.register_per_process(DependencyB, DependencyB)
+        self.addCleanup(gc.unfreeze)
+
+        self.registry.prefork()
+
+        self.assertTrue(self.registry.get_entry(Dependency).provider.created)
+        self.assertFalse(
+            self.registry.get_entry(DependencyB).provider.created
+        )
+        if hasattr(gc, "get_freeze_count"):
+            self.assertGreater(gc.get_freeze_count(), 0)
+
+    def test_warm_up_creates_per_process_dependency(self):
+        self.registry.register_per_process(DependencyB, DependencyB)
+
+        self.registry.warm_up()
+
+        self.assertTrue(
+            self.registry.get_entry(DependencyB).provider.created
+        )
+
+
+class TestOwnedRegistration(unittest.TestCase):
+    def setUp(self):
+        self.injector = Injector()
+        self.registry = self.injector.registry
+
+    def test_instance_shared_while_referenced(self):
+        self.registry.register_owned(Dependency, Dependency)
+
+        instance = self.registry.get(Dependency)
+
+        self.assertIs(self.registry.get(Dependency), instance)
+        self.assertTrue(self.registry.get_entry(Dependency).provider.created)
+
+    def test_instance_recreated_after_last_owner_collected(self):
+        @self.injector
+        class Owner:
+            dep: Dependency
+
+        self.registry.register_owned(Dependency, Dependency)
+        first, second = Owner(), Owner()
+        provider = self.registry.get_entry(Dependency).provider
+
+        self.assertIs(first.dep, second.dep)
+
+        del first
+        gc.collect()
+        self.assertTrue(provider.created)
+        self.assertIs(Owner().dep, second.dep)
+
+        del second
+        gc.collect()
+        self.assertFalse(provider.created)
+
+        owner = Owner()
+        self.assertIsInstance(owner.dep, Dependency)
+        self.assertTrue(provider.created)
+        del owner
+        gc.collect()
+        self.assertFalse(provider.created)
+
+    def test_concurrent_creation(self):
+        calls = []
+
+        def factory():
+            calls.append(None)
+            time.sleep(0.01)
+            return Dependency()
+
+        self.registry.register_owned(Dependency, factory)
+
+        with ThreadPoolExecutor(8) as executor:
+            instances = list(
+                executor.map(
+                    lambda _: self.registry.get(Dependency), range(8)
+                )
+            )
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(dep is instances[0] for dep in instances))
+
+    def test_instance_without_weak_references(self):
+        self.registry.register_owned(Dependency, dict)
+
+        with self.assertRaises(TypeError):
+            self.registry.get(Dependency)
+
+    def test_frozen_registry_does_not_keep_instance(self):
+        self.registry.register_owned(Dependency, Dependency)
+        self.registry.get(Dependency)
+        self.registry.freeze()
+        gc.collect()
+
+        self.assertFalse(self.registry.get_entry(Dependency).provider.created)
+        self.assertIsInstance(self.registry.get(Dependency), Dependency)
@@ -0,0 +1,99 @@
+import asyncio
+import unittest
+
+from injectme import (
+    InjectionFailure,
+    Injector,
+    ScopeNotActive,
+)
+
+from .example_dep import DependencyA, DependencyB
+
+
+class TestScope(unittest.TestCase):
+    def setUp(self):
+        self.injector = Injector()
+        self.registry = self.injector.registry
+
+    def test_scoped_dependency_shared_in_scope(self):
+        @self.injector
+        class SomeClass:
+            dep: DependencyA
+
+        self.registry.register_scoped(DependencyA, DependencyA)
+
+        with self.injector.scope():
+            some_class_a = SomeClass()
+            some_class_b = SomeClass()
+
+        with self.injector.scope():
+            some_class_c = SomeClass()
+
+        self.assertIs(some_class_a.dep, some_class_b.dep)
+        self.assertIsNot(some_class_a.dep, some_class_c.dep)
+
+    def test_scoped_dependency_outside_of_scope(self):
+        @self.injector
+        class SomeClass:
+            dep: DependencyA
+
+        self.registry.register_scoped(DependencyA, DependencyA)
+
+        with self.assertRaises(ScopeNotActive):
+            self.registry.get(DependencyA)
+
+        with self.assertRaises(InjectionFailure):
+            SomeClass()
+
+    def test_nested_scope(self):
+        self.registry.register_scoped(DependencyA, DependencyA)
+
+        with self.injector.scope():
+            outer = self.registry.get(DependencyA)
+            with self.injector.scope():
+                inner = self.registry.get(DependencyA)
+            self.assertIs(outer, self.registry.get(DependencyA))
+
+        self.assertIsNot(outer, inner)
+
+    def test_dispose(self):
+        disposed = []
+        self.registry.register_scoped(
+            DependencyA, DependencyA, dispose=disposed.append
+        )
+        self.registry.register_scoped(
+            DependencyB, DependencyB, dispose=disposed.append
+        )
+
+        with self.injector.scope():
+            dep_a = self.registry.get(DependencyA)
+            dep_b = self.registry.get(DependencyB)
+            self.assertEqual(disposed, [])
+
+        self.assertEqual(disposed, [dep_b, dep_a])
+
+    def test_async_scope(self):
+        disposed = []
+
+        async def dispose(instance):
+            disposed.append(instance)
+
+        self.registry.register_scoped(DependencyA, DependencyA, dispose)
+
+        async def handle_request():
+            async with self.injector.scope():
+                results = await asyncio.gather(
+                    *(self.resolve() for _ in range(3))
+                )
+            return results
+
+        results_a = asyncio.run(handle_request())
+        results_b = asyncio.run(handle_request())
+
+        self.assertTrue(all(dep is results_a[0] for dep in results_a))
+        self.assertIsNot(results_a[0], results_b[0])
+        self.assertEqual(disposed, [results_a[0], results_b[0]])
+
+    async def resolve(self):
+        await asyncio.sleep(0)
+        return self.registry.get(DependencyA)
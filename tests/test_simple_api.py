@@ -1,3 +1,4 @@
+import gc
 import unittest
 
 from injectme import (
@@ -6,6 +7,9 @@ from injectme import (
     clear_dependencies,
     register,
     register_factory,
+    register_singleton,
+    validate,
+    warm_up,
 )
 
 from .example_dep import DependencyA, FactoryA
@@ -37,6 +41,33 @@ class TestSimpleAPI(unittest.TestCase):
 
         self.assertIs(factory.instance, some_class.dep)
 
+    def test_singleton_injection(self):
+        @inject
+        class SomeClass:
+            dep: DependencyA
+
+        register_singleton(DependencyA, DependencyA)
+        some_class_a = SomeClass()
+        some_class_b = SomeClass()
+
+        self.assertIs(some_class_a.dep, some_class_b.dep)
+
+    def test_warm_up(self):
+        gc.collect()
+
+        @inject
+        class SomeClass:
+            dep: DependencyA
+
+        with self.assertRaises(InjectionFailure):
+            validate()
+
+        calls = []
+        register_singleton(DependencyA, lambda: calls.append(1))
+        warm_up()
+
+        self.assertEqual(calls, [1])
+
 
     def test_clearing_dependencies(self):
         @inject